@@ -0,0 +1,65 @@
+"""add product keyset pagination indexes
+
+Revision ID: 3f6b2d9e8a41
+Revises: 07535e5405fe
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6b2d9e8a41'
+down_revision: Union[str, Sequence[str], None] = '07535e5405fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+EFFECTIVE_PRICE = sa.text("COALESCE(discounted_price, price)")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_products_category_active_created',
+        'products',
+        ['category_id', 'is_active', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+    op.create_index(
+        'ix_products_subcategory_active_created',
+        'products',
+        ['subcategory_id', 'is_active', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+    op.create_index(
+        'ix_products_active_created',
+        'products',
+        ['is_active', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+    op.create_index(
+        'ix_products_category_active_price',
+        'products',
+        ['category_id', 'is_active', EFFECTIVE_PRICE, 'id'],
+    )
+    op.create_index(
+        'ix_products_subcategory_active_price',
+        'products',
+        ['subcategory_id', 'is_active', EFFECTIVE_PRICE, 'id'],
+    )
+    op.create_index(
+        'ix_products_active_price',
+        'products',
+        ['is_active', EFFECTIVE_PRICE, 'id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_active_price', table_name='products')
+    op.drop_index('ix_products_subcategory_active_price', table_name='products')
+    op.drop_index('ix_products_category_active_price', table_name='products')
+    op.drop_index('ix_products_active_created', table_name='products')
+    op.drop_index('ix_products_subcategory_active_created', table_name='products')
+    op.drop_index('ix_products_category_active_created', table_name='products')
@@ -0,0 +1,61 @@
+"""add admin order search indexes
+
+Revision ID: a8c3e6f0b2d4
+Revises: f1b7d2c4e8a9
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c3e6f0b2d4'
+down_revision: Union[str, Sequence[str], None] = 'f1b7d2c4e8a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_orders_created',
+        'orders',
+        [sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+    op.create_index(
+        'ix_orders_status_created',
+        'orders',
+        ['order_status', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+    op.create_index('ix_orders_coupon_id', 'orders', ['coupon_id'])
+    op.create_index(
+        'ix_orders_coupon_code_created',
+        'orders',
+        ['coupon_code', sa.text('created_at DESC')],
+        postgresql_where=sa.text('coupon_code IS NOT NULL'),
+    )
+    op.create_index(
+        'ix_orders_courier_created',
+        'orders',
+        ['courier_name', sa.text('created_at DESC')],
+        postgresql_where=sa.text('courier_name IS NOT NULL'),
+    )
+    op.create_index(
+        'ix_orders_unserviceable_created',
+        'orders',
+        [sa.text('created_at DESC'), sa.text('id DESC')],
+        postgresql_where=sa.text('serviceable = false'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_unserviceable_created', table_name='orders')
+    op.drop_index('ix_orders_courier_created', table_name='orders')
+    op.drop_index('ix_orders_coupon_code_created', table_name='orders')
+    op.drop_index('ix_orders_coupon_id', table_name='orders')
+    op.drop_index('ix_orders_status_created', table_name='orders')
+    op.drop_index('ix_orders_created', table_name='orders')
@@ -0,0 +1,28 @@
+"""add coupon usages user index
+
+Revision ID: b3d5f7a9c1e2
+Revises: a8c3e6f0b2d4
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d5f7a9c1e2'
+down_revision: Union[str, Sequence[str], None] = 'a8c3e6f0b2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_coupon_usages_user_coupon', 'coupon_usages', ['user_id', 'coupon_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_coupon_usages_user_coupon', table_name='coupon_usages')
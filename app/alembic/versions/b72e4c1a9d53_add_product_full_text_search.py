@@ -0,0 +1,113 @@
+"""add product full text search
+
+Revision ID: b72e4c1a9d53
+Revises: 3f6b2d9e8a41
+Create Date: 2026-10-17 11:00:00.000000
+
+A GENERATED column cannot read categories/subcategories, so search_vector
+is filled by a BEFORE trigger on products, and category/subcategory renames
+re-fire it for their products.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b72e4c1a9d53'
+down_revision: Union[str, Sequence[str], None] = '3f6b2d9e8a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    op.execute(
+        """
+        CREATE FUNCTION products_search_vector_refresh() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.one_liner, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(
+                    (SELECT name FROM categories WHERE id = NEW.category_id), '')), 'C') ||
+                setweight(to_tsvector('english', coalesce(
+                    (SELECT name FROM subcategories WHERE id = NEW.subcategory_id), '')), 'C') ||
+                setweight(to_tsvector('english', coalesce(NEW.description, '')), 'D');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER products_search_vector
+        BEFORE INSERT OR UPDATE OF title, one_liner, description, category_id, subcategory_id
+        ON products
+        FOR EACH ROW EXECUTE FUNCTION products_search_vector_refresh()
+        """
+    )
+
+    # Renaming a category/subcategory re-fires the products trigger
+    op.execute(
+        """
+        CREATE FUNCTION categories_search_vector_propagate() RETURNS trigger AS $$
+        BEGIN
+            UPDATE products SET title = title WHERE category_id = NEW.id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER categories_search_vector
+        AFTER UPDATE OF name ON categories
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION categories_search_vector_propagate()
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION subcategories_search_vector_propagate() RETURNS trigger AS $$
+        BEGIN
+            UPDATE products SET title = title WHERE subcategory_id = NEW.id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER subcategories_search_vector
+        AFTER UPDATE OF name ON subcategories
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION subcategories_search_vector_propagate()
+        """
+    )
+
+    # Backfill existing rows through the trigger
+    op.execute("UPDATE products SET title = title")
+
+    op.create_index(
+        'ix_products_search_vector',
+        'products',
+        ['search_vector'],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_search_vector', table_name='products')
+    op.execute("DROP TRIGGER IF EXISTS subcategories_search_vector ON subcategories")
+    op.execute("DROP FUNCTION IF EXISTS subcategories_search_vector_propagate()")
+    op.execute("DROP TRIGGER IF EXISTS categories_search_vector ON categories")
+    op.execute("DROP FUNCTION IF EXISTS categories_search_vector_propagate()")
+    op.execute("DROP TRIGGER IF EXISTS products_search_vector ON products")
+    op.execute("DROP FUNCTION IF EXISTS products_search_vector_refresh()")
+    op.drop_column('products', 'search_vector')
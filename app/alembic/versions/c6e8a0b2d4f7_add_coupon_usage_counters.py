@@ -0,0 +1,59 @@
+"""add coupon usage counters
+
+Revision ID: c6e8a0b2d4f7
+Revises: b3d5f7a9c1e2
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e8a0b2d4f7'
+down_revision: Union[str, Sequence[str], None] = 'b3d5f7a9c1e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'coupons',
+        sa.Column('uses_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    )
+    op.create_check_constraint('ck_coupon_uses_count_non_negative', 'coupons', 'uses_count >= 0')
+
+    op.create_table(
+        'coupon_user_usages',
+        sa.Column('coupon_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('uses_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.CheckConstraint('uses_count >= 0', name='ck_coupon_user_uses_count_non_negative'),
+        sa.ForeignKeyConstraint(['coupon_id'], ['coupons.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('coupon_id', 'user_id'),
+    )
+
+    # Backfill both counters from existing usages
+    op.execute(
+        """
+        UPDATE coupons
+        SET uses_count = (SELECT COUNT(*) FROM coupon_usages u WHERE u.coupon_id = coupons.id)
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO coupon_user_usages (coupon_id, user_id, uses_count)
+        SELECT coupon_id, user_id, COUNT(*) FROM coupon_usages GROUP BY coupon_id, user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('coupon_user_usages')
+    op.drop_constraint('ck_coupon_uses_count_non_negative', 'coupons', type_='check')
+    op.drop_column('coupons', 'uses_count')
@@ -0,0 +1,128 @@
+"""add product_cards read model
+
+Revision ID: d4e8f1a2b6c7
+Revises: b72e4c1a9d53
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e8f1a2b6c7'
+down_revision: Union[str, Sequence[str], None] = 'b72e4c1a9d53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = {
+    'ix_product_cards_category_active_created': ['category_id', 'is_active', sa.text('created_at DESC'), sa.text('product_id DESC')],
+    'ix_product_cards_subcategory_active_created': ['subcategory_id', 'is_active', sa.text('created_at DESC'), sa.text('product_id DESC')],
+    'ix_product_cards_active_created': ['is_active', sa.text('created_at DESC'), sa.text('product_id DESC')],
+    'ix_product_cards_category_active_price': ['category_id', 'is_active', 'effective_price', 'product_id'],
+    'ix_product_cards_subcategory_active_price': ['subcategory_id', 'is_active', 'effective_price', 'product_id'],
+    'ix_product_cards_active_price': ['is_active', 'effective_price', 'product_id'],
+    'ix_product_cards_category_active_views': ['category_id', 'is_active', sa.text('view_count DESC'), sa.text('created_at DESC')],
+}
+
+# Keyset indexes from 3f6b2d9e8a41; listings read product_cards now
+EFFECTIVE_PRICE = sa.text("COALESCE(discounted_price, price)")
+PRODUCT_INDEXES = {
+    'ix_products_category_active_created': ['category_id', 'is_active', sa.text('created_at DESC'), sa.text('id DESC')],
+    'ix_products_subcategory_active_created': ['subcategory_id', 'is_active', sa.text('created_at DESC'), sa.text('id DESC')],
+    'ix_products_active_created': ['is_active', sa.text('created_at DESC'), sa.text('id DESC')],
+    'ix_products_category_active_price': ['category_id', 'is_active', EFFECTIVE_PRICE, 'id'],
+    'ix_products_subcategory_active_price': ['subcategory_id', 'is_active', EFFECTIVE_PRICE, 'id'],
+    'ix_products_active_price': ['is_active', EFFECTIVE_PRICE, 'id'],
+}
+
+# utils.pricing.round_price_to_9: round, then move to the next price ending in 9
+ROUND_TO_9 = "(round({0})::bigint / 10 * 10 + 9)"
+
+# Same rows as services/product_card_service.py builds, in plain SQL so the
+# migration does not depend on the app code of the day
+BACKFILL = f"""
+    INSERT INTO product_cards (
+        product_id, title, slug, one_liner, description, image_link,
+        category_id, category_name, subcategory_id, subcategory_name,
+        price, discounted_price, effective_price, dimensions, dimension_pricing,
+        view_count, is_active, created_at, updated_at
+    )
+    SELECT
+        p.id, p.title, p.slug, p.one_liner, p.description, COALESCE(p.image_links[1], ''),
+        p.category_id, c.name, p.subcategory_id, s.name,
+        p.price, p.discounted_price, COALESCE(p.discounted_price, p.price), p.dimensions,
+        COALESCE(pricing.dimension_pricing, '{{}}'::json),
+        COALESCE(views.view_count, 0), p.is_active, p.created_at, p.updated_at
+    FROM products p
+    LEFT JOIN categories c ON c.id = p.category_id
+    LEFT JOIN subcategories s ON s.id = p.subcategory_id
+    LEFT JOIN (
+        SELECT product_id, SUM(view_count) AS view_count
+        FROM product_analytics
+        GROUP BY product_id
+    ) views ON views.product_id = p.id
+    LEFT JOIN LATERAL (
+        SELECT json_object_agg(
+            d.name,
+            json_build_object(
+                'price', {ROUND_TO_9.format("p.price * COALESCE(m.multiplier, 1.0)")},
+                'discounted_price', CASE WHEN p.discounted_price IS NOT NULL
+                    THEN {ROUND_TO_9.format("p.discounted_price * COALESCE(m.multiplier, 1.0)")} END,
+                'multiplier', COALESCE(m.multiplier, 1.0)
+            )
+            ORDER BY d.position
+        ) AS dimension_pricing
+        FROM unnest(p.dimensions) WITH ORDINALITY AS d(name, position)
+        LEFT JOIN dimension_pricing m ON m.name = d.name
+    ) pricing ON true
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'product_cards',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('slug', sa.String(length=255), nullable=False),
+        sa.Column('one_liner', sa.String(length=255), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('image_link', sa.String(), server_default='', nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('category_name', sa.String(length=100), nullable=True),
+        sa.Column('subcategory_id', sa.Integer(), nullable=True),
+        sa.Column('subcategory_name', sa.String(length=100), nullable=True),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('discounted_price', sa.Float(), nullable=True),
+        sa.Column('effective_price', sa.Float(), nullable=False),
+        sa.Column('dimensions', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('dimension_pricing', sa.JSON(), server_default=sa.text("'{}'::json"), nullable=False),
+        sa.Column('view_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('product_id'),
+    )
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'product_cards', columns)
+
+    op.execute(BACKFILL)
+
+    for name in PRODUCT_INDEXES:
+        op.drop_index(name, table_name='products')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, columns in PRODUCT_INDEXES.items():
+        op.create_index(name, 'products', columns)
+
+    for name in INDEXES:
+        op.drop_index(name, table_name='product_cards')
+    op.drop_table('product_cards')
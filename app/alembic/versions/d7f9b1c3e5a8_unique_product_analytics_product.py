@@ -0,0 +1,56 @@
+"""unique product_analytics per product
+
+Revision ID: d7f9b1c3e5a8
+Revises: c6e8a0b2d4f7
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7f9b1c3e5a8'
+down_revision: Union[str, Sequence[str], None] = 'c6e8a0b2d4f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fold duplicate rows into the lowest id per product before the constraint
+    op.execute(
+        """
+        UPDATE product_analytics keep
+        SET view_count = totals.view_count,
+            purchase_count = totals.purchase_count,
+            review_count = totals.review_count,
+            wishlist_count = totals.wishlist_count
+        FROM (
+            SELECT MIN(id) AS id,
+                   SUM(COALESCE(view_count, 0)) AS view_count,
+                   SUM(COALESCE(purchase_count, 0)) AS purchase_count,
+                   SUM(COALESCE(review_count, 0)) AS review_count,
+                   SUM(COALESCE(wishlist_count, 0)) AS wishlist_count
+            FROM product_analytics
+            GROUP BY product_id
+            HAVING COUNT(*) > 1
+        ) totals
+        WHERE keep.id = totals.id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM product_analytics dup
+        USING product_analytics keep
+        WHERE dup.product_id = keep.product_id AND dup.id > keep.id
+        """
+    )
+    op.create_unique_constraint('uq_product_analytics_product_id', 'product_analytics', ['product_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_product_analytics_product_id', 'product_analytics', type_='unique')
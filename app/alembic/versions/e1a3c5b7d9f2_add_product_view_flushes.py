@@ -0,0 +1,33 @@
+"""add product view flushes
+
+Revision ID: e1a3c5b7d9f2
+Revises: d7f9b1c3e5a8
+Create Date: 2026-10-17 21:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a3c5b7d9f2'
+down_revision: Union[str, Sequence[str], None] = 'd7f9b1c3e5a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'product_view_flushes',
+        sa.Column('flush_id', sa.String(length=32), nullable=False),
+        sa.Column('applied_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('flush_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('product_view_flushes')
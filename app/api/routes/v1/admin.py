@@ -0,0 +1,137 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Form, Query
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.security import get_current_user_with_email_check
+from db import session as db_session
+from db.session import get_db
+from models.users import User
+from schemas.payment import OrderStatus
+from utils.cache import catalog_cache
+from services.coupon_service import coupon_code_filter, invalidate_coupon_rules
+from services.order_service import fulfillment_stage_stats
+from services.order_search_service import OrderFilters, search_orders, count_orders_by_status
+from services.dimension_pricing_service import (
+    list_dimension_pricing,
+    upsert_dimension_pricing,
+    delete_dimension_pricing,
+)
+
+
+router = APIRouter(prefix="/v1/admin", tags=["Admin"])
+
+
+@router.get("/db/pool")
+def get_db_pool_stats(admin_user: User = Depends(get_current_user_with_email_check)):
+    """
+    Live connection-pool statistics for this process (checked-out, idle,
+    overflow, wait/hold-time histograms). Each gunicorn/dramatiq process
+    has its own pools, so numbers are per worker.
+    """
+    return {
+        "profile": settings.DB_POOL_PROFILE,
+        "pools": [db_session.db.pool_stats(), db_session.async_db.pool_stats()],
+    }
+
+
+@router.get("/cache/stats")
+def get_cache_stats(admin_user: User = Depends(get_current_user_with_email_check)):
+    """
+    Catalog response-cache hit/miss counters and coupon-code lookup/rejection
+    counters (for spotting code guessing) for this process.
+    """
+    return {"catalog": catalog_cache.stats(), "coupon_codes": coupon_code_filter.stats()}
+
+
+@router.get("/fulfillment/stats")
+def get_fulfillment_stats(admin_user: User = Depends(get_current_user_with_email_check)):
+    """Per-stage run counts, failures and mean duration of the fulfillment pipeline."""
+    return {"stages": fulfillment_stage_stats()}
+
+
+@router.post("/cache/catalog/invalidate")
+def invalidate_catalog_cache(admin_user: User = Depends(get_current_user_with_email_check)):
+    catalog_cache.invalidate()
+    return {"message": "Catalog cache invalidated"}
+
+
+@router.post("/cache/coupons/invalidate")
+def invalidate_coupon_cache(admin_user: User = Depends(get_current_user_with_email_check)):
+    """Drop compiled coupon rules in every process; call after editing coupons."""
+    invalidate_coupon_rules()
+    return {"message": "Coupon cache invalidated"}
+
+
+def order_filters(
+    status: Optional[OrderStatus] = None,
+    payment_method: Optional[str] = Query(None, description="COD or RAZORPAY"),
+    created_from: Optional[datetime] = Query(None, description="Inclusive lower bound on created_at"),
+    created_to: Optional[datetime] = Query(None, description="Exclusive upper bound on created_at"),
+    coupon_code: Optional[str] = None,
+    courier_name: Optional[str] = None,
+    serviceable: Optional[bool] = None,
+) -> OrderFilters:
+    return OrderFilters(
+        status=status,
+        payment_method=payment_method,
+        created_from=created_from,
+        created_to=created_to,
+        coupon_code=coupon_code,
+        courier_name=courier_name,
+        serviceable=serviceable,
+    )
+
+
+@router.get("/orders")
+def get_orders(
+    filters: OrderFilters = Depends(order_filters),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_user_with_email_check),
+):
+    """
+    Filtered, cursor-paginated order search, newest first. Without a status
+    filter, unplaced (CREATED) checkouts are left out.
+    """
+    return search_orders(db, filters, limit=limit, cursor=cursor)
+
+
+@router.get("/orders/status-counts")
+def get_order_status_counts(
+    filters: OrderFilters = Depends(order_filters),
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_user_with_email_check),
+):
+    """Order counts per status for the same filters (the status filter is ignored)."""
+    return count_orders_by_status(db, filters)
+
+
+@router.get("/dimension-pricing")
+def get_dimension_pricing(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_user_with_email_check),
+):
+    return list_dimension_pricing(db)
+
+
+@router.put("/dimension-pricing/{name}")
+def put_dimension_pricing(
+    name: str,
+    multiplier: float = Form(...),
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_user_with_email_check),
+):
+    return upsert_dimension_pricing(db, name, multiplier)
+
+
+@router.delete("/dimension-pricing/{name}")
+def remove_dimension_pricing(
+    name: str,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_user_with_email_check),
+):
+    return delete_dimension_pricing(db, name)
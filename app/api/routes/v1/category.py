@@ -2,12 +2,15 @@ from fastapi import APIRouter, HTTPException, Form, Depends, File, UploadFile
 from sqlalchemy.orm import Session
 from slugify import slugify
 from models.products import Category
-from db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.session import get_db, get_async_db
 from services.category_service import *
 from typing import Optional, List, Any
 from services.s3_service import s3_service
 from models.users import User
 from core.security import get_current_user_with_email_check
+from core.config import settings
+from utils.cache import catalog_cache
 
 
 
@@ -40,12 +43,17 @@ async def add_category(
 
 
 @category_router.get("/")
-def list_categories(db: Session = Depends(get_db)):
-    return get_all_categories(db)
+async def list_categories(db: AsyncSession = Depends(get_async_db)):
+    return await catalog_cache.get_or_set(
+        "categories",
+        None,
+        settings.CATALOG_CACHE_TTL_CATEGORIES,
+        lambda: get_all_categories(db),
+    )
 
 @category_router.get("/{category_id}")
-def retrieve_category(category_id: int, db: Session = Depends(get_db)):
-    return get_category_by_id(db, category_id)
+async def retrieve_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await get_category_by_id_async(db, category_id)
 
 @category_router.put("/{category_id}")
 def edit_category(
@@ -115,12 +123,17 @@ async def add_subcategories(
         "subcategories": subcategories,
     }
 @subcategory_router.get("/")
-def list_subcategories(db: Session = Depends(get_db)):
-    return get_all_subcategories(db)
+async def list_subcategories(db: AsyncSession = Depends(get_async_db)):
+    return await catalog_cache.get_or_set(
+        "subcategories",
+        None,
+        settings.CATALOG_CACHE_TTL_CATEGORIES,
+        lambda: get_all_subcategories(db),
+    )
 
 @subcategory_router.get("/{category_id}")
-def list_subcategories_for_category(category_id: int, db: Session = Depends(get_db)):
-    return get_subcategories_by_category(db, category_id)
+async def list_subcategories_for_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await get_subcategories_by_category(db, category_id)
 
 @subcategory_router.put("/{subcategory_id}")
 def edit_subcategory(
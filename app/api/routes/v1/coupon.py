@@ -1,13 +1,21 @@
 from typing import Annotated, List
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.session import get_db
+from db.session import get_db, get_async_db
 from core.security import get_current_user
-from schemas.coupon import ValidateCouponRequest, ValidateCouponResponse, CouponListItemResponse
+from schemas.coupon import (
+    ValidateCouponRequest,
+    ValidateCouponResponse,
+    CouponListItemResponse,
+    BestCouponsRequest,
+    BestCouponsResponse,
+    CouponOffer,
+)
 from services.coupon_service import CouponService
 from utils.order import OrderService
-from services.delivery_charge_service import build_pricing_breakdown
+from services import pricing_engine
 
 
 router = APIRouter(prefix="/v1/coupons", tags=["Coupons"])
@@ -19,23 +27,13 @@ def validate_coupon(
     db: Annotated[Session, Depends(get_db)],
     user: Annotated[object, Depends(get_current_user)],
 ):
-    # 1. Price the items exactly like order creation does
-    priced_items, items_subtotal, _ = OrderService._validate_and_price_items(
-        db, [item.dict() for item in payload.items]
-    )
-
-    # 2. Validate coupon eligibility
+    # 1. Validate coupon eligibility
     coupon = CouponService.fetch_and_validate(db, payload.code, user.id)
 
-    # 3. Compute discount
-    discount_result = CouponService.compute_discount(coupon, priced_items)
-    discount_amount = discount_result["discount_amount"]
-    subtotal_after_coupon = round(max(items_subtotal - discount_amount, 0.0), 2)
-
-    # 4. Compute delivery on discounted subtotal
-    pricing = build_pricing_breakdown(
-        subtotal=subtotal_after_coupon,
-        policy=OrderService._get_delivery_policy(),
+    # 2. Price items, discount and delivery exactly like order creation does
+    items = [item.dict() for item in payload.items]
+    pricing = pricing_engine.price_checkout(
+        OrderService.load_pricing_snapshot(db, items, coupon), items
     )
 
     return ValidateCouponResponse(
@@ -45,20 +43,65 @@ def validate_coupon(
         percent_off=coupon.percent_off,
         required_qty=coupon.required_qty,
         free_qty=coupon.free_qty,
-        matched_dimension=discount_result["matched_dimension"],
-        items_subtotal=items_subtotal,
-        coupon_discount_amount=discount_amount,
-        subtotal_after_coupon=subtotal_after_coupon,
-        delivery_charge=pricing["delivery_charge"],
-        amount=pricing["amount"],
+        matched_dimension=pricing.matched_dimension,
+        items_subtotal=pricing.items_subtotal,
+        coupon_discount_amount=pricing.coupon_discount_amount,
+        subtotal_after_coupon=pricing.subtotal_after_coupon,
+        delivery_charge=pricing.delivery_charge,
+        amount=pricing.amount,
     )
 
 
+@router.post("/best", response_model=BestCouponsResponse)
+def best_coupons(
+    payload: BestCouponsRequest,
+    db: Annotated[Session, Depends(get_db)],
+    user: Annotated[object, Depends(get_current_user)],
+):
+    """
+    Every coupon the user can use, evaluated against the cart in one pass:
+    the cart is priced once and each rule runs on the same priced lines.
+    Applicable coupons come first, lowest final amount first.
+    """
+    items = [item.dict() for item in payload.items]
+    snapshot = OrderService.load_pricing_snapshot(db, items)
+    coupons = CouponService.eligible_terms(db, user.id)
+
+    base, evaluations = pricing_engine.evaluate_coupons(snapshot, items, coupons)
+
+    offers = []
+    for evaluation in evaluations:
+        coupon, result = evaluation.coupon, evaluation.result
+        offer = CouponOffer(
+            code=coupon.code,
+            rule_type=coupon.rule_type.value,
+            percent_off=coupon.percent_off,
+            required_qty=coupon.required_qty,
+            free_qty=coupon.free_qty,
+            applicable=result is not None,
+            reason=evaluation.reason,
+        )
+        if result is not None:
+            offer.matched_dimension = result.matched_dimension
+            offer.coupon_discount_amount = result.coupon_discount_amount
+            offer.subtotal_after_coupon = result.subtotal_after_coupon
+            offer.delivery_charge = result.delivery_charge
+            offer.amount = result.amount
+            offer.savings = round(base.amount - result.amount, 2)
+        offers.append(offer)
+
+    return BestCouponsResponse(
+        items_subtotal=base.items_subtotal,
+        delivery_charge=base.delivery_charge,
+        amount=base.amount,
+        best=offers[0].code if offers and offers[0].applicable else None,
+        coupons=offers,
+    )
 
 
 @router.get("/", response_model=List[CouponListItemResponse])
-def list_coupons(
-    db: Annotated[Session, Depends(get_db)],
+async def list_coupons(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     user: Annotated[object, Depends(get_current_user)],
 ):
-    return CouponService.list_eligible(db, user.id)
\ No newline at end of file
+    return await CouponService.list_eligible(db, user.id)
\ No newline at end of file
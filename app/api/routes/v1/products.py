@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Depends, Response, Request, HTTPException, status, Body, Query, Form, UploadFile, File
 from sqlalchemy.orm import Session
-from db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.session import get_db, get_async_db
 from services.auth_service import request_otp, verify_otp_and_issue_tokens, refresh_tokens
-from schemas.products import ProductCreate, ProductResponse, PaginatedProducts
+from schemas.products import ProductCreate, ProductResponse, CursorPaginatedProducts, ProductSearchResults
 from typing import List, Optional
 from services.product_service import *
 from services.s3_service import s3_service
 from models.users import User
 from core.security import get_current_user_with_email_check
+from core.config import settings
+from services.product_view_service import record_product_view
+from utils.cache import catalog_cache
 
 
 router = APIRouter(prefix="/v1/products", tags=["Products"])
@@ -65,67 +69,95 @@ async def add_product(
 
     }
 
-# @router.get("/", response_model=PaginatedProducts)
-# def list_products(
-#     db: Session = Depends(get_db),
-#     page: int = Query(1, ge=1),
-#     limit: int = Query(10, ge=1, le=100),
-#     category: Optional[str] = None,
-#     subcategory: Optional[str] = None,
-#     search: Optional[str] = None,
-#     is_active: Optional[bool] = True,
-#     sort_by: Optional[str] = Query(None, description="Field to sort by: price, created_at, title, discounted_price"),
-#     sort_order: str = Query("asc", regex="^(asc|desc)$", description="Sort order: asc or desc"),
-# ):
-#     products, total = get_products_paginated(
-#         db=db,
-#         page=page,
-#         limit=limit,
-#         category=category,
-#         subcategory=subcategory,
-#         search=search,
-#         is_active=is_active,
-#         sort_by=sort_by,
-#         sort_order=sort_order,
-#     )
-
-#     return {
-#         "page": page,
-#         "limit": limit,
-#         "total": total,
-#         "pages": (total + limit - 1) // limit,
-#         "data": products,
-#     }
+@router.get("/", response_model=CursorPaginatedProducts)
+async def list_products(
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    category_id: Optional[int] = None,
+    subcategory_id: Optional[int] = None,
+    is_active: Optional[bool] = True,
+    sort_by: str = Query("newest", pattern="^(newest|price_asc|price_desc)$", description="newest, price_asc or price_desc"),
+):
+    """
+    Cursor-paginated product listing filtered by category, subcategory and active flag.
+    """
+    return await get_products_paginated(
+        db=db,
+        limit=limit,
+        cursor=cursor,
+        category_id=category_id,
+        subcategory_id=subcategory_id,
+        is_active=is_active,
+        sort_by=sort_by,
+    )
+
+@router.get("/search", response_model=ProductSearchResults)
+async def search_products_route(
+    q: str = Query(..., min_length=1, max_length=100),
+    category_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Ranked full-text product search with prefix matching.
+    """
+    return await search_products(db=db, query=q, limit=limit, offset=offset, category_id=category_id)
 
 @router.get("/top-viewed", response_model=list)
-def list_top_viewed_products(db: Session = Depends(get_db)):
+async def list_top_viewed_products(db: AsyncSession = Depends(get_async_db)):
     """
     List top 4 most viewed products for each category.
     """
     
-    return get_top_products_by_category(db=db, limit_per_category=4)
+    return await catalog_cache.get_or_set(
+        "products:top-viewed",
+        {"limit_per_category": 4},
+        settings.CATALOG_CACHE_TTL_TOP_VIEWED,
+        lambda: get_top_products_by_category(db=db, limit_per_category=4),
+    )
 
 @router.get("/category/{category_id}", response_model=list)
-def list_products_by_category(category_id: int, db: Session = Depends(get_db)):
+async def list_products_by_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     List all active products for a specific category.
     """
-    return get_products_by_category(db=db, category_id=category_id)
+    return await catalog_cache.get_or_set(
+        "products:category",
+        {"category_id": category_id},
+        settings.CATALOG_CACHE_TTL_PRODUCT_LISTS,
+        lambda: get_products_by_category(db=db, category_id=category_id),
+    )
 
 
 @router.get("/subcategory/{subcategory_id}", response_model=list)
-def list_products_by_subcategory(subcategory_id: int, db: Session = Depends(get_db)):
+async def list_products_by_subcategory(subcategory_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     List all active products for a specific subcategory.
     """
-    return get_products_by_subcategory(db=db, subcategory_id=subcategory_id)
+    return await catalog_cache.get_or_set(
+        "products:subcategory",
+        {"subcategory_id": subcategory_id},
+        settings.CATALOG_CACHE_TTL_PRODUCT_LISTS,
+        lambda: get_products_by_subcategory(db=db, subcategory_id=subcategory_id),
+    )
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+async def get_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     API endpoint to get a product by ID including its variations.
     """
-    return get_product_by_id(db, product_id)
+    product = await catalog_cache.get_or_set(
+        "products:detail",
+        {"product_id": product_id},
+        settings.CATALOG_CACHE_TTL_PRODUCT_DETAIL,
+        lambda: get_product_by_id(db, product_id),
+    )
+
+    # Count the view on every request (cache hits included)
+    await record_product_view(product_id)
+    return product
 
 
 @router.put("/{product_id}", response_model=dict)
@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Depends, Response, Request
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Response, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from db.session import get_db
 from core.security import get_current_user, get_current_user_with_email_check
@@ -6,6 +9,7 @@ from models.users import User
 from schemas.users import UserProfileSchema
 from utils.users import get_user_default_address, get_user_orders, get_user_orders_admin
 from schemas.order import OrderSchema
+from services.order_export_service import stream_admin_orders
 
 
 router = APIRouter(prefix="/v1/user", tags=["User"])
@@ -31,10 +35,16 @@ def get_profile(
 
 @router.get("/orders")
 def get_user_orders_route(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    summary: bool = Query(False, description="Leave out the item list of each order"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    orders = get_user_orders(db, current_user.id)
+    """
+    Cursor-paginated order history of the current user, newest first.
+    """
+    orders = get_user_orders(db, current_user.id, limit=limit, cursor=cursor, summary=summary)
     return orders
 
 @router.get("/orders/admin")
@@ -43,4 +53,25 @@ def get_all_user_orders_route(
     admin_user: User = Depends(get_current_user_with_email_check),
 ):
     orders = get_user_orders_admin(db)
-    return orders
\ No newline at end of file
+    return orders
+
+
+@router.get("/orders/admin/export")
+def export_all_user_orders_route(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    admin_user: User = Depends(get_current_user_with_email_check),
+):
+    """
+    Streams every placed order as NDJSON (one order per line) or CSV (one
+    row per order item), reading the table in batches.
+    """
+    if export_format == "csv":
+        media_type = "text/csv"
+    else:
+        media_type = "application/x-ndjson"
+
+    return StreamingResponse(
+        stream_admin_orders(export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="orders.{export_format}"'},
+    )
\ No newline at end of file
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.session import get_async_db
 from services.razorpay_service import razorpay_service
 from services.shiprocket_service import (
     verify_shiprocket_webhook_signature,
@@ -16,7 +16,7 @@ router = APIRouter(tags=["Webhooks"])
 
 
 @router.post("/v1/razorpay/webhook")
-async def razorpay_webhook(request: Request, db: Session = Depends(get_db)):
+async def razorpay_webhook(request: Request, db: AsyncSession = Depends(get_async_db)):
     payload = await request.body()
     signature = request.headers.get("X-Razorpay-Signature")
 
@@ -28,13 +28,13 @@ async def razorpay_webhook(request: Request, db: Session = Depends(get_db)):
 
     event = json.loads(payload.decode("utf-8"))
 
-    handle_razorpay_event(event, db)
+    await handle_razorpay_event(event, db)
 
     return {"status": "ok"}
 
 
 @router.post("/v1/shipr/webhook")
-async def shiprocket_webhook(request: Request, db: Session = Depends(get_db)):
+async def shiprocket_webhook(request: Request, db: AsyncSession = Depends(get_async_db)):
     payload = await request.body()
     auth_header_name = settings.SHIPROCKET_WEBHOOK_AUTH_HEADER
     auth_header_value = request.headers.get(auth_header_name)
@@ -52,6 +52,6 @@ async def shiprocket_webhook(request: Request, db: Session = Depends(get_db)):
         return {"status": "invalid signature"}
 
     event = json.loads(payload.decode("utf-8"))
-    handle_shiprocket_event(event, db)
+    await handle_shiprocket_event(event, db)
     return {"status": "ok"}
 
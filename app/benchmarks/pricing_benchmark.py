@@ -0,0 +1,101 @@
+"""
+Per-product vs batch dimension pricing on synthetic data (no database needed).
+
+    python -m benchmarks.pricing_benchmark --products 10000
+"""
+import argparse
+import random
+import time
+
+import db.base  # noqa: F401  load the model registry before utils.pricing
+from utils.pricing import (
+    build_dimension_pricing,
+    build_dimension_pricing_batch,
+    price_matrix,
+    round_price_to_9,
+)
+
+
+MULTIPLIERS = {"A5": 0.8, "A4": 1.0, "A3": 1.35, "A2": 1.8, "Poster": 2.2}
+
+
+def make_products(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    dimensions = list(MULTIPLIERS)
+    products = []
+    for _ in range(count):
+        price = round(rng.uniform(99, 4999), 2)
+        discounted = round(price * rng.uniform(0.6, 0.95), 2) if rng.random() < 0.7 else None
+        products.append((rng.sample(dimensions, rng.randint(1, len(dimensions))), price, discounted))
+    return products
+
+
+def per_product(products):
+    return [
+        build_dimension_pricing(dimensions, price, discounted, MULTIPLIERS)
+        for dimensions, price, discounted in products
+    ]
+
+
+def batch(products):
+    return build_dimension_pricing_batch(products, MULTIPLIERS)
+
+
+def scalar_matrix(products):
+    multipliers = list(MULTIPLIERS.values())
+    return [
+        [
+            (
+                round_price_to_9(price * m),
+                round_price_to_9(discounted * m) if discounted is not None else None,
+            )
+            for m in multipliers
+        ]
+        for _, price, discounted in products
+    ]
+
+
+def vector_matrix(products):
+    return price_matrix(
+        [price for _, price, _ in products],
+        [discounted for _, _, discounted in products],
+        list(MULTIPLIERS.values()),
+    )
+
+
+def best_of(fn, products, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(products)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    products = make_products(args.products)
+    if per_product(products) != batch(products):
+        raise SystemExit("batch pricing does not match per-product pricing")
+
+    loop_s = best_of(per_product, products, args.repeat)
+    batch_s = best_of(batch, products, args.repeat)
+    scalar_s = best_of(scalar_matrix, products, args.repeat)
+    vector_s = best_of(vector_matrix, products, args.repeat)
+    cells = sum(len(dimensions) for dimensions, _, _ in products)
+
+    print(f"products: {args.products}  price cells: {cells}  best of {args.repeat}")
+    print("response dicts (dimension_pricing per product)")
+    print(f"  per-product:   {loop_s * 1000:8.1f} ms")
+    print(f"  batch:         {batch_s * 1000:8.1f} ms  ({loop_s / batch_s:.1f}x)")
+    print(f"full price matrix ({args.products} x {len(MULTIPLIERS)})")
+    print(f"  scalar loop:   {scalar_s * 1000:8.1f} ms")
+    print(f"  price_matrix:  {vector_s * 1000:8.1f} ms  ({scalar_s / vector_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Latency and query counts for hot service functions against a seeded database.
+
+    python -m benchmarks.query_benchmark --label local
+    python -m benchmarks.query_benchmark --scales small,medium --iterations 30
+
+With --scales each size is reseeded (benchmarks.seed, --reset semantics)
+before it is measured; without it the current DATABASE_URL contents are used.
+Results go to benchmarks/results/<commit>-<label>.json for cross-commit diffs.
+Redis should be running (as in production); dramatiq messages go to a stub
+broker, and create_order uses COD so no gateway is called.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import dramatiq
+from dramatiq.brokers.stub import StubBroker
+
+# Actors bind to the current broker when their modules are imported
+dramatiq.set_broker(StubBroker())
+
+from sqlalchemy import event, func, select  # noqa: E402
+
+import db.base  # noqa: E402,F401  load the model registry before anything else
+from db.session import db as database, async_db  # noqa: E402
+from benchmarks.seed import SCALES, seed, table_counts, check_local_database  # noqa: E402
+from models.order import Order  # noqa: E402
+from models.products import Product  # noqa: E402
+from models.users import Address  # noqa: E402
+from services.coupon_service import CouponService  # noqa: E402
+from services.product_service import get_top_products_by_category  # noqa: E402
+from utils.order import OrderService  # noqa: E402
+from utils.users import get_user_orders  # noqa: E402
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+class QueryCounter:
+    """Counts statements executed on the sync and async engines."""
+
+    def __init__(self):
+        self.count = 0
+        for engine in (database.engine, async_db.engine.sync_engine):
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    @contextmanager
+    def measure(self):
+        start = self.count
+        result = {}
+        began = time.perf_counter()
+        yield result
+        result["ms"] = (time.perf_counter() - began) * 1000
+        result["queries"] = self.count - start
+
+
+def _summary(samples: List[dict]) -> dict:
+    latencies = sorted(s["ms"] for s in samples)
+    queries = [s["queries"] for s in samples]
+    return {
+        "iterations": len(samples),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+        "max_ms": round(latencies[-1], 3),
+        "queries_per_call": round(statistics.fmean(queries), 2),
+        "max_queries": max(queries),
+    }
+
+
+class Fixtures:
+    """Inputs picked from the seeded data: the heaviest user and a real cart."""
+
+    def __init__(self):
+        session = database.get_session()
+        try:
+            self.user_id = session.execute(
+                select(Order.user_id)
+                .group_by(Order.user_id)
+                .order_by(func.count().desc())
+                .limit(1)
+            ).scalar_one()
+            self.address_id = session.execute(
+                select(Address.id).where(Address.user_id == self.user_id).limit(1)
+            ).scalar_one()
+            products = session.execute(
+                select(Product.id, Product.dimensions)
+                .where(Product.is_active == True)
+                .order_by(Product.id)
+                .limit(3)
+            ).all()
+            self.cart = [
+                {"product_id": p.id, "dimension": p.dimensions[0], "qty": 1}
+                for p in products
+            ]
+        finally:
+            session.close()
+
+
+def _run_sync(counter: QueryCounter, fn: Callable, iterations: int) -> List[dict]:
+    samples = []
+    for i in range(iterations + 1):
+        session = database.get_session()
+        try:
+            with counter.measure() as sample:
+                fn(session, i)
+        finally:
+            session.close()
+        if i:  # first call warms caches and the pool
+            samples.append(sample)
+    return samples
+
+
+async def _run_async(counter: QueryCounter, fn: Callable, iterations: int) -> List[dict]:
+    samples = []
+    for i in range(iterations + 1):
+        async with async_db.get_session() as session:
+            with counter.measure() as sample:
+                await fn(session, i)
+        if i:
+            samples.append(sample)
+    return samples
+
+
+def run_cases(counter: QueryCounter, iterations: int) -> Dict[str, dict]:
+    fx = Fixtures()
+    run_id = uuid.uuid4().hex[:8]
+
+    def create_order(session, i):
+        OrderService.create_order(
+            session,
+            fx.user_id,
+            fx.cart,
+            address_id=fx.address_id,
+            payment_method="COD",
+            idempotency_key=f"bench-{run_id}-{i}",
+        )
+
+    results = {
+        "get_user_orders": _run_sync(counter, lambda s, i: get_user_orders(s, fx.user_id), iterations),
+        "create_order": _run_sync(counter, create_order, iterations),
+    }
+
+    async def run_async_cases():
+        try:
+            return {
+                "get_top_products_by_category": await _run_async(
+                    counter, lambda s, i: get_top_products_by_category(s), iterations
+                ),
+                "CouponService.list_eligible": await _run_async(
+                    counter, lambda s, i: CouponService.list_eligible(s, fx.user_id), iterations
+                ),
+            }
+        finally:
+            # asyncpg connections belong to this event loop; the next scale gets a new one
+            await async_db.engine.dispose()
+
+    results.update(asyncio.run(run_async_cases()))
+    return {name: _summary(samples) for name, samples in results.items()}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot service functions.")
+    parser.add_argument("--scales", help=f"comma-separated, reseeds each: {', '.join(SCALES)}")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default="current")
+    parser.add_argument("--output", help="JSON path (default benchmarks/results/<commit>-<label>.json)")
+    parser.add_argument("--allow-remote", action="store_true")
+    args = parser.parse_args()
+
+    counter = QueryCounter()
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "label": args.label,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "iterations": args.iterations,
+        "runs": {},
+    }
+
+    if args.scales:
+        check_local_database(args.allow_remote)
+        for scale in args.scales.split(","):
+            counts = seed(scale, args.seed, do_reset=True)
+            report["runs"][scale] = {"rows": counts, "results": run_cases(counter, args.iterations)}
+    else:
+        session = database.get_session()
+        try:
+            counts = table_counts(session)
+        finally:
+            session.close()
+        report["runs"][args.label] = {"rows": counts, "results": run_cases(counter, args.iterations)}
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit}-{args.label}.json"
+    os.makedirs(output.parent, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    for run, data in report["runs"].items():
+        print(f"[{run}] orders={data['rows'].get('orders')} products={data['rows'].get('products')}")
+        for name, summary in data["results"].items():
+            print(
+                f"  {name:<30} p50 {summary['p50_ms']:>9.2f} ms  p95 {summary['p95_ms']:>9.2f} ms"
+                f"  queries {summary['queries_per_call']:>6}"
+            )
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
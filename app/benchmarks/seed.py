@@ -0,0 +1,354 @@
+"""
+Deterministic scale-data seeder for local benchmarking.
+
+    python -m benchmarks.seed --scale small --reset
+    python -m benchmarks.seed --scale large --reset --seed 7
+
+Writes categories, subcategories, products (plus product_cards and
+analytics), dimension multipliers, coupons, users, addresses, orders, order
+items, payments and coupon usages into DATABASE_URL using the app's models.
+The same --scale and --seed always produce the same rows. Run migrations
+first; --reset truncates every seeded table.
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import make_url
+
+import db.base  # noqa: F401  load the model registry before anything else
+from db.session import db as database
+from models.coupon import Coupon, CouponRuleType, CouponUsage
+from models.order import Order, OrderItem, Payment
+from models.products import Category, DimensionPricing, Product, ProductAnalytics, SubCategory
+from models.users import Address, User
+from schemas.payment import OrderStatus, PaymentStatus
+from services.coupon_service import CouponService, invalidate_coupon_rules
+from services.product_card_service import refresh_product_cards
+from utils.pricing import round_price_to_9
+
+
+SCALES: Dict[str, Dict[str, int]] = {
+    "small": dict(categories=8, subcategories=5, products=2_000, users=1_000, orders=10_000, coupons=20),
+    "medium": dict(categories=12, subcategories=8, products=20_000, users=25_000, orders=250_000, coupons=50),
+    "large": dict(categories=16, subcategories=10, products=100_000, users=200_000, orders=2_000_000, coupons=100),
+}
+
+MULTIPLIERS = {"A5": 0.8, "A4": 1.0, "A3": 1.35, "A2": 1.8, "Poster": 2.2}
+
+# Weighted like a live shop: most orders complete, some abandoned at payment
+ORDER_STATUSES = (
+    [OrderStatus.FULFILLED] * 50 + [OrderStatus.CONFIRMED] * 20 + [OrderStatus.SHIPPED] * 15
+    + [OrderStatus.CREATED] * 10 + [OrderStatus.CANCELLED] * 5
+)
+
+SEEDED_TABLES = [
+    "coupon_user_usages", "coupon_usages", "payments", "order_items", "orders", "addresses", "users",
+    "coupons", "product_cards", "product_analytics", "products", "subcategories",
+    "categories", "dimension_pricing",
+]
+
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _batched(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Seeder:
+    def __init__(self, session, scale: Dict[str, int], seed: int, batch_size: int):
+        self.session = session
+        self.scale = scale
+        self.seed = seed
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.products: List[tuple] = []      # (id, price, discounted_price, dimensions)
+        self.user_ids: List[str] = []
+        self.coupon_ids: List[int] = []
+
+    def _insert(self, model, rows: Iterable[dict]) -> int:
+        count = 0
+        for batch in _batched(rows, self.batch_size):
+            self.session.execute(insert(model.__table__), batch)
+            count += len(batch)
+        return count
+
+    def _user_id(self, n: int) -> str:
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"xsnapster-seed-{self.seed}-user-{n}"))
+
+    def catalog(self) -> None:
+        self._insert(DimensionPricing, (
+            {"id": i, "name": name, "multiplier": multiplier}
+            for i, (name, multiplier) in enumerate(MULTIPLIERS.items(), start=1)
+        ))
+
+        categories = self.scale["categories"]
+        per_category = self.scale["subcategories"]
+        self._insert(Category, (
+            {"id": c, "name": f"Category {c}", "slug": f"category-{c}", "one_liner": f"Seeded category {c}"}
+            for c in range(1, categories + 1)
+        ))
+        self._insert(SubCategory, (
+            {
+                "id": (c - 1) * per_category + s,
+                "name": f"Subcategory {c}.{s}",
+                "slug": f"subcategory-{c}-{s}",
+                "category_id": c,
+            }
+            for c in range(1, categories + 1)
+            for s in range(1, per_category + 1)
+        ))
+
+        rng = self.rng
+        dimensions = list(MULTIPLIERS)
+        rows = []
+        for p in range(1, self.scale["products"] + 1):
+            category_id = rng.randint(1, categories)
+            price = float(rng.randrange(199, 4999, 10))
+            discounted = float(round(price * rng.uniform(0.6, 0.95))) if rng.random() < 0.7 else None
+            dims = sorted(rng.sample(dimensions, rng.randint(1, len(dimensions))), key=dimensions.index)
+            created_at = EPOCH + timedelta(minutes=rng.randrange(0, 365 * 24 * 60))
+            self.products.append((p, price, discounted, dims))
+            rows.append({
+                "id": p,
+                "title": f"Poster {p} {rng.choice(['Sunset', 'Skyline', 'Forest', 'Ocean', 'Neon', 'Retro'])}",
+                "slug": f"poster-{p}",
+                "one_liner": "Seeded product",
+                "description": "Generated by benchmarks.seed",
+                "image_links": [f"https://example.invalid/products/{p}.webp"],
+                "price": price,
+                "discounted_price": discounted,
+                "dimensions": dims,
+                "is_active": rng.random() < 0.95,
+                "category_id": category_id,
+                "subcategory_id": (category_id - 1) * per_category + rng.randint(1, per_category),
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        self._insert(Product, rows)
+
+        self._insert(ProductAnalytics, (
+            {"product_id": p[0], "view_count": int(rng.paretovariate(1.2) * 10)}
+            for p in self.products
+        ))
+
+    def coupons(self) -> None:
+        rng = self.rng
+        rows = []
+        for c in range(1, self.scale["coupons"] + 1):
+            percent = c % 2 == 1
+            rows.append({
+                "id": c,
+                "code": f"SEED{c:04d}",
+                "rule_type": CouponRuleType.PERCENT_CART if percent else CouponRuleType.BUY_N_GET_M_SAME_DIMENSION,
+                "percent_off": float(rng.choice([5, 10, 15, 20])) if percent else None,
+                "required_qty": None if percent else 3,
+                "free_qty": None if percent else 1,
+                "eligible_dimensions": None if percent or rng.random() < 0.5 else ["A4", "A3"],
+                "is_active": rng.random() < 0.8,
+                "max_total_uses": rng.choice([None, 1_000, 100_000]),
+                "max_uses_per_user": rng.choice([None, 1, 3]),
+            })
+            self.coupon_ids.append(c)
+        self._insert(Coupon, rows)
+
+    def users(self) -> None:
+        rng = self.rng
+        self.user_ids = [self._user_id(n) for n in range(1, self.scale["users"] + 1)]
+        self._insert(User, (
+            {
+                "id": user_id,
+                "email": f"user{n}@seed.invalid",
+                "phone_number": f"9{n:09d}",
+                "is_verified": True,
+                "is_active": True,
+            }
+            for n, user_id in enumerate(self.user_ids, start=1)
+        ))
+        self._insert(Address, (
+            {
+                "id": n,
+                "user_id": user_id,
+                "name": f"User {n}",
+                "address_line": f"{rng.randint(1, 999)} Seed Street",
+                "city": rng.choice(["Mumbai", "Delhi", "Pune", "Bengaluru", "Chennai"]),
+                "state": "MH",
+                "zip_code": f"{rng.randint(110000, 799999)}",
+                "is_default": True,
+                "address_type": "Home",
+                "phone_number": f"9{n:09d}",
+            }
+            for n, user_id in enumerate(self.user_ids, start=1)
+        ))
+
+    def orders(self) -> None:
+        """Orders with items, payments and coupon usages, streamed in batches."""
+        rng = self.rng
+        # Skewed so a few heavy users have long histories
+        cum_weights = list(accumulate(1.0 / (rank ** 0.8) for rank in range(1, len(self.user_ids) + 1)))
+        item_id = 0
+
+        for start in range(1, self.scale["orders"] + 1, self.batch_size):
+            end = min(start + self.batch_size, self.scale["orders"] + 1)
+            user_indexes = rng.choices(range(len(self.user_ids)), cum_weights=cum_weights, k=end - start)
+            orders, items, payments, usages = [], [], [], []
+
+            for order_id, user_index in zip(range(start, end), user_indexes):
+                status = rng.choice(ORDER_STATUSES)
+                created_at = EPOCH + timedelta(seconds=rng.randrange(0, 365 * 24 * 3600))
+                subtotal, quantity = 0.0, 0
+
+                for _ in range(rng.choice([1, 1, 1, 2, 2, 3, 4])):
+                    product_id, price, discounted, dims = rng.choice(self.products)
+                    dimension = rng.choice(dims)
+                    unit = float(round_price_to_9((discounted or price) * MULTIPLIERS[dimension]))
+                    qty = rng.randint(1, 3)
+                    item_id += 1
+                    items.append({
+                        "id": item_id, "order_id": order_id, "product_id": product_id,
+                        "quantity": qty, "price": unit, "dimension": dimension,
+                    })
+                    subtotal += unit * qty
+                    quantity += qty
+
+                coupon_id = rng.choice(self.coupon_ids) if self.coupon_ids and rng.random() < 0.1 else None
+                discount = round(subtotal * 0.1, 2) if coupon_id else 0.0
+                after = round(subtotal - discount, 2)
+                delivery = 0.0 if after >= 999 else 99.0
+                amount = round(after + delivery, 2)
+                cod = rng.random() < 0.3
+
+                orders.append({
+                    "id": order_id,
+                    "user_id": self.user_ids[user_index],
+                    "idempotency_key": f"seed-{order_id}",
+                    "delivery_name": f"User {user_index + 1}",
+                    "delivery_phone_number": f"9{user_index + 1:09d}",
+                    "delivery_address_line": "Seed Street",
+                    "delivery_city": "Mumbai",
+                    "delivery_state": "MH",
+                    "delivery_zip_code": "400001",
+                    "delivery_address_type": "Home",
+                    "quantity": quantity,
+                    "items_subtotal": round(subtotal, 2),
+                    "subtotal_before_coupon": round(subtotal, 2) if coupon_id else None,
+                    "coupon_discount_amount": discount,
+                    "subtotal_after_coupon": after if coupon_id else None,
+                    "coupon_id": coupon_id,
+                    "coupon_code": f"SEED{coupon_id:04d}" if coupon_id else None,
+                    "delivery_charge": delivery,
+                    "amount": amount,
+                    "order_status": status,
+                    "created_at": created_at,
+                })
+                payments.append({
+                    "id": order_id,
+                    "order_id": order_id,
+                    "payment_method": "COD" if cod else "RAZORPAY",
+                    "gateway_order_id": None if cod else f"order_seed{order_id}",
+                    "transaction_id": None if cod or status == OrderStatus.CREATED else f"pay_seed{order_id}",
+                    "amount": amount,
+                    "status": (
+                        PaymentStatus.CREATED if status == OrderStatus.CREATED
+                        else PaymentStatus.FAILED if status == OrderStatus.CANCELLED
+                        else PaymentStatus.SUCCESS
+                    ),
+                    "created_at": created_at,
+                })
+                if coupon_id:
+                    usages.append({
+                        "coupon_id": coupon_id,
+                        "user_id": self.user_ids[user_index],
+                        "order_id": order_id,
+                        "used_at": created_at,
+                    })
+
+            self._insert(Order, orders)
+            self._insert(OrderItem, items)
+            self._insert(Payment, payments)
+            self._insert(CouponUsage, usages)
+            self.session.commit()
+            print(f"  orders {end - 1}/{self.scale['orders']}", flush=True)
+
+    def finish(self) -> None:
+        # Explicit ids were used, so move every serial past them
+        for table in ["categories", "subcategories", "products", "dimension_pricing", "coupons",
+                      "addresses", "orders", "order_items", "payments"]:
+            self.session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+            ))
+        CouponService.rebuild_usage_counters(self.session)
+        invalidate_coupon_rules()
+        refresh_product_cards(self.session, multiplier_map=dict(MULTIPLIERS))
+        self.session.commit()
+
+
+def table_counts(session) -> Dict[str, int]:
+    return {
+        table: session.execute(select(func.count()).select_from(text(table))).scalar()
+        for table in reversed(SEEDED_TABLES)
+    }
+
+
+def reset(session) -> None:
+    session.execute(text(f"TRUNCATE {', '.join(SEEDED_TABLES)} RESTART IDENTITY CASCADE"))
+    session.commit()
+
+
+def seed(scale_name: str, seed_value: int = 42, batch_size: int = 5_000, do_reset: bool = False) -> Dict[str, int]:
+    session = database.get_session()
+    try:
+        if do_reset:
+            reset(session)
+        elif session.execute(select(func.count()).select_from(Product)).scalar():
+            raise SystemExit("Database already has products; pass --reset to reseed")
+
+        seeder = Seeder(session, SCALES[scale_name], seed_value, batch_size)
+        started = time.perf_counter()
+        for step in (seeder.catalog, seeder.coupons, seeder.users):
+            step()
+            session.commit()
+        seeder.orders()
+        seeder.finish()
+        print(f"Seeded '{scale_name}' in {time.perf_counter() - started:.1f}s")
+        return table_counts(session)
+    finally:
+        session.close()
+
+
+def check_local_database(allow_remote: bool) -> None:
+    host = make_url(str(database.engine.url)).host or "localhost"
+    if not allow_remote and host not in ("localhost", "127.0.0.1", "::1", "db", "postgres"):
+        raise SystemExit(f"Refusing to seed non-local database host '{host}' (use --allow-remote)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed deterministic benchmark data into DATABASE_URL.")
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--reset", action="store_true", help="truncate seeded tables first")
+    parser.add_argument("--allow-remote", action="store_true")
+    args = parser.parse_args()
+
+    check_local_database(args.allow_remote)
+    counts = seed(args.scale, args.seed, args.batch_size, args.reset)
+    for table, count in counts.items():
+        print(f"  {table:<20} {count:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,21 @@ ENV_FILE = BASE_DIR / ".env"
 class Settings(BaseSettings):
     PROJECT_NAME: str
     DATABASE_URL: str
+    # Optional explicit asyncpg URL; derived from DATABASE_URL when empty
+    ASYNC_DATABASE_URL: str = ""
+
+    # Connection pool profiles: "api" for gunicorn, "worker" for dramatiq
+    DB_POOL_PROFILE: str = "api"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    ASYNC_DB_POOL_SIZE: int = 10
+    ASYNC_DB_MAX_OVERFLOW: int = 10
+    WORKER_DB_POOL_SIZE: int = 8
+    WORKER_DB_MAX_OVERFLOW: int = 2
+    WORKER_DB_POOL_TIMEOUT: float = 60.0
+    WORKER_DB_POOL_RECYCLE: int = 1800
     SECRET_KEY: str
     REFRESH_SECRET_KEY: str
     ALGORITHM: str
@@ -32,10 +47,40 @@ class Settings(BaseSettings):
     RAZORPAY_KEY_SECRET: str
 
     RAZORPAY_WEBHOOK_SECRET: str
+    # Razorpay orders still without a gateway order id after this long are cancelled
+    RAZORPAY_ATTACH_TIMEOUT: int = 900
+
+    # Redis idempotency layer for order creation (seconds); the claim must
+    # outlive a full checkout including the Razorpay call
+    ORDER_IDEMPOTENCY_CLAIM_TTL: int = 60
+    ORDER_IDEMPOTENCY_RESPONSE_TTL: int = 86400
+
+    # Outbox relay (tasks/outbox_relay.py)
+    OUTBOX_RELAY_BATCH_SIZE: int = 200
+    OUTBOX_RELAY_POLL_INTERVAL: float = 0.5
+    # A failed send waits BASE * 2^attempts seconds (capped); 10 attempts
+    # span over an hour of broker outage before a message is parked
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_RETRY_BASE_DELAY: float = 5.0
+    OUTBOX_RETRY_MAX_DELAY: float = 1800.0
 
     REDIS_HOST: str
     REDIS_PORT: int
     REDIS_DB: int
+    REDIS_SOCKET_TIMEOUT: float = 1.0
+
+    DIMENSION_PRICING_CACHE_TTL: int = 300
+    # Compiled coupons and the active-code set are reloaded at least this
+    # often, since coupons are edited in the database;
+    # POST /v1/admin/cache/coupons/invalidate drops them in every process at once
+    COUPON_RULE_CACHE_TTL: int = 60
+    PRODUCT_VIEW_FLUSH_INTERVAL: int = 30
+
+    # Catalog response cache TTLs (seconds); writes invalidate immediately
+    CATALOG_CACHE_TTL_CATEGORIES: int = 3600
+    CATALOG_CACHE_TTL_PRODUCT_LISTS: int = 600
+    CATALOG_CACHE_TTL_TOP_VIEWED: int = 120
+    CATALOG_CACHE_TTL_PRODUCT_DETAIL: int = 300
 
     OTP_MAIL: str
     ORDER_MAIL: str
@@ -54,6 +99,24 @@ class Settings(BaseSettings):
     SHIPROCKET_WEBHOOK_SIGNATURE_HEADER: str = "X-Shiprocket-Signature"
     WAREHOUSE_PINCODE: str = "209727"
 
+    def db_pool_options(self, async_engine: bool = False) -> dict:
+        """Pool kwargs for Database/AsyncDatabase based on DB_POOL_PROFILE."""
+        if self.DB_POOL_PROFILE == "worker":
+            # Workers never serve async routes; keep that pool minimal
+            return {
+                "pool_size": 1 if async_engine else self.WORKER_DB_POOL_SIZE,
+                "max_overflow": 0 if async_engine else self.WORKER_DB_MAX_OVERFLOW,
+                "pool_timeout": self.WORKER_DB_POOL_TIMEOUT,
+                "pool_recycle": self.WORKER_DB_POOL_RECYCLE,
+            }
+
+        return {
+            "pool_size": self.ASYNC_DB_POOL_SIZE if async_engine else self.DB_POOL_SIZE,
+            "max_overflow": self.ASYNC_DB_MAX_OVERFLOW if async_engine else self.DB_MAX_OVERFLOW,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+        }
+
     class Config:
         env_file = ENV_FILE
         env_file_encoding = "utf-8"
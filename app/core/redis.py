@@ -0,0 +1,18 @@
+import redis
+import redis.asyncio as aioredis
+
+from core.config import settings
+
+
+_connection_kwargs = dict(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=settings.REDIS_DB,
+    decode_responses=True,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+)
+
+# Shared application clients (the dramatiq broker keeps its own connection)
+redis_client = redis.Redis(**_connection_kwargs)
+async_redis_client = aioredis.Redis(**_connection_kwargs)
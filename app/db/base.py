@@ -5,6 +5,7 @@ Base = declarative_base()
 
 from models.users import User, OTP, Address
 from models.refresh_token import RefreshToken
-from models.products import Product, ProductAnalytics, Category, SubCategory
+from models.products import Product, ProductAnalytics, ProductViewFlush, Category, SubCategory, ProductCard
 from models.order import Order, Payment
-from models.coupon import Coupon, CouponUsage
\ No newline at end of file
+from models.coupon import Coupon, CouponUsage, CouponUserUsage
+from models.outbox import OutboxMessage
\ No newline at end of file
@@ -1,6 +1,13 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from db.base import Base
+from db.pool_stats import (
+    TimedAsyncAdaptedQueuePool,
+    TimedQueuePool,
+    attach_pool_stats,
+)
 
 
 class Database:
@@ -8,15 +15,21 @@ class Database:
         self, 
         db_url: str,
         pool_size: int = 5,
-        max_overflow: int = 0        
+        max_overflow: int = 0,
+        pool_timeout: float = 30,
+        pool_recycle: int = 3600,
+        name: str = "sync"
     ):
         self.engine = create_engine(
             db_url,
+            poolclass=TimedQueuePool,
             pool_pre_ping=True,
-            pool_recycle=3600,
+            pool_recycle=pool_recycle,
             pool_size=pool_size,
             max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
         )
+        attach_pool_stats(self.engine, name)
 
         self.SessionLocal = sessionmaker(
             autocommit=False,
@@ -31,5 +44,58 @@ class Database:
     def get_session(self):
         return self.SessionLocal()
 
+    def pool_stats(self) -> dict:
+        return self.engine.pool.stats.snapshot()
+
     def close(self):
         self.engine.dispose()
+
+
+class AsyncDatabase:
+    """
+    asyncpg-backed engine for routes that should not block the event loop.
+    Sessions never expire on commit, so loaded objects stay readable after
+    the transaction ends (no implicit lazy IO in async code).
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        pool_size: int = 5,
+        max_overflow: int = 0,
+        pool_timeout: float = 30,
+        pool_recycle: int = 3600,
+        name: str = "async"
+    ):
+        self.engine = create_async_engine(
+            self.to_async_url(db_url),
+            poolclass=TimedAsyncAdaptedQueuePool,
+            pool_pre_ping=True,
+            pool_recycle=pool_recycle,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+        )
+        attach_pool_stats(self.engine.sync_engine, name)
+
+        self.SessionLocal = async_sessionmaker(
+            bind=self.engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+    @staticmethod
+    def to_async_url(db_url: str) -> str:
+        url = make_url(db_url)
+        if url.drivername.startswith("postgresql"):
+            url = url.set(drivername="postgresql+asyncpg")
+        return url.render_as_string(hide_password=False)
+
+    def get_session(self):
+        return self.SessionLocal()
+
+    def pool_stats(self) -> dict:
+        return self.engine.sync_engine.pool.stats.snapshot()
+
+    async def close(self):
+        await self.engine.dispose()
@@ -1,4 +1,4 @@
-from db.database import Database
+from db.database import Database, AsyncDatabase
 from core.config import settings
 from db.base import Base
 
@@ -7,8 +7,14 @@ target_metadata = Base.metadata
 
 db = Database(
     settings.DATABASE_URL,
-    pool_size=1,
-    max_overflow=1
+    name="sync",
+    **settings.db_pool_options()
+)
+
+async_db = AsyncDatabase(
+    settings.ASYNC_DATABASE_URL or settings.DATABASE_URL,
+    name="async",
+    **settings.db_pool_options(async_engine=True)
 )
 
 
@@ -20,6 +26,11 @@ def get_db():
         session.close()
 
 
+async def get_async_db():
+    async with async_db.get_session() as session:
+        yield session
+
+
 def get_db_session():
     session = db.get_session()
     return session 
@@ -2,7 +2,7 @@ from fastapi import FastAPI
 from db.base import Base
 from db.session import db, get_db
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes.v1 import auth, products, users, category, address, order, webhook, coupon
+from api.routes.v1 import auth, products, users, category, address, order, webhook, coupon, admin
 from core.error_handlers import setup_exception_handlers
 import core.dramatiq
 
@@ -43,6 +43,7 @@ app.include_router(address.router)
 app.include_router(order.router)
 app.include_router(webhook.router)
 app.include_router(coupon.router)
+app.include_router(admin.router)
 
 @app.get("/", tags=["Root"])
 def root():
@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
@@ -44,6 +45,7 @@ class Coupon(Base):
             "required_qty IS NULL OR free_qty IS NULL OR required_qty > free_qty",
             name="ck_coupon_required_gt_free",
         ),
+        CheckConstraint("uses_count >= 0", name="ck_coupon_uses_count_non_negative"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -67,6 +69,9 @@ class Coupon(Base):
     max_total_uses = Column(Integer, nullable=True)
     max_uses_per_user = Column(Integer, nullable=True)
 
+    # Denormalized count of coupon_usages rows, claimed with a conditional UPDATE
+    uses_count = Column(Integer, nullable=False, server_default=text("0"))
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True),
@@ -85,6 +90,9 @@ class CouponUsage(Base):
     __table_args__ = (
         UniqueConstraint("coupon_id", "user_id", "order_id", name="uq_coupon_user_order"),
         UniqueConstraint("order_id", name="uq_coupon_usage_order"),
+        # (coupon_id) and (coupon_id, user_id) lookups use uq_coupon_user_order's prefix;
+        # this one serves "all usages by one user", grouped per coupon
+        Index("ix_coupon_usages_user_coupon", "user_id", "coupon_id"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -97,3 +105,16 @@ class CouponUsage(Base):
     coupon = relationship("Coupon", back_populates="usages")
     user = relationship("User", back_populates="coupon_usages")
     order = relationship("Order", back_populates="coupon_usage")
+
+
+class CouponUserUsage(Base):
+    """Per-user count of coupon_usages rows, maintained alongside Coupon.uses_count."""
+    __tablename__ = "coupon_user_usages"
+
+    __table_args__ = (
+        CheckConstraint("uses_count >= 0", name="ck_coupon_user_uses_count_non_negative"),
+    )
+
+    coupon_id = Column(Integer, ForeignKey("coupons.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    uses_count = Column(Integer, nullable=False, server_default=text("0"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey,Boolean,text, DateTime, JSON, Enum as SAEnum, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, ForeignKey,Boolean,text, DateTime, JSON, Enum as SAEnum, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from db.base import Base  
@@ -74,6 +74,18 @@ class Order(Base):
     payment = relationship("Payment", uselist=False, back_populates="order")
 
 
+# Keyset pagination of a user's order history, newest first
+Index("ix_orders_user_created", Order.user_id, Order.created_at.desc(), Order.id.desc())
+
+# Admin order search (services/order_search_service.py)
+Index("ix_orders_created", Order.created_at.desc(), Order.id.desc())
+Index("ix_orders_status_created", Order.order_status, Order.created_at.desc(), Order.id.desc())
+Index("ix_orders_coupon_id", Order.coupon_id)
+Index("ix_orders_coupon_code_created", Order.coupon_code, Order.created_at.desc(), postgresql_where=Order.coupon_code.isnot(None))
+Index("ix_orders_courier_created", Order.courier_name, Order.created_at.desc(), postgresql_where=Order.courier_name.isnot(None))
+Index("ix_orders_unserviceable_created", Order.created_at.desc(), Order.id.desc(), postgresql_where=Order.serviceable == False)
+
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
@@ -0,0 +1,32 @@
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from db.base import Base
+
+
+class OutboxMessage(Base):
+    """
+    A dramatiq message written in the same transaction as the state change
+    that triggers it. tasks/outbox_relay.py enqueues pending rows to the
+    broker and deletes them; a row whose attempts reached
+    OUTBOX_MAX_ATTEMPTS is parked (kept, never sent) for inspection.
+    Only unparked rows are in the relay's index, so parked rows cost it nothing.
+    """
+    __tablename__ = "outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    actor_name = Column(String(100), nullable=False)
+    args = Column(JSONB, nullable=False, server_default=text("'[]'::jsonb"))
+    delay_ms = Column(Integer, nullable=True)
+
+    attempts = Column(Integer, nullable=False, server_default=text("0"))
+    last_error = Column(Text, nullable=True)
+    # Failed sends are retried from here, with exponential backoff
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    parked = Column(Boolean, nullable=False, server_default=text("false"))
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+Index("ix_outbox_unparked_id", OutboxMessage.id, postgresql_where=text("NOT parked"))
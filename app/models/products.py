@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, Text, Boolean, DateTime, func, ForeignKey
-from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Text, Boolean, DateTime, func, ForeignKey, Index, JSON, text, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 
 
@@ -66,6 +66,10 @@ class Product(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    # Maintained by the products_search_vector trigger (title, one_liner,
+    # category/subcategory names, description); never written by the app
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+
     # Relationships
     category_rel = relationship("Category", back_populates="products")
     subcategory_rel = relationship("SubCategory", back_populates="products")
@@ -76,12 +80,19 @@ class Product(Base):
         return f"<Product(title='{self.title}', price={self.price}, dimensions={self.dimensions})>"
 
 
+Index("ix_products_search_vector", Product.search_vector, postgresql_using="gin")
+
+
 # ========================
 # PRODUCT ANALYTICS
 # ========================
 
 class ProductAnalytics(Base):
     __tablename__ = "product_analytics"
+    __table_args__ = (
+        # One row per product; the view flush upserts on it
+        UniqueConstraint("product_id", name="uq_product_analytics_product_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
@@ -100,6 +111,14 @@ class ProductAnalytics(Base):
     product = relationship("Product", back_populates="analytics")
 
 
+class ProductViewFlush(Base):
+    """Redis view snapshots already added to product_analytics, so a retried flush skips them."""
+    __tablename__ = "product_view_flushes"
+
+    flush_id = Column(String(32), primary_key=True)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 
 
 class DimensionPricing(Base):
@@ -108,3 +127,53 @@ class DimensionPricing(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, nullable=False)  # e.g. "A4", "A3", "Poster"
     multiplier = Column(Float, nullable=False, default=1.0)  # e.g. 1.2 = +20%
+
+
+
+
+# ========================
+# PRODUCT CARDS (read model)
+# ========================
+
+class ProductCard(Base):
+    """
+    Denormalized listing row per product: names, primary image, per-dimension
+    prices and view count. Written only by services/product_card_service.py
+    (product/category/pricing writes) and the view flush; list endpoints read
+    it without joins.
+    """
+    __tablename__ = "product_cards"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    title = Column(String(255), nullable=False)
+    slug = Column(String(255), nullable=False)
+    one_liner = Column(String(255), nullable=True)
+    description = Column(Text, nullable=True)
+    image_link = Column(String, nullable=False, server_default="")
+
+    category_id = Column(Integer, nullable=True)
+    category_name = Column(String(100), nullable=True)
+    subcategory_id = Column(Integer, nullable=True)
+    subcategory_name = Column(String(100), nullable=True)
+
+    price = Column(Float, nullable=False)
+    discounted_price = Column(Float, nullable=True)
+    effective_price = Column(Float, nullable=False)
+    dimensions = Column(ARRAY(String), nullable=True)
+    # JSON (not JSONB) keeps the dimension order of the product
+    dimension_pricing = Column(JSON, nullable=False, server_default=text("'{}'::json"))
+
+    view_count = Column(Integer, nullable=False, server_default=text("0"))
+    is_active = Column(Boolean, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+Index("ix_product_cards_category_active_created", ProductCard.category_id, ProductCard.is_active, ProductCard.created_at.desc(), ProductCard.product_id.desc())
+Index("ix_product_cards_subcategory_active_created", ProductCard.subcategory_id, ProductCard.is_active, ProductCard.created_at.desc(), ProductCard.product_id.desc())
+Index("ix_product_cards_active_created", ProductCard.is_active, ProductCard.created_at.desc(), ProductCard.product_id.desc())
+Index("ix_product_cards_category_active_price", ProductCard.category_id, ProductCard.is_active, ProductCard.effective_price, ProductCard.product_id)
+Index("ix_product_cards_subcategory_active_price", ProductCard.subcategory_id, ProductCard.is_active, ProductCard.effective_price, ProductCard.product_id)
+Index("ix_product_cards_active_price", ProductCard.is_active, ProductCard.effective_price, ProductCard.product_id)
+Index("ix_product_cards_category_active_views", ProductCard.category_id, ProductCard.is_active, ProductCard.view_count.desc(), ProductCard.created_at.desc())
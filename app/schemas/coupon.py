@@ -37,4 +37,32 @@ class CouponListItemResponse(BaseModel):
     ends_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class BestCouponsRequest(BaseModel):
+    items: List[CartItem]
+
+
+class CouponOffer(BaseModel):
+    code: str
+    rule_type: CouponRuleTypeLiteral
+    percent_off: Optional[float] = None
+    required_qty: Optional[int] = None
+    free_qty: Optional[int] = None
+    applicable: bool
+    reason: Optional[str] = None   # why the cart does not qualify
+    matched_dimension: Optional[str] = None
+    coupon_discount_amount: Optional[float] = None
+    subtotal_after_coupon: Optional[float] = None
+    delivery_charge: Optional[float] = None
+    amount: Optional[float] = None
+    savings: Optional[float] = None  # amount without coupon - amount with it
+
+
+class BestCouponsResponse(BaseModel):
+    items_subtotal: float          # raw cart total before discount
+    delivery_charge: float
+    amount: float                  # total without any coupon
+    best: Optional[str] = None     # code of the first applicable offer
+    coupons: List[CouponOffer]     # applicable (best first), then not applicable
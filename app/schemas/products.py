@@ -69,4 +69,16 @@ class PaginatedProducts(BaseModel):
     data: List[ProductResponse]  # list of products
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class CursorPaginatedProducts(BaseModel):
+    limit: int
+    next_cursor: Optional[str] = None
+    data: List[dict]
+
+
+class ProductSearchResults(BaseModel):
+    limit: int
+    offset: int
+    data: List[dict]
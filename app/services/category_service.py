@@ -1,8 +1,13 @@
 from slugify import slugify
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.products import Category, SubCategory
 from typing import Optional, List
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from utils.cache import catalog_cache
+from services.product_card_service import refresh_product_cards
 
 
 
@@ -36,6 +41,7 @@ def create_or_get_category(
         db.add(category)
         db.commit()
         db.refresh(category)
+        catalog_cache.invalidate()
 
     return category
 
@@ -44,8 +50,8 @@ def create_or_get_category(
 
 
 
-def get_all_categories(db: Session):
-    return db.query(Category).all()
+async def get_all_categories(db: AsyncSession):
+    return (await db.execute(select(Category))).scalars().all()
 
 
 def get_category_by_id(db: Session, category_id: int):
@@ -55,14 +61,24 @@ def get_category_by_id(db: Session, category_id: int):
     return category
 
 
+async def get_category_by_id_async(db: AsyncSession, category_id: int):
+    category = await db.get(Category, category_id)
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return category
+
+
 def update_category(db: Session, category_id: int, name: str = None, one_liner: str = None):
     category = get_category_by_id(db, category_id)
     if name:
         category.name = name
+        db.flush()
+        refresh_product_cards(db, category_id=category.id)
     if one_liner:
         category.one_liner = one_liner
     db.commit()
     db.refresh(category)
+    catalog_cache.invalidate()
     return category
 
 
@@ -73,6 +89,7 @@ def delete_category(db: Session, category_id: int):
     try:
         db.delete(category)
         db.commit()
+        catalog_cache.invalidate()
         return {"message": "Category deleted successfully"}
     except IntegrityError:
         db.rollback()
@@ -92,6 +109,7 @@ def create_multiple_subcategories(
     Returns a list of subcategory dicts.
     """
     subcategories = []
+    created = False
 
     for name in subcategory_names:
         name = name.strip()
@@ -108,6 +126,7 @@ def create_multiple_subcategories(
             db.add(subcategory)
             db.commit()
             db.refresh(subcategory)
+            created = True
 
         subcategories.append({
             "id": subcategory.id,
@@ -116,18 +135,24 @@ def create_multiple_subcategories(
             "category_id": subcategory.category_id,
         })
 
+    if created:
+        catalog_cache.invalidate()
+
     return subcategories
 
-def get_all_subcategories(db: Session):
+async def get_all_subcategories(db: AsyncSession):
     return (
-        db.query(SubCategory)
-        .options(joinedload(SubCategory.category))  # eager load category
-        .all()
-    )
+        await db.execute(
+            select(SubCategory)
+            .options(joinedload(SubCategory.category))  # eager load category
+        )
+    ).scalars().all()
 
 
-def get_subcategories_by_category(db: Session, category_id: int):
-    return db.query(SubCategory).filter(SubCategory.category_id == category_id).all()
+async def get_subcategories_by_category(db: AsyncSession, category_id: int):
+    return (
+        await db.execute(select(SubCategory).where(SubCategory.category_id == category_id))
+    ).scalars().all()
 
 
 def get_subcategory_by_id(db: Session, subcategory_id: int):
@@ -141,8 +166,11 @@ def update_subcategory(db: Session, subcategory_id: int, name: str = None):
     subcategory = get_subcategory_by_id(db, subcategory_id)
     if name:
         subcategory.name = name
+        db.flush()
+        refresh_product_cards(db, subcategory_id=subcategory.id)
     db.commit()
     db.refresh(subcategory)
+    catalog_cache.invalidate()
     return subcategory
 
 
@@ -151,6 +179,7 @@ def delete_subcategory(db: Session, subcategory_id: int):
     try:
         db.delete(subcategory)
         db.commit()
+        catalog_cache.invalidate()
         return {"message": "Subcategory deleted successfully"}
     except IntegrityError:
         db.rollback()
@@ -0,0 +1,122 @@
+"""
+Coupon discount rules.
+
+Each rule type is a frozen dataclass registered with @register_rule; a Coupon
+row is compiled once into its rule (compile_rule) and the rule object is then
+reused for every cart. A new rule type only needs a CouponRuleType member and
+a registered class here — order creation and checkout pricing go through
+CouponRule.discount and never dispatch on rule_type themselves.
+"""
+from dataclasses import dataclass
+from typing import ClassVar, Dict, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+
+from models.coupon import CouponRuleType
+
+
+# (unit price, quantity, dimension) of one priced cart line
+PricedUnit = Tuple[float, int, str]
+
+RULES: Dict[CouponRuleType, Type["CouponRule"]] = {}
+
+
+def register_rule(rule_type: CouponRuleType):
+    def decorator(cls: Type["CouponRule"]) -> Type["CouponRule"]:
+        cls.rule_type = rule_type
+        RULES[rule_type] = cls
+        return cls
+    return decorator
+
+
+@dataclass(frozen=True)
+class CouponRule:
+    rule_type: ClassVar[CouponRuleType]
+
+    @classmethod
+    def from_model(cls, coupon) -> "CouponRule":
+        raise NotImplementedError
+
+    def discount(self, lines: Sequence[PricedUnit]) -> Tuple[float, Optional[str]]:
+        """
+        (discount amount, matched dimension) for the priced lines; raises
+        HTTPException 400 if the cart does not qualify.
+        """
+        raise NotImplementedError
+
+
+@register_rule(CouponRuleType.PERCENT_CART)
+@dataclass(frozen=True)
+class PercentCartRule(CouponRule):
+    percent_off: float
+
+    @classmethod
+    def from_model(cls, coupon) -> "PercentCartRule":
+        return cls(percent_off=coupon.percent_off)
+
+    def discount(self, lines: Sequence[PricedUnit]) -> Tuple[float, Optional[str]]:
+        subtotal = sum(price * quantity for price, quantity, _ in lines)
+        return round(subtotal * self.percent_off / 100, 2), None
+
+
+@register_rule(CouponRuleType.BUY_N_GET_M_SAME_DIMENSION)
+@dataclass(frozen=True)
+class BuyNGetMSameDimensionRule(CouponRule):
+    required_qty: int
+    free_qty: int
+    eligible_dimensions: Tuple[str, ...]
+
+    @classmethod
+    def from_model(cls, coupon) -> "BuyNGetMSameDimensionRule":
+        return cls(
+            required_qty=coupon.required_qty,
+            free_qty=coupon.free_qty,
+            eligible_dimensions=tuple(coupon.eligible_dimensions or ()),
+        )
+
+    def discount(self, lines: Sequence[PricedUnit]) -> Tuple[float, Optional[str]]:
+        # Strict: total cart units must exactly equal required_qty
+        total_qty = sum(quantity for _, quantity, _ in lines)
+        if total_qty != self.required_qty:
+            raise HTTPException(
+                400,
+                f"Coupon requires exactly {self.required_qty} unit(s) in cart, got {total_qty}",
+            )
+
+        # Strict: all units must share one dimension
+        dimensions = {dimension for _, _, dimension in lines}
+        if len(dimensions) != 1:
+            raise HTTPException(
+                400,
+                "Coupon requires all cart items to have the same dimension",
+            )
+
+        matched_dimension = next(iter(dimensions))
+
+        # Check if coupon restricts to specific dimensions
+        if self.eligible_dimensions and matched_dimension not in self.eligible_dimensions:
+            allowed = ", ".join(self.eligible_dimensions)
+            raise HTTPException(
+                400,
+                f"Coupon is only applicable to {allowed} dimension(s)",
+            )
+
+        # The free_qty cheapest units are free: walk lines by price instead of
+        # expanding every unit
+        remaining = self.free_qty
+        discount = 0.0
+        for price, quantity, _ in sorted(lines, key=lambda line: line[0]):
+            if remaining <= 0:
+                break
+            taken = min(quantity, remaining)
+            discount += price * taken
+            remaining -= taken
+
+        return round(discount, 2), matched_dimension
+
+
+def compile_rule(coupon) -> CouponRule:
+    rule_cls = RULES.get(coupon.rule_type)
+    if rule_cls is None:
+        raise HTTPException(400, "Unknown coupon rule type")
+    return rule_cls.from_model(coupon)
@@ -1,11 +1,128 @@
 from datetime import datetime, timezone
-from typing import List, Optional
+from threading import Lock
+from typing import Dict, FrozenSet, List, Optional, Union
 
 from fastapi import HTTPException
-from sqlalchemy import or_
+from sqlalchemy import and_, delete, func, literal, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from models.coupon import Coupon, CouponUsage, CouponUserUsage
+from services import pricing_engine
+from services.pricing_engine import CouponTerms
+from utils.cache import VersionedLocalCache
+
+
+# Same statements as the counter backfill migration
+REBUILD_COUPON_COUNTS_SQL = """
+    UPDATE coupons
+    SET uses_count = (SELECT COUNT(*) FROM coupon_usages u WHERE u.coupon_id = coupons.id)
+"""
+
+REBUILD_COUPON_USER_COUNTS_SQL = """
+    INSERT INTO coupon_user_usages (coupon_id, user_id, uses_count)
+    SELECT coupon_id, user_id, COUNT(*) FROM coupon_usages GROUP BY coupon_id, user_id
+"""
+
+
+# Coupons compiled into CouponTerms (rule object included), keyed by code and
+# filled on first use. Bumping the shared version empties it in every process;
+# since coupons are edited in the database, it is also rebuilt once it is
+# COUPON_RULE_CACHE_TTL old.
+_coupon_cache: VersionedLocalCache[Dict[str, CouponTerms]] = VersionedLocalCache(
+    version_key="coupons:version",
+    ttl_seconds=settings.COUPON_RULE_CACHE_TTL,
+    max_age_seconds=settings.COUPON_RULE_CACHE_TTL,
+)
+
+
+class CouponCodeFilter:
+    """
+    Process-local set of active coupon codes, versioned and aged like the
+    compiled-coupon cache, so a coupon added or reactivated in the database
+    is accepted within COUPON_RULE_CACHE_TTL. Codes not in it (guessed,
+    deleted or deactivated) are rejected without a database round trip.
+    The set holds one short string per active coupon, so a Bloom filter
+    would not save anything. Lookup/rejection counters are per process,
+    like the catalog cache's.
+    """
+
+    def __init__(self, version_key: str, ttl_seconds: float):
+        self._codes: VersionedLocalCache[FrozenSet[str]] = VersionedLocalCache(
+            version_key=version_key,
+            ttl_seconds=ttl_seconds,
+            max_age_seconds=ttl_seconds,
+        )
+        self._counters = {"lookups": 0, "rejected": 0}
+        self._lock = Lock()
 
-from models.coupon import Coupon, CouponRuleType, CouponUsage
+    @staticmethod
+    def _load(db: Session) -> FrozenSet[str]:
+        return frozenset(db.execute(select(Coupon.code).where(Coupon.is_active == True)).scalars())
+
+    def allows(self, db: Session, code: str) -> bool:
+        """False if code (normalized) is certainly not an active coupon."""
+        allowed = code in self._codes.get(lambda: self._load(db))
+        with self._lock:
+            self._counters["lookups"] += 1
+            if not allowed:
+                self._counters["rejected"] += 1
+        return allowed
+
+    def clear_local(self) -> None:
+        self._codes.clear_local()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["lookups"]
+        return {
+            **counters,
+            "rejected_ratio": round(counters["rejected"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+coupon_code_filter = CouponCodeFilter(
+    version_key="coupons:version",
+    ttl_seconds=settings.COUPON_RULE_CACHE_TTL,
+)
+
+
+def get_coupon_terms(db: Session, code: str) -> Optional[CouponTerms]:
+    """
+    The compiled coupon for a code, or None if no such active coupon exists
+    (unknown codes are answered from coupon_code_filter, without a query).
+    """
+    code = code.strip().upper()
+    if not coupon_code_filter.allows(db, code):
+        return None
+
+    compiled = _coupon_cache.get(dict)
+
+    terms = compiled.get(code)
+    if terms is None:
+        coupon = db.query(Coupon).filter(Coupon.code == code).first()
+        if coupon is None:
+            return None
+        terms = compiled[code] = CouponTerms.from_model(coupon)
+    return terms
+
+
+def compile_coupon(coupon: Coupon) -> CouponTerms:
+    """
+    CouponTerms for a row just loaded from the database. The row is newer
+    than any cached compilation, so it is compiled and replaces the cache entry.
+    """
+    terms = _coupon_cache.get(dict)[coupon.code] = CouponTerms.from_model(coupon)
+    return terms
+
+
+def invalidate_coupon_rules() -> None:
+    """Call after any Coupon write."""
+    coupon_code_filter.clear_local()
+    _coupon_cache.invalidate()
 
 
 class CouponService:
@@ -14,12 +131,8 @@ class CouponService:
     # 1. Fetch coupon + validate eligibility
     # --------------------------------------------------
     @staticmethod
-    def fetch_and_validate(db: Session, code: str, user_id: str) -> Coupon:
-        coupon = (
-            db.query(Coupon)
-            .filter(Coupon.code == code.strip().upper())
-            .first()
-        )
+    def fetch_and_validate(db: Session, code: str, user_id: str) -> CouponTerms:
+        coupon = get_coupon_terms(db, code)
 
         if not coupon:
             raise HTTPException(400, f"Coupon '{code}' not found")
@@ -35,21 +148,28 @@ class CouponService:
         if coupon.ends_at and now > coupon.ends_at:
             raise HTTPException(400, "Coupon has expired")
 
-        # Global usage cap
-        if coupon.max_total_uses is not None:
-            total_used = db.query(CouponUsage).filter(
-                CouponUsage.coupon_id == coupon.id
-            ).count()
-            if total_used >= coupon.max_total_uses:
+        # Usage caps, read from the counters. This is an early, friendly
+        # rejection; record_usage enforces the caps atomically at order time.
+        if coupon.max_total_uses is not None or coupon.max_uses_per_user is not None:
+            counts = db.execute(
+                select(Coupon.uses_count, CouponUserUsage.uses_count.label("user_used"))
+                .outerjoin(
+                    CouponUserUsage,
+                    and_(
+                        CouponUserUsage.coupon_id == Coupon.id,
+                        CouponUserUsage.user_id == user_id,
+                    ),
+                )
+                .where(Coupon.id == coupon.id)
+            ).one_or_none()
+
+            if counts is None:
+                raise HTTPException(400, f"Coupon '{code}' not found")
+
+            if coupon.max_total_uses is not None and counts.uses_count >= coupon.max_total_uses:
                 raise HTTPException(400, "Coupon usage limit reached")
 
-        # Per-user usage cap
-        if coupon.max_uses_per_user is not None:
-            user_used = db.query(CouponUsage).filter(
-                CouponUsage.coupon_id == coupon.id,
-                CouponUsage.user_id == user_id,
-            ).count()
-            if user_used >= coupon.max_uses_per_user:
+            if coupon.max_uses_per_user is not None and (counts.user_used or 0) >= coupon.max_uses_per_user:
                 raise HTTPException(400, "You have already used this coupon the maximum number of times")
 
         return coupon
@@ -59,7 +179,7 @@ class CouponService:
     # --------------------------------------------------
     @staticmethod
     def compute_discount(
-        coupon: Coupon,
+        coupon: Union[Coupon, CouponTerms],
         priced_items: List[dict],
     ) -> dict:
         """
@@ -69,113 +189,142 @@ class CouponService:
                 "matched_dimension": str | None,
             }
         Raises HTTPException 400 if cart does not qualify.
+        The rules live in services.pricing_engine.
         """
-        if coupon.rule_type == CouponRuleType.PERCENT_CART:
-            return CouponService._compute_percent_discount(coupon, priced_items)
-
-        if coupon.rule_type == CouponRuleType.BUY_N_GET_M_SAME_DIMENSION:
-            return CouponService._compute_bxgy_discount(coupon, priced_items)
-
-        raise HTTPException(400, "Unknown coupon rule type")
-
-    @staticmethod
-    def _compute_percent_discount(coupon: Coupon, priced_items: List[dict]) -> dict:
-        subtotal = sum(item["price"] * item["quantity"] for item in priced_items)
-        discount = round(subtotal * coupon.percent_off / 100, 2)
-        return {"discount_amount": discount, "matched_dimension": None}
-
-    @staticmethod
-    def _compute_bxgy_discount(coupon: Coupon, priced_items: List[dict]) -> dict:
-        required_qty: int = coupon.required_qty
-        free_qty: int = coupon.free_qty
-
-        # Strict: total cart units must exactly equal required_qty
-        total_qty = sum(item["quantity"] for item in priced_items)
-        if total_qty != required_qty:
-            raise HTTPException(
-                400,
-                f"Coupon requires exactly {required_qty} unit(s) in cart, got {total_qty}",
-            )
-
-        # Strict: all units must share one dimension
-        dimensions = {item["dimension"] for item in priced_items}
-        if len(dimensions) != 1:
-            raise HTTPException(
-                400,
-                "Coupon requires all cart items to have the same dimension",
-            )
-
-        matched_dimension = next(iter(dimensions))
-        
-        # Check if coupon restricts to specific dimensions
-        if coupon.eligible_dimensions and matched_dimension not in coupon.eligible_dimensions:
-            allowed = ", ".join(coupon.eligible_dimensions)
-            raise HTTPException(
-                400,
-                f"Coupon is only applicable to {allowed} dimension(s)",
-            )
-
-        # Flatten unit prices by quantity, sort ascending, take first free_qty as free
-        unit_prices: List[float] = []
-        for item in priced_items:
-            unit_prices.extend([item["price"]] * item["quantity"])
-
-        unit_prices.sort()
-        discount = round(sum(unit_prices[:free_qty]), 2)
-
-        return {"discount_amount": discount, "matched_dimension": matched_dimension}
+        return pricing_engine.compute_discount(coupon, priced_items)
 
     # --------------------------------------------------
     # 3. Record usage after successful order commit
     # --------------------------------------------------
     @staticmethod
-    def record_usage(db: Session, coupon_id: int, user_id: str, order_id: int) -> None:
+    def record_usage(db: Session, coupon: CouponTerms, user_id: str, order_id: int) -> None:
+        """
+        Claim one use inside the order transaction. Each cap is a single
+        conditional write on its counter row, which also locks that row until
+        commit, so concurrent orders cannot overshoot it. Raises 400 when a
+        cap is already reached.
+        """
+        claimed = db.execute(
+            update(Coupon)
+            .where(
+                Coupon.id == coupon.id,
+                or_(Coupon.max_total_uses == None, Coupon.uses_count < Coupon.max_total_uses),
+            )
+            # Usage is not an edit of the coupon: keep updated_at as it is
+            .values(uses_count=Coupon.uses_count + 1, updated_at=Coupon.updated_at)
+            .returning(Coupon.uses_count)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        if claimed is None:
+            raise HTTPException(400, "Coupon usage limit reached")
+
+        # The per-user cap is read from the coupon row inside the statement
+        # (a cached CouponTerms may predate an edit of the cap)
+        per_user_limit = (
+            select(Coupon.max_uses_per_user)
+            .where(Coupon.id == coupon.id)
+            .scalar_subquery()
+        )
+        stmt = pg_insert(CouponUserUsage).from_select(
+            ["coupon_id", "user_id", "uses_count"],
+            select(Coupon.id, literal(user_id), literal(1)).where(
+                Coupon.id == coupon.id,
+                or_(Coupon.max_uses_per_user == None, Coupon.max_uses_per_user > 0),
+            ),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CouponUserUsage.coupon_id, CouponUserUsage.user_id],
+            set_={"uses_count": CouponUserUsage.uses_count + 1},
+            where=or_(per_user_limit.is_(None), CouponUserUsage.uses_count < per_user_limit),
+        ).returning(CouponUserUsage.uses_count)
+        if db.execute(stmt).scalar_one_or_none() is None:
+            raise HTTPException(400, "You have already used this coupon the maximum number of times")
+
         db.add(CouponUsage(
-            coupon_id=coupon_id,
+            coupon_id=coupon.id,
             user_id=user_id,
             order_id=order_id,
         ))
 
+    @staticmethod
+    def release_usage(db: Session, order_id: int) -> None:
+        """Delete an order's coupon usage and give the use back to both counters."""
+        released = db.execute(
+            delete(CouponUsage)
+            .where(CouponUsage.order_id == order_id)
+            .returning(CouponUsage.coupon_id, CouponUsage.user_id)
+        ).first()
+        if released is None:
+            return
+
+        db.execute(
+            update(Coupon)
+            .where(Coupon.id == released.coupon_id, Coupon.uses_count > 0)
+            .values(uses_count=Coupon.uses_count - 1, updated_at=Coupon.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(CouponUserUsage)
+            .where(
+                CouponUserUsage.coupon_id == released.coupon_id,
+                CouponUserUsage.user_id == released.user_id,
+                CouponUserUsage.uses_count > 0,
+            )
+            .values(uses_count=CouponUserUsage.uses_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def rebuild_usage_counters(db: Session) -> None:
+        """Recompute both counters from coupon_usages (after bulk loads)."""
+        db.execute(text(REBUILD_COUPON_COUNTS_SQL))
+        db.execute(delete(CouponUserUsage))
+        db.execute(text(REBUILD_COUPON_USER_COUNTS_SQL))
+
     # --------------------------------------------------
     # 4. List all coupons eligible for a given user
     # --------------------------------------------------
     @staticmethod
-    def list_eligible(db: Session, user_id: str) -> List[Coupon]:
+    def _eligible_statement(user_id: str):
+        """
+        Active coupons under both usage caps, in one query: the global cap is
+        checked on coupons.uses_count and the per-user cap on this user's
+        coupon_user_usages row (LEFT JOIN by primary key).
+        """
         now = datetime.now(timezone.utc)
 
-        coupons = (
-            db.query(Coupon)
-            .filter(
+        return (
+            select(Coupon)
+            .outerjoin(
+                CouponUserUsage,
+                and_(
+                    CouponUserUsage.coupon_id == Coupon.id,
+                    CouponUserUsage.user_id == user_id,
+                ),
+            )
+            .where(
                 Coupon.is_active == True,
                 or_(Coupon.starts_at == None, Coupon.starts_at <= now),
                 or_(Coupon.ends_at == None, Coupon.ends_at >= now),
+                or_(
+                    Coupon.max_total_uses == None,
+                    Coupon.uses_count < Coupon.max_total_uses,
+                ),
+                or_(
+                    Coupon.max_uses_per_user == None,
+                    func.coalesce(CouponUserUsage.uses_count, 0) < Coupon.max_uses_per_user,
+                ),
             )
-            .all()
         )
 
-        eligible = []
-        for coupon in coupons:
-            # Global usage cap
-            if coupon.max_total_uses is not None:
-                total_used = db.query(CouponUsage).filter(
-                    CouponUsage.coupon_id == coupon.id
-                ).count()
-                if total_used >= coupon.max_total_uses:
-                    continue
-
-            # Per-user usage cap
-            if coupon.max_uses_per_user is not None:
-                user_used = db.query(CouponUsage).filter(
-                    CouponUsage.coupon_id == coupon.id,
-                    CouponUsage.user_id == user_id,
-                ).count()
-                if user_used >= coupon.max_uses_per_user:
-                    continue
-
-            eligible.append(coupon)
-
-        return eligible
-
-
+    @staticmethod
+    async def list_eligible(db: AsyncSession, user_id: str) -> List[Coupon]:
+        return (
+            await db.execute(CouponService._eligible_statement(user_id))
+        ).scalars().all()
 
-    
+    @staticmethod
+    def eligible_terms(db: Session, user_id: str) -> List[CouponTerms]:
+        """Eligible coupons (same single query), compiled from the loaded rows."""
+        coupons = db.execute(CouponService._eligible_statement(user_id)).scalars().all()
+        return [compile_coupon(coupon) for coupon in coupons]
@@ -0,0 +1,54 @@
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from models.products import DimensionPricing
+from utils.cache import catalog_cache
+from services.product_card_service import refresh_product_cards
+from utils.pricing import invalidate_dimension_multipliers, load_multiplier_map
+
+
+def list_dimension_pricing(db: Session):
+    return db.query(DimensionPricing).order_by(DimensionPricing.name).all()
+
+
+def upsert_dimension_pricing(db: Session, name: str, multiplier: float) -> DimensionPricing:
+    """
+    Create or update a dimension multiplier and invalidate every worker's
+    cached multiplier table and the catalog response cache. Product cards
+    using the dimension are repriced in the same transaction.
+    """
+    if multiplier <= 0:
+        raise HTTPException(status_code=400, detail="Multiplier must be greater than 0")
+
+    name = name.strip()
+    dimension = db.query(DimensionPricing).filter(DimensionPricing.name == name).first()
+
+    if not dimension:
+        dimension = DimensionPricing(name=name, multiplier=multiplier)
+        db.add(dimension)
+    else:
+        dimension.multiplier = multiplier
+
+    db.flush()
+    refresh_product_cards(db, dimension=name, multiplier_map=load_multiplier_map(db))
+    db.commit()
+    db.refresh(dimension)
+
+    invalidate_dimension_multipliers()
+    catalog_cache.invalidate()
+    return dimension
+
+
+def delete_dimension_pricing(db: Session, name: str):
+    dimension = db.query(DimensionPricing).filter(DimensionPricing.name == name).first()
+    if not dimension:
+        raise HTTPException(status_code=404, detail=f"Dimension '{name}' not found")
+
+    db.delete(dimension)
+    db.flush()
+    refresh_product_cards(db, dimension=name, multiplier_map=load_multiplier_map(db))
+    db.commit()
+
+    invalidate_dimension_multipliers()
+    catalog_cache.invalidate()
+    return {"message": f"Dimension {name} deleted successfully"}
@@ -0,0 +1,152 @@
+"""
+Read-only view of an order and everything the invoice, email and Shiprocket
+builders read from it, loaded in a fixed number of queries.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from models.order import Order, OrderItem
+from schemas.payment import OrderStatus
+
+
+@dataclass(frozen=True)
+class ProductSnapshot:
+    id: int
+    title: str
+    image_links: Tuple[str, ...]
+
+    @classmethod
+    def from_model(cls, product) -> "ProductSnapshot":
+        return cls(
+            id=product.id,
+            title=product.title,
+            image_links=tuple(product.image_links or ()),
+        )
+
+
+@dataclass(frozen=True)
+class OrderItemSnapshot:
+    product_id: int
+    quantity: int
+    price: float
+    dimension: str
+    product: Optional[ProductSnapshot]
+
+    @classmethod
+    def from_model(cls, item) -> "OrderItemSnapshot":
+        return cls(
+            product_id=item.product_id,
+            quantity=item.quantity,
+            price=item.price,
+            dimension=item.dimension,
+            product=ProductSnapshot.from_model(item.product) if item.product else None,
+        )
+
+
+@dataclass(frozen=True)
+class CustomerSnapshot:
+    id: str
+    email: Optional[str]
+
+
+@dataclass(frozen=True)
+class PaymentSnapshot:
+    payment_method: str
+    status: str
+    amount: float
+
+
+@dataclass(frozen=True)
+class OrderSnapshot:
+    id: int
+    user_id: Optional[str]
+    order_status: OrderStatus
+    created_at: Optional[datetime]
+
+    delivery_name: str
+    delivery_phone_number: str
+    delivery_address_line: str
+    delivery_city: str
+    delivery_state: str
+    delivery_zip_code: str
+
+    items_subtotal: float
+    subtotal_before_coupon: Optional[float]
+    coupon_discount_amount: float
+    subtotal_after_coupon: Optional[float]
+    coupon_code: Optional[str]
+    delivery_charge: float
+    amount: float
+
+    # Fulfillment progress at load time (the pipeline updates the row, not this)
+    invoice_number: Optional[str]
+    invoice_url: Optional[str]
+    user_email_sent: bool
+    admin_notified: bool
+    shiprocket_order_id: Optional[str]
+    serviceable: bool
+
+    items: Tuple[OrderItemSnapshot, ...]
+    user: Optional[CustomerSnapshot]
+    payment: Optional[PaymentSnapshot]
+
+    @classmethod
+    def from_model(cls, order: Order) -> "OrderSnapshot":
+        user = order.user
+        payment = order.payment
+        return cls(
+            id=order.id,
+            user_id=order.user_id,
+            order_status=order.order_status,
+            created_at=order.created_at,
+            delivery_name=order.delivery_name,
+            delivery_phone_number=order.delivery_phone_number,
+            delivery_address_line=order.delivery_address_line,
+            delivery_city=order.delivery_city,
+            delivery_state=order.delivery_state,
+            delivery_zip_code=order.delivery_zip_code,
+            items_subtotal=order.items_subtotal,
+            subtotal_before_coupon=order.subtotal_before_coupon,
+            coupon_discount_amount=order.coupon_discount_amount,
+            subtotal_after_coupon=order.subtotal_after_coupon,
+            coupon_code=order.coupon_code,
+            delivery_charge=order.delivery_charge,
+            amount=order.amount,
+            invoice_number=order.invoice_number,
+            invoice_url=order.invoice_url,
+            user_email_sent=order.user_email_sent,
+            admin_notified=order.admin_notified,
+            shiprocket_order_id=order.shiprocket_order_id,
+            serviceable=order.serviceable,
+            items=tuple(OrderItemSnapshot.from_model(item) for item in order.items),
+            user=CustomerSnapshot(id=user.id, email=user.email) if user else None,
+            payment=PaymentSnapshot(
+                payment_method=payment.payment_method,
+                status=payment.status,
+                amount=payment.amount,
+            ) if payment else None,
+        )
+
+
+def load_order_aggregate(db: Session, order_id: int) -> Optional[OrderSnapshot]:
+    """
+    The order with its user and payment (one joined query) and its items
+    with products (one selectin query), detached as an OrderSnapshot.
+    """
+    order = db.execute(
+        select(Order)
+        .options(
+            selectinload(Order.items).joinedload(OrderItem.product),
+            joinedload(Order.payment),
+            joinedload(Order.user),
+        )
+        .where(Order.id == order_id)
+    ).unique().scalar_one_or_none()
+
+    if order is None:
+        return None
+    return OrderSnapshot.from_model(order)
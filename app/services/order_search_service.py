@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+
+from models.order import Order, Payment
+from schemas.payment import OrderStatus
+from utils.pagination import encode_cursor, decode_cursor
+from utils.users import admin_order_dict, admin_order_options
+
+
+@dataclass(frozen=True)
+class OrderFilters:
+    """Admin order search criteria; None means "any"."""
+    status: Optional[OrderStatus] = None
+    payment_method: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    coupon_code: Optional[str] = None
+    courier_name: Optional[str] = None
+    serviceable: Optional[bool] = None
+
+
+def _apply_filters(stmt, filters: OrderFilters, with_status: bool = True):
+    """
+    Each filter maps onto an orders index: status and the date range onto
+    ix_orders_status_created, coupon and courier onto their partial indexes.
+    Without a status, unplaced (CREATED) checkouts are left out.
+    """
+    if with_status:
+        if filters.status is not None:
+            stmt = stmt.where(Order.order_status == filters.status)
+        else:
+            stmt = stmt.where(Order.order_status != OrderStatus.CREATED)
+
+    if filters.payment_method is not None:
+        stmt = stmt.where(
+            Order.payment.has(Payment.payment_method == filters.payment_method.strip().upper())
+        )
+    if filters.created_from is not None:
+        stmt = stmt.where(Order.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        stmt = stmt.where(Order.created_at < filters.created_to)
+    if filters.coupon_code is not None:
+        stmt = stmt.where(Order.coupon_code == filters.coupon_code.strip().upper())
+    if filters.courier_name is not None:
+        stmt = stmt.where(Order.courier_name == filters.courier_name)
+    if filters.serviceable is not None:
+        stmt = stmt.where(Order.serviceable == filters.serviceable)
+    return stmt
+
+
+def search_orders(
+    db: Session,
+    filters: OrderFilters,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+):
+    """
+    Keyset-paginated admin order search, newest first on (created_at, id).
+    Items, products, user and payment are batch-loaded per page.
+    """
+    stmt = _apply_filters(select(Order), filters).options(*admin_order_options())
+
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor, 2, (datetime, int))
+        stmt = stmt.where(tuple_(Order.created_at, Order.id) < (last_created_at, last_id))
+
+    orders = db.execute(
+        stmt.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+    ).scalars().all()
+
+    has_more = len(orders) > limit
+    orders = orders[:limit]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+
+    return {
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "data": [admin_order_dict(order) for order in orders],
+    }
+
+
+def count_orders_by_status(db: Session, filters: OrderFilters) -> dict:
+    """Order counts per status for the other filters, in one GROUP BY query."""
+    stmt = _apply_filters(
+        select(Order.order_status, func.count()),
+        filters,
+        with_status=False,
+    ).group_by(Order.order_status)
+
+    counts = {status.value: 0 for status in OrderStatus}
+    for status, count in db.execute(stmt).all():
+        counts[status.value] = count
+
+    return {"total": sum(counts.values()), "by_status": counts}
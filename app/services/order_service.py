@@ -1,6 +1,12 @@
 import logging
+import time
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Dict, Tuple
+
+import redis
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
 
 from models.order import Order
 from schemas.payment import OrderStatus
@@ -10,124 +16,145 @@ from utils.invoice import (
     generate_invoice_number,
 )
 
+from services.order_aggregate import OrderSnapshot
 from services.s3_service import s3_service
-from services.email_service import send_order_confirmation_email
+from services.email_service import send_admin_order_notification, send_order_confirmation_email
 from core.config import settings
+from core.redis import redis_client
 
 
 logger = logging.getLogger(__name__)
 
+# Cumulative per-stage counters shared by all workers
+FULFILLMENT_STATS_KEY = "fulfillment:stage_stats"
 
-class OrderFulfillmentService:
-
-    @staticmethod
-    def process_confirmed_order(order_id: int, db: Session) -> None:
-        """
-        Handles post-payment order fulfillment:
-        - Generates invoice
-        - Uploads invoice to S3
-        - Sends order confirmation email with invoice attached
-        """
-
-        try:
-
-            logger.info(f"Starting fulfillment for order {order_id}")
-
-            # ===============================
-            # 1️⃣ Lock Order & Validate
-            # ===============================
-            with db.begin():
-
-                order = (
-                    db.query(Order)
-                    .filter(Order.id == order_id)
-                    .with_for_update()
-                    .first()
-                )
 
-                if not order:
-                    logger.warning(f"Order {order_id} not found")
-                    return
+class StageTimer:
+    """Wall time and outcome of each stage in one fulfillment run."""
 
-                db.refresh(order)
+    def __init__(self, order_id: int):
+        self.order_id = order_id
+        self.stages: Dict[str, Tuple[float, bool]] = {}
 
-                # Ensure payment success
-                if order.order_status != OrderStatus.CONFIRMED:
-                    logger.info(f"Order {order_id} not confirmed yet")
-                    return
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.stages[name] = ((time.perf_counter() - started) * 1000, ok)
 
-                # Idempotency protection
-                if order.invoice_url and order.user_email_sent:
-                    logger.info(f"Order {order_id} already fulfilled")
-                    return
+    def record(self) -> None:
+        if not self.stages:
+            return
 
-                # Generate invoice number once
-                if not order.invoice_number:
-                    order.invoice_number = generate_invoice_number(order.id)
+        summary = ", ".join(
+            f"{name}={ms:.1f}ms{'' if ok else ' (failed)'}"
+            for name, (ms, ok) in self.stages.items()
+        )
+        logger.info(f"Fulfillment timings for order {self.order_id}: {summary}")
 
-                invoice_number = order.invoice_number
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for name, (ms, ok) in self.stages.items():
+                pipe.hincrby(FULFILLMENT_STATS_KEY, f"{name}:count", 1)
+                pipe.hincrbyfloat(FULFILLMENT_STATS_KEY, f"{name}:total_ms", round(ms, 3))
+                if not ok:
+                    pipe.hincrby(FULFILLMENT_STATS_KEY, f"{name}:failures", 1)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not record fulfillment timings for order {self.order_id}: {e}")
 
-            # Transaction released here
 
-            # ===============================
-            # 2️⃣ Generate Invoice PDF
-            # ===============================
-            order = db.query(Order).filter(Order.id == order_id).first()
-            db.refresh(order)
+def fulfillment_stage_stats() -> Dict[str, dict]:
+    """Run count, failures and mean duration per stage across all workers."""
+    raw = redis_client.hgetall(FULFILLMENT_STATS_KEY)
 
-            logger.info(f"Generating invoice PDF for order {order_id}")
+    stats: Dict[str, dict] = {}
+    for field, value in raw.items():
+        name, metric = field.rsplit(":", 1)
+        stats.setdefault(name, {"count": 0, "failures": 0, "total_ms": 0.0})[metric] = float(value)
 
-            pdf_bytes = build_invoice_pdf(order)
+    for entry in stats.values():
+        entry["count"] = int(entry["count"])
+        entry["failures"] = int(entry["failures"])
+        entry["mean_ms"] = round(entry["total_ms"] / entry["count"], 3) if entry["count"] else 0.0
+        entry["total_ms"] = round(entry["total_ms"], 3)
+    return stats
 
-            if not pdf_bytes:
-                raise Exception("Generated empty invoice PDF")
 
-            # ===============================
-            # 3️⃣ Upload Invoice to S3
-            # ===============================
-            logger.info(f"Uploading invoice to S3 for order {order_id}")
+def mark_order(db: Session, order_id: int, **values) -> None:
+    """Persist fulfillment fields for one order and commit."""
+    db.execute(update(Order).where(Order.id == order_id).values(**values))
+    db.commit()
 
-            invoice_url = s3_service.upload_invoice_pdf(
-                pdf_bytes,
-                invoice_number
-            )
 
-            # ===============================
-            # 4️⃣ Send Customer Email
-            # ===============================
-            if order.user and order.user.email and not order.user_email_sent:
+class OrderFulfillmentService:
+    """
+    Stages of post-confirmation fulfillment. Each stage reads the order from
+    an OrderSnapshot, is guarded by its own flag on the order row and commits
+    on success, so a retried run only repeats what has not been done yet.
+    """
 
+    @staticmethod
+    def is_confirmed(order: OrderSnapshot) -> bool:
+        return order.order_status == OrderStatus.CONFIRMED
 
-                logger.info(f"Sending confirmation email for order {order_id}")
+    @staticmethod
+    def needs_invoice(order: OrderSnapshot) -> bool:
+        return not order.invoice_url or OrderFulfillmentService.needs_customer_email(order)
 
-                send_order_confirmation_email(
-                    order.user.email,
-                    settings.NOREPLY_MAIL,
-                    order=order,
-                    invoice_bytes=pdf_bytes
-                )
+    @staticmethod
+    def needs_customer_email(order: OrderSnapshot) -> bool:
+        return bool(order.user and order.user.email and not order.user_email_sent)
 
-                order.user_email_sent = True
+    @staticmethod
+    def prepare_invoice(db: Session, order: OrderSnapshot) -> Tuple[OrderSnapshot, bytes]:
+        """
+        Assign the invoice number (once, under a row lock), render the PDF and
+        upload it if it has not been stored yet. Returns the snapshot with the
+        invoice fields filled in, and the PDF bytes.
+        """
+        if not order.invoice_number:
+            invoice_number = db.execute(
+                select(Order.invoice_number).where(Order.id == order.id).with_for_update()
+            ).scalar_one()
+            if not invoice_number:
+                invoice_number = generate_invoice_number(order.id)
+                db.execute(update(Order).where(Order.id == order.id).values(invoice_number=invoice_number))
+            db.commit()
+            order = replace(order, invoice_number=invoice_number)
 
-            # ===============================
-            # 5️⃣ Persist Results
-            # ===============================
-            order.invoice_url = invoice_url
-            order.invoice_generated = True
+        pdf_bytes = build_invoice_pdf(order)
+        if not pdf_bytes:
+            raise Exception("Generated empty invoice PDF")
 
-            db.add(order)
-            db.commit()
+        if not order.invoice_url:
+            logger.info(f"Uploading invoice to S3 for order {order.id}")
+            invoice_url = s3_service.upload_invoice_pdf(pdf_bytes, order.invoice_number)
+            mark_order(db, order.id, invoice_url=invoice_url, invoice_generated=True)
+            order = replace(order, invoice_url=invoice_url)
 
-            logger.info(f"Order fulfillment completed for order {order_id}")
+        return order, pdf_bytes
 
-        except SQLAlchemyError:
-            logger.exception(
-                f"Database error during fulfillment for order {order_id}"
-            )
-            raise
+    @staticmethod
+    def send_customer_email(db: Session, order: OrderSnapshot, pdf_bytes: bytes) -> None:
+        logger.info(f"Sending confirmation email for order {order.id}")
+        send_order_confirmation_email(
+            order.user.email,
+            settings.NOREPLY_MAIL,
+            order=order,
+            invoice_bytes=pdf_bytes
+        )
+        mark_order(db, order.id, user_email_sent=True)
 
-        except Exception:
-            logger.exception(
-                f"Order fulfillment failed for order {order_id}"
-            )
-            raise
\ No newline at end of file
+    @staticmethod
+    def notify_admin(db: Session, order: OrderSnapshot) -> None:
+        send_admin_order_notification(
+            settings.ADMIN_EMAIL,
+            settings.ORDER_MAIL,
+            order
+        )
+        mark_order(db, order.id, admin_notified=True)
@@ -0,0 +1,106 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from dramatiq import Broker
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from models.outbox import OutboxMessage
+
+
+logger = logging.getLogger(__name__)
+
+# Actors run after an order is confirmed (COD placed or Razorpay captured)
+CONFIRMED_ORDER_ACTORS = ("fulfill_order",)
+
+
+def add_outbox_message(db, actor_name: str, *args, delay_ms: Optional[int] = None) -> None:
+    """Stage a job in the caller's transaction (works for Session and AsyncSession)."""
+    db.add(OutboxMessage(actor_name=actor_name, args=list(args), delay_ms=delay_ms))
+
+
+def add_confirmed_order_jobs(db, order_id: int) -> None:
+    for actor_name in CONFIRMED_ORDER_ACTORS:
+        add_outbox_message(db, actor_name, order_id)
+
+
+def _retry_delay(attempts: int, base_delay: float, max_delay: float) -> float:
+    return min(base_delay * 2 ** attempts, max_delay)
+
+
+def _delete_sent(db: Session, sent_ids: List[int]) -> None:
+    if sent_ids:
+        db.execute(delete(OutboxMessage).where(OutboxMessage.id.in_(sent_ids)))
+
+
+def relay_outbox_batch(
+    db: Session,
+    broker: Broker,
+    batch_size: int,
+    max_attempts: int,
+    base_delay: float = 5.0,
+    max_delay: float = 1800.0,
+) -> int:
+    """
+    Move up to batch_size due rows to the broker and delete them.
+    Delivery is at-least-once: a crash between enqueue and commit re-sends
+    the batch, which fulfill_order tolerates via its per-stage flags.
+
+    Messages go through broker.enqueue one at a time. If a send fails, the
+    rows sent before it are still deleted; it and the rest of the batch
+    count an attempt and wait base_delay * 2^attempts seconds (at most
+    max_delay), and rows that reach max_attempts are parked. The error is
+    re-raised so the relay backs off.
+    Returns the number of messages enqueued.
+    """
+    rows = db.execute(
+        select(OutboxMessage)
+        .where(
+            # Matches the ix_outbox_unparked_id predicate so parked rows are skipped
+            ~OutboxMessage.parked,
+            OutboxMessage.available_at <= func.now(),
+        )
+        .order_by(OutboxMessage.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+
+    if not rows:
+        db.rollback()
+        return 0
+
+    messages = []
+    for row in rows:
+        try:
+            actor = broker.get_actor(row.actor_name)
+        except Exception as e:
+            # Unknown actor (e.g. renamed): park the row instead of blocking the queue
+            row.parked = True
+            row.last_error = repr(e)
+            logger.error(f"Outbox message {row.id} has no actor '{row.actor_name}'")
+            continue
+        messages.append((row, actor.message(*row.args)))
+
+    sent_ids = []
+    try:
+        for row, message in messages:
+            broker.enqueue(message, delay=row.delay_ms)
+            sent_ids.append(row.id)
+    except Exception as e:
+        # The row locks are still held, so record the failure in this transaction
+        now = datetime.now(timezone.utc)
+        for row, _ in messages[len(sent_ids):]:
+            row.last_error = repr(e)
+            row.available_at = now + timedelta(seconds=_retry_delay(row.attempts, base_delay, max_delay))
+            row.attempts += 1
+            if row.attempts >= max_attempts:
+                row.parked = True
+                logger.error(f"Outbox message {row.id} parked after {row.attempts} failed sends")
+        _delete_sent(db, sent_ids)
+        db.commit()
+        raise
+
+    _delete_sent(db, sent_ids)
+    db.commit()
+    return len(sent_ids)
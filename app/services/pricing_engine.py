@@ -0,0 +1,268 @@
+"""
+Checkout pricing with no I/O.
+
+Everything a price depends on is loaded up front into an immutable
+PricingSnapshot (see OrderService.load_pricing_snapshot); the functions here
+only compute, so the same inputs always give the same PricingResult.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Optional, Tuple
+
+from fastapi import HTTPException
+
+from models.coupon import CouponRuleType
+from services.coupon_rules import CouponRule, compile_rule
+from services.delivery_charge_service import DeliveryChargePolicy, build_pricing_breakdown
+from utils.pricing import build_dimension_pricing_batch
+
+
+@dataclass(frozen=True)
+class ProductPrice:
+    id: int
+    price: float
+    discounted_price: Optional[float]
+    dimensions: Tuple[str, ...]
+
+    @classmethod
+    def from_model(cls, product) -> "ProductPrice":
+        return cls(
+            id=product.id,
+            price=product.price,
+            discounted_price=product.discounted_price,
+            dimensions=tuple(product.dimensions or ()),
+        )
+
+
+@dataclass(frozen=True)
+class CouponTerms:
+    """
+    A Coupon compiled once: its static terms plus the discount rule object.
+    Usage counts are not part of it (they change with every order).
+    """
+    id: int
+    code: str
+    rule_type: CouponRuleType
+    percent_off: Optional[float]
+    required_qty: Optional[int]
+    free_qty: Optional[int]
+    eligible_dimensions: Tuple[str, ...]
+    is_active: bool
+    starts_at: Optional[datetime]
+    ends_at: Optional[datetime]
+    max_total_uses: Optional[int]
+    max_uses_per_user: Optional[int]
+    rule: CouponRule
+
+    @classmethod
+    def from_model(cls, coupon) -> "CouponTerms":
+        return cls(
+            id=coupon.id,
+            code=coupon.code,
+            rule_type=coupon.rule_type,
+            percent_off=coupon.percent_off,
+            required_qty=coupon.required_qty,
+            free_qty=coupon.free_qty,
+            eligible_dimensions=tuple(coupon.eligible_dimensions or ()),
+            is_active=coupon.is_active,
+            starts_at=coupon.starts_at,
+            ends_at=coupon.ends_at,
+            max_total_uses=coupon.max_total_uses,
+            max_uses_per_user=coupon.max_uses_per_user,
+            rule=compile_rule(coupon),
+        )
+
+
+@dataclass(frozen=True)
+class PricingSnapshot:
+    products: Mapping[int, ProductPrice]
+    multipliers: Mapping[str, float]
+    delivery_policy: DeliveryChargePolicy
+    coupon: Optional[CouponTerms] = None
+
+    @classmethod
+    def build(
+        cls,
+        products: Iterable[ProductPrice],
+        multipliers: Mapping[str, float],
+        delivery_policy: DeliveryChargePolicy,
+        coupon: Optional[CouponTerms] = None,
+    ) -> "PricingSnapshot":
+        return cls(
+            products=MappingProxyType({p.id: p for p in products}),
+            multipliers=MappingProxyType(dict(multipliers)),
+            delivery_policy=delivery_policy,
+            coupon=coupon,
+        )
+
+
+@dataclass(frozen=True)
+class PricedLine:
+    product_id: int
+    quantity: int
+    price: float
+    dimension: str
+
+    def as_dict(self) -> dict:
+        return {
+            "product_id": self.product_id,
+            "quantity": self.quantity,
+            "price": self.price,
+            "dimension": self.dimension,
+        }
+
+
+@dataclass(frozen=True)
+class PricingResult:
+    lines: Tuple[PricedLine, ...]
+    items_subtotal: float                # before coupon
+    total_quantity: int
+    coupon: Optional[CouponTerms]
+    coupon_discount_amount: float
+    matched_dimension: Optional[str]
+    subtotal_after_coupon: float
+    delivery_charge: float
+    amount: float
+
+    @property
+    def items(self) -> List[dict]:
+        return [line.as_dict() for line in self.lines]
+
+    def breakdown(self) -> dict:
+        """Same shape as build_pricing_breakdown on the post-coupon subtotal."""
+        return {
+            "items_subtotal": self.subtotal_after_coupon,
+            "delivery_charge": self.delivery_charge,
+            "amount": self.amount,
+        }
+
+
+def price_lines(snapshot: PricingSnapshot, items: List[dict]) -> Tuple[Tuple[PricedLine, ...], float, int]:
+    """Validate cart items and price them. Returns (lines, subtotal, total quantity)."""
+    for item in items:
+        pid = item["product_id"]
+        dim = item["dimension"]
+
+        if pid not in snapshot.products:
+            raise HTTPException(400, f"Invalid product: {pid}")
+
+        if item["qty"] <= 0:
+            raise HTTPException(400, "Quantity must be >= 1")
+
+        if dim not in snapshot.products[pid].dimensions:
+            raise HTTPException(400, f"Invalid dimension '{dim}' for product {pid}")
+
+    requested = []
+    for item in items:
+        product = snapshot.products[item["product_id"]]
+        requested.append(([item["dimension"]], product.price, product.discounted_price))
+    line_pricing = build_dimension_pricing_batch(requested, snapshot.multipliers)
+
+    lines = []
+    subtotal = 0.0
+    total_quantity = 0
+
+    for item, pricing in zip(items, line_pricing):
+        dim_pricing = pricing[item["dimension"]]
+        unit_price = float(dim_pricing["discounted_price"] or dim_pricing["price"])
+        subtotal += unit_price * item["qty"]
+        total_quantity += item["qty"]
+        lines.append(PricedLine(
+            product_id=item["product_id"],
+            quantity=item["qty"],
+            price=unit_price,
+            dimension=item["dimension"],
+        ))
+
+    return tuple(lines), round(subtotal, 2), total_quantity
+
+
+def compute_discount(coupon, priced_items: List[dict]) -> dict:
+    """
+    Discount for a Coupon or CouponTerms on priced items
+    ({"price", "quantity", "dimension"} dicts).
+
+    Returns {"discount_amount": float, "matched_dimension": str | None};
+    raises HTTPException 400 if the cart does not qualify.
+    """
+    rule = coupon.rule if isinstance(coupon, CouponTerms) else compile_rule(coupon)
+    discount, matched_dimension = rule.discount(
+        [(item["price"], item["quantity"], item["dimension"]) for item in priced_items]
+    )
+    return {"discount_amount": discount, "matched_dimension": matched_dimension}
+
+
+def _apply_coupon(
+    snapshot: PricingSnapshot,
+    lines: Tuple[PricedLine, ...],
+    items_subtotal: float,
+    total_quantity: int,
+    coupon: Optional[CouponTerms],
+) -> PricingResult:
+    """Coupon discount and delivery on already priced lines."""
+    discount_amount = 0.0
+    matched_dimension = None
+    if coupon is not None:
+        discount_amount, matched_dimension = coupon.rule.discount(
+            [(line.price, line.quantity, line.dimension) for line in lines]
+        )
+
+    subtotal_after_coupon = round(max(items_subtotal - discount_amount, 0.0), 2)
+    breakdown = build_pricing_breakdown(
+        subtotal=subtotal_after_coupon,
+        policy=snapshot.delivery_policy,
+    )
+
+    return PricingResult(
+        lines=lines,
+        items_subtotal=items_subtotal,
+        total_quantity=total_quantity,
+        coupon=coupon,
+        coupon_discount_amount=discount_amount,
+        matched_dimension=matched_dimension,
+        subtotal_after_coupon=breakdown["items_subtotal"],
+        delivery_charge=breakdown["delivery_charge"],
+        amount=breakdown["amount"],
+    )
+
+
+def price_checkout(snapshot: PricingSnapshot, items: List[dict]) -> PricingResult:
+    """Priced lines, coupon discount and delivery for a cart, all from the snapshot."""
+    lines, items_subtotal, total_quantity = price_lines(snapshot, items)
+    return _apply_coupon(snapshot, lines, items_subtotal, total_quantity, snapshot.coupon)
+
+
+@dataclass(frozen=True)
+class CouponEvaluation:
+    coupon: CouponTerms
+    result: Optional[PricingResult]     # None when the cart does not qualify
+    reason: Optional[str] = None
+
+
+def evaluate_coupons(
+    snapshot: PricingSnapshot,
+    items: List[dict],
+    coupons: Iterable[CouponTerms],
+) -> Tuple[PricingResult, List[CouponEvaluation]]:
+    """
+    Price the cart once (snapshot.coupon is ignored), then run every coupon's
+    rule on the same priced lines. Returns the no-coupon result and, in
+    order, the applicable coupons (lowest final amount first, then largest
+    discount, then code) followed by those the cart does not qualify for.
+    """
+    lines, items_subtotal, total_quantity = price_lines(snapshot, items)
+    base = _apply_coupon(snapshot, lines, items_subtotal, total_quantity, None)
+
+    applicable, rejected = [], []
+    for coupon in coupons:
+        try:
+            result = _apply_coupon(snapshot, lines, items_subtotal, total_quantity, coupon)
+        except HTTPException as e:
+            rejected.append(CouponEvaluation(coupon=coupon, result=None, reason=e.detail))
+            continue
+        applicable.append(CouponEvaluation(coupon=coupon, result=result))
+
+    applicable.sort(key=lambda ev: (ev.result.amount, -ev.result.coupon_discount_amount, ev.coupon.code))
+    rejected.sort(key=lambda ev: ev.coupon.code)
+    return base, applicable + rejected
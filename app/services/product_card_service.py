@@ -0,0 +1,129 @@
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models.products import Product, ProductAnalytics, ProductCard, Category, SubCategory
+from utils.pricing import build_dimension_pricing_batch, get_multiplier_map
+
+
+UPSERT_BATCH_SIZE = 500
+
+_CARD_COLUMNS = [c.name for c in ProductCard.__table__.columns if c.name != "product_id"]
+
+
+def _card_source_query():
+    views = (
+        select(
+            ProductAnalytics.product_id,
+            func.coalesce(func.sum(ProductAnalytics.view_count), 0).label("view_count"),
+        )
+        .group_by(ProductAnalytics.product_id)
+        .subquery()
+    )
+
+    return (
+        select(
+            Product.id,
+            Product.title,
+            Product.slug,
+            Product.one_liner,
+            Product.description,
+            Product.image_links,
+            Product.category_id,
+            Category.name.label("category_name"),
+            Product.subcategory_id,
+            SubCategory.name.label("subcategory_name"),
+            Product.price,
+            Product.discounted_price,
+            Product.dimensions,
+            Product.is_active,
+            Product.created_at,
+            Product.updated_at,
+            func.coalesce(views.c.view_count, 0).label("view_count"),
+        )
+        .outerjoin(Category, Category.id == Product.category_id)
+        .outerjoin(SubCategory, SubCategory.id == Product.subcategory_id)
+        .outerjoin(views, views.c.product_id == Product.id)
+        .order_by(Product.id)
+    )
+
+
+def _build_card(row, dimension_pricing: Dict[str, dict]) -> dict:
+    return {
+        "product_id": row.id,
+        "title": row.title,
+        "slug": row.slug,
+        "one_liner": row.one_liner,
+        "description": row.description,
+        "image_link": row.image_links[0] if row.image_links else "",
+        "category_id": row.category_id,
+        "category_name": row.category_name,
+        "subcategory_id": row.subcategory_id,
+        "subcategory_name": row.subcategory_name,
+        "price": row.price,
+        "discounted_price": row.discounted_price,
+        "effective_price": row.discounted_price if row.discounted_price is not None else row.price,
+        "dimensions": row.dimensions,
+        "dimension_pricing": dimension_pricing,
+        "view_count": int(row.view_count),
+        "is_active": row.is_active,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
+
+
+def _upsert_cards(db: Session, rows: list, multiplier_map: Dict[str, float]) -> None:
+    pricing = build_dimension_pricing_batch(
+        [(row.dimensions, row.price, row.discounted_price) for row in rows],
+        multiplier_map,
+    )
+    cards = [_build_card(row, dimension_pricing) for row, dimension_pricing in zip(rows, pricing)]
+
+    stmt = insert(ProductCard).values(cards)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ProductCard.product_id],
+            set_={name: stmt.excluded[name] for name in _CARD_COLUMNS},
+        )
+    )
+
+
+def refresh_product_cards(
+    db: Session,
+    product_ids: Optional[Iterable[int]] = None,
+    category_id: Optional[int] = None,
+    subcategory_id: Optional[int] = None,
+    dimension: Optional[str] = None,
+    multiplier_map: Optional[Dict[str, float]] = None,
+) -> int:
+    """
+    Rebuild product_cards rows for the given scope (all products when no
+    filter is passed) inside the caller's transaction; the caller commits.
+    Pass multiplier_map when DimensionPricing changed in this transaction,
+    since the shared cache still holds the old table.
+    """
+    stmt = _card_source_query()
+
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return 0
+        stmt = stmt.where(Product.id.in_(product_ids))
+    if category_id is not None:
+        stmt = stmt.where(Product.category_id == category_id)
+    if subcategory_id is not None:
+        stmt = stmt.where(Product.subcategory_id == subcategory_id)
+    if dimension is not None:
+        stmt = stmt.where(Product.dimensions.any(dimension))
+
+    if multiplier_map is None:
+        multiplier_map = get_multiplier_map(db)
+
+    refreshed = 0
+    for rows in db.execute(stmt.execution_options(yield_per=UPSERT_BATCH_SIZE)).partitions():
+        _upsert_cards(db, rows, multiplier_map)
+        refreshed += len(rows)
+
+    return refreshed
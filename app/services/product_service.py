@@ -1,11 +1,21 @@
+import re
 from slugify import slugify
-from sqlalchemy.orm import Session
-from models.products import Product, ProductAnalytics, Category, SubCategory
+from sqlalchemy import and_, func, select, tuple_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.products import Product, ProductCard, Category, SubCategory
 from schemas.products import ProductCreate
 from datetime import datetime, timezone
 from sqlalchemy import desc
 from typing import Optional, List
-from utils.pricing import calculate_dimension_pricing_db
+from utils.cache import catalog_cache
+from utils.pagination import encode_cursor, decode_cursor
+from services.product_card_service import refresh_product_cards
+from utils.pricing import (
+    build_dimension_pricing_batch,
+    calculate_dimension_pricing_async,
+    get_multiplier_map_async,
+)
 from fastapi import HTTPException, status
 
 
@@ -60,43 +70,39 @@ def create_product(db: Session, product_data, image_links: list):
         updated_at=datetime.now(timezone.utc),
     )
     db.add(db_product)
+    db.flush()
+    refresh_product_cards(db, product_ids=[db_product.id])
     db.commit()
     db.refresh(db_product)
 
+    catalog_cache.invalidate()
     return db_product
 
 
 
 
 
-def get_product_by_id(db: Session, product_id: int):
+async def get_product_by_id(db: AsyncSession, product_id: int):
     """
     Fetch a product by ID, include its variations (dimensions), category and subcategory names,
-    increase view count, and return structured data.
+    and return structured data. Read-only: the route records the view
+    (write-behind) so this result can be cached.
     """
     # Fetch product
-    product = db.query(Product).filter(
-        Product.id == product_id,
-        Product.is_active == True
-    ).first()
+    product = (
+        await db.execute(
+            select(Product)
+            .options(selectinload(Product.category_rel), selectinload(Product.subcategory_rel))
+            .where(Product.id == product_id, Product.is_active == True)
+        )
+    ).scalar_one_or_none()
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with id {product_id} not found",
         )
 
-    # Update analytics (view count)
-    analytics = db.query(ProductAnalytics).filter(ProductAnalytics.product_id == product_id).first()
-    if not analytics:
-        analytics = ProductAnalytics(product_id=product_id, view_count=1)
-        db.add(analytics)
-    else:
-        analytics.view_count += 1
-        analytics.updated_at = datetime.now(timezone.utc)
-    db.commit()
-
-
-    dimension_pricing = calculate_dimension_pricing_db(
+    dimension_pricing = await calculate_dimension_pricing_async(
         db,
         product.dimensions or [],
         product.price,
@@ -128,147 +134,301 @@ def get_product_by_id(db: Session, product_id: int):
 
     return response
 
-def get_top_products_by_category(db: Session, limit_per_category: int = 4):
+_CARD_ALIASES = {
+    "id": ProductCard.product_id,
+    "category": ProductCard.category_name,
+    "subcategory": ProductCard.subcategory_name,
+}
+
+
+def _card_columns(*fields):
+    """product_cards columns labelled with the response keys, in response order."""
+    return [
+        (_CARD_ALIASES[field] if field in _CARD_ALIASES else getattr(ProductCard, field)).label(field)
+        for field in fields
+    ]
+
+
+async def get_top_products_by_category(db: AsyncSession, limit_per_category: int = 4):
     """
     Fetch top N most viewed products for each category,
     including dimension pricing (same as get_product_by_id).
+
+    One round trip over product_cards: ranked per category with ROW_NUMBER()
+    and LEFT JOINed onto categories so empty categories still appear.
     """
+    ranked = (
+        select(
+            *_card_columns(
+                "id", "title", "one_liner", "slug", "image_link", "view_count",
+                "price", "discounted_price", "category", "dimensions",
+                "dimension_pricing",
+            ),
+            func.coalesce(ProductCard.subcategory_name, "").label("subcategory"),
+            ProductCard.category_id.label("category_id"),
+            func.row_number().over(
+                partition_by=ProductCard.category_id,
+                order_by=(ProductCard.view_count.desc(), ProductCard.created_at.desc()),
+            ).label("rank"),
+        )
+        .where(ProductCard.is_active == True)
+        .subquery("ranked_cards")
+    )
+    product_columns = [c for c in ranked.c if c.key not in ("category_id", "rank")]
+
+    rows = (
+        await db.execute(
+            select(
+                Category.id.label("category_id"),
+                Category.name.label("category_name"),
+                *product_columns,
+            )
+            .select_from(Category)
+            .outerjoin(
+                ranked,
+                and_(
+                    ranked.c.category_id == Category.id,
+                    ranked.c.rank <= limit_per_category,
+                ),
+            )
+            .order_by(Category.id, ranked.c.rank)
+        )
+    ).mappings().all()
+
     result = []
+    categories = {}
 
-    categories = db.query(Category).all()
-
-    for category in categories:
-        # Join products with analytics
-        products = (
-            db.query(Product)
-            .outerjoin(ProductAnalytics, ProductAnalytics.product_id == Product.id)
-            .filter(Product.category_id == category.id, Product.is_active == True)
-            .order_by(ProductAnalytics.view_count.desc().nullslast(), Product.created_at.desc())
-            .limit(limit_per_category)
-            .all()
-        )
+    for row in rows:
+        category = categories.get(row["category_id"])
+        if category is None:
+            category = {
+                "category_id": row["category_id"],
+                "category_name": row["category_name"],
+                "products": []
+            }
+            categories[row["category_id"]] = category
+            result.append(category)
 
-        category_products = []
-        for p in products:
-            # 🔥 Add dimension pricing EXACTLY like get_product_by_id
-            dimension_pricing = calculate_dimension_pricing_db(
-                db,
-                p.dimensions or [],
-                p.price,
-                p.discounted_price
-            )
+        if row["id"] is None:
+            continue
 
-            category_products.append({
-                "id": p.id,
-                "title": p.title,
-                "one_liner": p.one_liner,
-                "slug": p.slug,
-                "image_link": (p.image_links[0] if p.image_links else ""),
-                "view_count": p.analytics.view_count if p.analytics else 0,
-                "price": p.price,
-                "discounted_price": p.discounted_price,
-                "category": category.name,
-                "dimensions": p.dimensions,
-                "dimension_pricing": dimension_pricing,     
-                "subcategory": p.subcategory_rel.name if p.subcategory_rel else ""
-            })
-
-        result.append({
-            "category_id": category.id,
-            "category_name": category.name,
-            "products": category_products
-        })
+        category["products"].append({c.key: row[c.key] for c in product_columns})
 
     return result
 
 
-def get_products_by_category(db: Session, category_id: int):
+async def get_products_by_category(db: AsyncSession, category_id: int):
     """
     Fetch all active products of a given category including variations and subcategory names.
     """
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = await db.get(Category, category_id)
     if not category:
         raise HTTPException(status_code=404, detail=f"Category with id {category_id} not found")
 
-    products = (
-        db.query(Product)
-        .filter(Product.category_id == category_id, Product.is_active == True)
-        .order_by(Product.created_at.desc())
-        .all()
-    )
+    rows = (
+        await db.execute(
+            select(
+                *_card_columns(
+                    "id", "title", "one_liner", "description", "slug", "image_link",
+                    "category", "subcategory", "dimensions", "is_active",
+                    "created_at", "updated_at", "price", "discounted_price",
+                )
+            )
+            .where(ProductCard.category_id == category_id, ProductCard.is_active == True)
+            .order_by(ProductCard.created_at.desc(), ProductCard.product_id.desc())
+        )
+    ).mappings().all()
 
-    result = []
-    for p in products:
-        
-
-        subcategory_name = p.subcategory_rel.name if p.subcategory_rel else None
-
-        result.append({
-            "id": p.id,
-            "title": p.title,
-            "one_liner": p.one_liner,
-            "description": p.description,
-            "slug": p.slug,
-            "image_link": p.image_links[0] or "",
-            "category": category.name,
-            "subcategory": subcategory_name,
-            "dimensions": p.dimensions,
-            "is_active": p.is_active,
-            "created_at": p.created_at,
-            "updated_at": p.updated_at,
-            "price": p.price,
-            "discounted_price": p.discounted_price
-        })
+    return [dict(row) for row in rows]
 
-    return result
-def get_products_by_subcategory(db: Session, subcategory_id: int):
+
+async def get_products_by_subcategory(db: AsyncSession, subcategory_id: int):
     """
     Fetch all active products of a given subcategory including variations,
     category names, and dimension pricing.
     """
-    subcategory = db.query(SubCategory).filter(SubCategory.id == subcategory_id).first()
+    subcategory = await db.get(SubCategory, subcategory_id)
     if not subcategory:
         raise HTTPException(status_code=404, detail=f"Subcategory with id {subcategory_id} not found")
 
-    products = (
-        db.query(Product)
-        .filter(Product.subcategory_id == subcategory_id, Product.is_active == True)
-        .order_by(Product.created_at.desc())
-        .all()
+    rows = (
+        await db.execute(
+            select(
+                *_card_columns(
+                    "id", "title", "one_liner", "description", "slug", "image_link",
+                    "category", "subcategory", "is_active", "created_at",
+                    "updated_at", "dimensions", "dimension_pricing", "price",
+                    "discounted_price",
+                )
+            )
+            .where(ProductCard.subcategory_id == subcategory_id, ProductCard.is_active == True)
+            .order_by(ProductCard.created_at.desc(), ProductCard.product_id.desc())
+        )
+    ).mappings().all()
+
+    return [dict(row) for row in rows]
+
+PRODUCT_SORTS = ("newest", "price_asc", "price_desc")
+
+_LISTING_FIELDS = (
+    "id", "title", "one_liner", "slug", "image_link", "category", "subcategory",
+    "is_active", "created_at", "updated_at", "dimensions", "dimension_pricing",
+    "price", "discounted_price",
+)
+
+
+async def get_products_paginated(
+    db: AsyncSession,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    category_id: Optional[int] = None,
+    subcategory_id: Optional[int] = None,
+    is_active: Optional[bool] = True,
+    sort_by: str = "newest",
+):
+    """
+    Keyset-paginated product listing over product_cards.
+    newest: (created_at, id) DESC; price_asc/price_desc: (effective price, id).
+    Every page is a single index range scan, so page 50 costs the same as page 1.
+    """
+    if sort_by not in PRODUCT_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of {', '.join(PRODUCT_SORTS)}")
+
+    if sort_by == "newest":
+        sort_key = (ProductCard.created_at, ProductCard.product_id)
+        key_type = datetime
+        descending = True
+    else:
+        sort_key = (ProductCard.effective_price, ProductCard.product_id)
+        key_type = (int, float)
+        descending = sort_by == "price_desc"
+
+    stmt = select(
+        *_card_columns(*_LISTING_FIELDS),
+        ProductCard.effective_price.label("effective_price"),
     )
 
-    result = []
-    for p in products:
-
-        # 🔥 Get pricing for each dimension
-        dimension_pricing = calculate_dimension_pricing_db(
-            db,
-            p.dimensions or [],
-            p.price,
-            p.discounted_price
+    if category_id is not None:
+        stmt = stmt.where(ProductCard.category_id == category_id)
+    if subcategory_id is not None:
+        stmt = stmt.where(ProductCard.subcategory_id == subcategory_id)
+    if is_active is not None:
+        stmt = stmt.where(ProductCard.is_active == is_active)
+
+    if cursor:
+        # The cursor names its sort, so one from another sort_by is rejected
+        cursor_sort, last_key, last_id = decode_cursor(cursor, 3, (str, key_type, int))
+        if cursor_sort != sort_by:
+            raise HTTPException(status_code=400, detail="Cursor does not match sort_by")
+        position = tuple_(*sort_key)
+        after = (last_key, last_id)
+        stmt = stmt.where(position < after if descending else position > after)
+
+    stmt = stmt.order_by(
+        *(col.desc() if descending else col.asc() for col in sort_key)
+    ).limit(limit + 1)
+
+    rows = (await db.execute(stmt)).mappings().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    data = [{field: row[field] for field in _LISTING_FIELDS} for row in rows]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            sort_by,
+            last["created_at"] if sort_by == "newest" else last["effective_price"],
+            last["id"],
+        )
+
+    return {"limit": limit, "next_cursor": next_cursor, "data": data}
+
+
+SEARCH_MAX_TERMS = 8
+
+
+def build_prefix_tsquery(query: str) -> Optional[str]:
+    """
+    Turn free text into a safe prefix tsquery: "star wa" -> "star:* & wa:*".
+    Only word characters survive, so user input cannot inject tsquery syntax.
+    """
+    terms = re.findall(r"\w+", query.lower())[:SEARCH_MAX_TERMS]
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+async def search_products(
+    db: AsyncSession,
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+    category_id: Optional[int] = None,
+):
+    """
+    Full-text search over title, one_liner, description and category/subcategory
+    names (GIN-indexed products.search_vector), ranked with ts_rank.
+    """
+    tsquery_text = build_prefix_tsquery(query)
+    if not tsquery_text:
+        return {"limit": limit, "offset": offset, "data": []}
+
+    tsquery = func.to_tsquery("english", tsquery_text)
+    rank = func.ts_rank(Product.search_vector, tsquery).label("rank")
+
+    stmt = (
+        select(
+            Product.id,
+            Product.title,
+            Product.one_liner,
+            Product.slug,
+            Product.image_links,
+            Product.price,
+            Product.discounted_price,
+            Product.dimensions,
+            Category.name.label("category_name"),
+            SubCategory.name.label("subcategory_name"),
+            rank,
         )
+        .outerjoin(Category, Category.id == Product.category_id)
+        .outerjoin(SubCategory, SubCategory.id == Product.subcategory_id)
+        .where(Product.is_active == True, Product.search_vector.op("@@")(tsquery))
+    )
+
+    if category_id is not None:
+        stmt = stmt.where(Product.category_id == category_id)
 
-        category_name = p.category_rel.name if p.category_rel else None
-
-        result.append({
-            "id": p.id,
-            "title": p.title,
-            "one_liner": p.one_liner,
-            "description": p.description,
-            "slug": p.slug,
-            "image_link": p.image_links[0] if p.image_links else "",
-            "category": category_name,
-            "subcategory": subcategory.name,
-            "is_active": p.is_active,
-            "created_at": p.created_at,
-            "updated_at": p.updated_at,
-            "dimensions": p.dimensions,
+    stmt = stmt.order_by(rank.desc(), Product.id.desc()).limit(limit).offset(offset)
+
+    rows = (await db.execute(stmt)).all()
+    multiplier_map = await get_multiplier_map_async(db)
+    pricing = build_dimension_pricing_batch(
+        [(row.dimensions, row.price, row.discounted_price) for row in rows],
+        multiplier_map,
+    )
+
+    data = [
+        {
+            "id": row.id,
+            "title": row.title,
+            "one_liner": row.one_liner,
+            "slug": row.slug,
+            "image_link": row.image_links[0] if row.image_links else "",
+            "category": row.category_name,
+            "subcategory": row.subcategory_name,
+            "dimensions": row.dimensions,
             "dimension_pricing": dimension_pricing,
-            "price": p.price,
-            "discounted_price": p.discounted_price
-        })
+            "price": row.price,
+            "discounted_price": row.discounted_price,
+            "rank": row.rank
+        }
+        for row, dimension_pricing in zip(rows, pricing)
+    ]
+
+    return {"limit": limit, "offset": offset, "data": data}
 
-    return result
 
 def update_product(db: Session, product_id: int, update_data: dict):
     """
@@ -284,8 +444,12 @@ def update_product(db: Session, product_id: int, update_data: dict):
             setattr(product, field, value)
 
     product.updated_at = datetime.now(timezone.utc)
+    db.flush()
+    refresh_product_cards(db, product_ids=[product.id])
     db.commit()
     db.refresh(product)
+
+    catalog_cache.invalidate()
     return product
 
 
@@ -299,4 +463,6 @@ def delete_product(db: Session, product_id: int):
 
     db.delete(product)
     db.commit()
+
+    catalog_cache.invalidate()
     return {"message": f"Product {product.title} deleted successfully"}
\ No newline at end of file
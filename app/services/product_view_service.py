@@ -0,0 +1,193 @@
+import logging
+import uuid
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy import Integer, column, delete, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from core.config import settings
+from core.redis import redis_client, async_redis_client
+from models.products import Product, ProductAnalytics, ProductCard, ProductViewFlush
+
+
+logger = logging.getLogger(__name__)
+
+# product_id -> pending views not yet written to product_analytics
+PENDING_VIEWS_KEY = "product_views:pending"
+# Snapshot being flushed; survives a failed flush so the retry re-applies it
+FLUSHING_VIEWS_KEY = "product_views:flushing"
+# Id of that snapshot, recorded in product_view_flushes when it is applied
+FLUSHING_ID_KEY = "product_views:flushing_id"
+# Held by the running flush so two flushes never work on one snapshot
+FLUSH_LOCK_KEY = "product_views:flush_lock"
+# Present while a flush message is queued, so views only enqueue one flush
+FLUSH_SCHEDULED_KEY = "product_views:flush_scheduled"
+
+FLUSH_BATCH_SIZE = 1000
+# Longer than any flush should take; the flush id still guards an overrun
+FLUSH_LOCK_TTL = 300
+# Applied flush ids only need to outlive a retried flush
+FLUSH_ID_RETENTION = timedelta(days=7)
+
+# Delete the lock only if it is still ours (it may have expired and been retaken)
+_RELEASE_LOCK_SCRIPT = redis_client.register_script(
+    "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0"
+)
+
+
+def _schedule_flush() -> None:
+    from tasks.product_views import flush_product_views
+
+    flush_product_views.send_with_options(
+        delay=settings.PRODUCT_VIEW_FLUSH_INTERVAL * 1000
+    )
+
+
+async def record_product_view(product_id: int) -> None:
+    """
+    Count a product view in Redis (write-behind). Views are best-effort:
+    a Redis outage drops them instead of failing the product page.
+    """
+    try:
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            pipe.hincrby(PENDING_VIEWS_KEY, str(product_id), 1)
+            pipe.set(
+                FLUSH_SCHEDULED_KEY,
+                1,
+                nx=True,
+                ex=settings.PRODUCT_VIEW_FLUSH_INTERVAL * 2,
+            )
+            _, needs_flush = await pipe.execute()
+    except RedisError:
+        logger.warning(f"Could not record view for product {product_id}")
+        return
+
+    if needs_flush:
+        try:
+            # Broker client is blocking; keep it off the event loop
+            await run_in_threadpool(_schedule_flush)
+        except Exception:
+            logger.exception("Could not schedule a product view flush")
+            # Let the next view try again instead of waiting out the marker
+            try:
+                await async_redis_client.delete(FLUSH_SCHEDULED_KEY)
+            except RedisError:
+                pass
+
+
+def _claim_pending_views() -> Tuple[Optional[str], Dict[int, int]]:
+    # A leftover snapshot means the previous flush did not finish; apply it first
+    if not redis_client.exists(FLUSHING_VIEWS_KEY):
+        if not redis_client.exists(PENDING_VIEWS_KEY):
+            return None, {}
+        redis_client.renamenx(PENDING_VIEWS_KEY, FLUSHING_VIEWS_KEY)
+
+    # Tag the snapshot once; a retry reads the same id back
+    redis_client.set(FLUSHING_ID_KEY, uuid.uuid4().hex, nx=True)
+    flush_id = redis_client.get(FLUSHING_ID_KEY)
+
+    raw = redis_client.hgetall(FLUSHING_VIEWS_KEY)
+    return flush_id, {int(pid): int(count) for pid, count in raw.items() if int(count) > 0}
+
+
+def _mark_flush_applied(db: Session, flush_id: str) -> bool:
+    """Record the snapshot as applied in the flush transaction; False if it already was."""
+    db.execute(
+        delete(ProductViewFlush)
+        .where(ProductViewFlush.applied_at < func.now() - FLUSH_ID_RETENTION)
+    )
+    return db.execute(
+        pg_insert(ProductViewFlush)
+        .values(flush_id=flush_id)
+        .on_conflict_do_nothing()
+        .returning(ProductViewFlush.flush_id)
+    ).first() is not None
+
+
+def _apply_view_deltas(db: Session, deltas: List[Tuple[int, int]]) -> None:
+    batch = values(
+        column("product_id", Integer),
+        column("delta", Integer),
+        name="view_deltas",
+    ).data(deltas)
+
+    # Products deleted since the view was counted drop out of the join
+    upsert = pg_insert(ProductAnalytics).from_select(
+        ["product_id", "view_count"],
+        select(batch.c.product_id, batch.c.delta).join(Product, Product.id == batch.c.product_id),
+    )
+    db.execute(
+        upsert.on_conflict_do_update(
+            constraint="uq_product_analytics_product_id",
+            set_=dict(
+                view_count=func.coalesce(ProductAnalytics.view_count, 0) + upsert.excluded.view_count,
+                updated_at=func.now(),
+            ),
+        )
+    )
+
+    db.execute(
+        update(ProductCard)
+        .where(ProductCard.product_id == batch.c.product_id)
+        .values(view_count=ProductCard.view_count + batch.c.delta)
+    )
+
+
+def flush_pending_product_views(db: Session) -> int:
+    """
+    Move pending Redis view counters into product_analytics with one
+    upsert from a VALUES list per batch. Returns the number of products touched.
+
+    Flushes hold FLUSH_LOCK_KEY, and each snapshot's id is committed with its
+    counts, so a snapshot is added once even if its Redis delete is lost.
+    """
+    token = uuid.uuid4().hex
+    if not redis_client.set(FLUSH_LOCK_KEY, token, nx=True, ex=FLUSH_LOCK_TTL):
+        # Another flush owns the snapshot; check back for views it leaves pending
+        _schedule_flush()
+        return 0
+
+    try:
+        return _flush_locked(db)
+    finally:
+        try:
+            _RELEASE_LOCK_SCRIPT(keys=[FLUSH_LOCK_KEY], args=[token])
+        except RedisError:
+            logger.warning("Could not release the product view flush lock")
+
+
+def _flush_locked(db: Session) -> int:
+    redis_client.delete(FLUSH_SCHEDULED_KEY)
+
+    flush_id, pending = _claim_pending_views()
+    if flush_id is None:
+        return 0
+
+    deltas = sorted(pending.items())
+    try:
+        applied = _mark_flush_applied(db, flush_id)
+        if applied:
+            for start in range(0, len(deltas), FLUSH_BATCH_SIZE):
+                _apply_view_deltas(db, deltas[start:start + FLUSH_BATCH_SIZE])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    redis_client.delete(FLUSHING_VIEWS_KEY, FLUSHING_ID_KEY)
+
+    # Views that arrived mid-flush did not schedule a new flush if the
+    # marker was still set; make sure they are not stranded.
+    if redis_client.exists(PENDING_VIEWS_KEY) and redis_client.set(
+        FLUSH_SCHEDULED_KEY, 1, nx=True, ex=settings.PRODUCT_VIEW_FLUSH_INTERVAL * 2
+    ):
+        _schedule_flush()
+
+    if not applied:
+        logger.info(f"Product view snapshot {flush_id} was already applied; dropped it")
+        return 0
+    return len(deltas)
@@ -0,0 +1,110 @@
+import dramatiq
+import logging
+
+from redis.exceptions import LockError
+
+from core.redis import redis_client
+from db.session import db as database
+from services.order_aggregate import load_order_aggregate
+from services.order_service import OrderFulfillmentService, StageTimer
+from tasks.shiprocket_order import create_shiprocket_order, ship_order
+
+
+logger = logging.getLogger(__name__)
+
+# How long one run may hold the per-order lock (S3, SMTP and Shiprocket calls)
+FULFILLMENT_LOCK_TIMEOUT = 300
+# First retry of a failed Shiprocket stage, matching create_shiprocket_order's min_backoff
+SHIPROCKET_HANDOFF_DELAY_MS = 30000
+
+
+def run_fulfillment(order_id: int) -> None:
+    """
+    Load the order aggregate once and run every fulfillment stage on it:
+    invoice (number, PDF, S3), customer email, admin email, Shiprocket.
+
+    A failed invoice/email stage fails the run so dramatiq retries it; the
+    retry skips stages whose flags are already set. A failed Shiprocket stage
+    is handed to the create_shiprocket_order actor and its own backoff.
+    """
+    lock = redis_client.lock(f"fulfillment:lock:{order_id}", timeout=FULFILLMENT_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        logger.info(f"Fulfillment for order {order_id} is already running")
+        return
+
+    db = database.get_session()
+    timer = StageTimer(order_id)
+    failed = []
+
+    try:
+        with timer.stage("load"):
+            order = load_order_aggregate(db, order_id)
+
+        if not order:
+            logger.warning(f"Order {order_id} not found")
+            return
+
+        if not OrderFulfillmentService.is_confirmed(order):
+            logger.info(f"Order {order_id} not confirmed yet")
+            return
+
+        pdf_bytes = None
+        if OrderFulfillmentService.needs_invoice(order):
+            try:
+                with timer.stage("invoice"):
+                    order, pdf_bytes = OrderFulfillmentService.prepare_invoice(db, order)
+            except Exception:
+                db.rollback()
+                logger.exception(f"Invoice stage failed for order {order_id}")
+                failed.append("invoice")
+
+        # The confirmation email carries the invoice, so it waits for it
+        if pdf_bytes and OrderFulfillmentService.needs_customer_email(order):
+            try:
+                with timer.stage("customer_email"):
+                    OrderFulfillmentService.send_customer_email(db, order, pdf_bytes)
+            except Exception:
+                db.rollback()
+                logger.exception(f"Customer email stage failed for order {order_id}")
+                failed.append("customer_email")
+
+        if not order.admin_notified:
+            try:
+                with timer.stage("admin_email"):
+                    OrderFulfillmentService.notify_admin(db, order)
+            except Exception:
+                db.rollback()
+                logger.exception(f"Admin email stage failed for order {order_id}")
+                failed.append("admin_email")
+
+        if not order.shiprocket_order_id and order.serviceable:
+            try:
+                with timer.stage("shiprocket"):
+                    ship_order(db, order)
+            except Exception:
+                db.rollback()
+                logger.exception(f"Shiprocket stage failed for order {order_id}, handing off")
+                create_shiprocket_order.send_with_options(
+                    args=(order_id,),
+                    delay=SHIPROCKET_HANDOFF_DELAY_MS,
+                )
+
+    finally:
+        timer.record()
+        db.close()
+        try:
+            lock.release()
+        except LockError:
+            # Lock expired mid-run; another worker may already own it
+            pass
+
+    if failed:
+        raise RuntimeError(f"Fulfillment stages failed for order {order_id}: {', '.join(failed)}")
+
+    logger.info(f"Order fulfillment completed for order {order_id}")
+
+
+@dramatiq.actor(queue_name="order_fulfillment", max_retries=5)
+def fulfill_order(order_id: int):
+    """Single post-confirmation pipeline (see run_fulfillment)."""
+    run_fulfillment(order_id)
@@ -0,0 +1,54 @@
+"""
+Outbox relay: moves committed outbox rows onto the dramatiq broker.
+
+    python -m tasks.outbox_relay
+
+Run one or more next to the workers; FOR UPDATE SKIP LOCKED lets several
+relays share the table without sending a row twice.
+"""
+import logging
+import time
+
+import dramatiq
+
+# Installs the Redis broker, the worker pool profile and every actor
+import tasks.workers  # noqa: F401
+from core.config import settings
+from db.session import get_db_session
+from services.outbox_service import relay_outbox_batch
+
+
+logger = logging.getLogger(__name__)
+
+
+def run_forever() -> None:
+    broker = dramatiq.get_broker()
+    backoff = settings.OUTBOX_RELAY_POLL_INTERVAL
+
+    while True:
+        db = get_db_session()
+        try:
+            sent = relay_outbox_batch(
+                db,
+                broker,
+                batch_size=settings.OUTBOX_RELAY_BATCH_SIZE,
+                max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+                base_delay=settings.OUTBOX_RETRY_BASE_DELAY,
+                max_delay=settings.OUTBOX_RETRY_MAX_DELAY,
+            )
+            backoff = settings.OUTBOX_RELAY_POLL_INTERVAL
+        except Exception:
+            logger.exception("Outbox relay pass failed; retrying")
+            sent = 0
+            backoff = min(backoff * 2, 30)
+        finally:
+            db.close()
+
+        # Keep draining while batches come back full
+        if sent < settings.OUTBOX_RELAY_BATCH_SIZE:
+            time.sleep(backoff)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_forever()
@@ -0,0 +1,25 @@
+import dramatiq
+import logging
+
+from db.session import get_db_session
+from utils.order import OrderService
+
+
+logger = logging.getLogger(__name__)
+
+
+@dramatiq.actor(queue_name="admin", max_retries=5)
+def expire_unattached_order(order_id: int):
+    """
+    Delayed safety net for the two-phase Razorpay checkout: cancels the
+    order if no gateway order was ever attached to its payment.
+    """
+
+    db = get_db_session()
+
+    try:
+        if OrderService.expire_unattached_order(db, order_id):
+            logger.warning(f"Cancelled order {order_id}: no Razorpay order was attached")
+
+    finally:
+        db.close()
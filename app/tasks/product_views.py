@@ -0,0 +1,27 @@
+import dramatiq
+import logging
+
+from db.session import get_db_session
+from services.product_view_service import flush_pending_product_views
+
+
+logger = logging.getLogger(__name__)
+
+
+# Shares the low-traffic admin queue so no extra worker service is needed
+@dramatiq.actor(queue_name="admin", max_retries=5)
+def flush_product_views():
+    """
+    Write buffered product views from Redis into product_analytics.
+    Enqueued (delayed) by the first view after each flush.
+    """
+
+    db = get_db_session()
+
+    try:
+        flushed = flush_pending_product_views(db)
+        if flushed:
+            logger.info(f"Flushed views for {flushed} products")
+
+    finally:
+        db.close()
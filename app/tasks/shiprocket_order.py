@@ -2,8 +2,12 @@ import dramatiq
 import logging
 from datetime import datetime
 
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
 from db.session import get_db_session
 from models.order import Order
+from services.order_aggregate import OrderSnapshot, load_order_aggregate
 from core.config import settings
 from services.shiprocket_service import ShiprocketService
 
@@ -16,9 +20,9 @@ DEFAULT_BREADTH = 35  # cm
 DEFAULT_HEIGHT = 5   # cm
 
 
-def build_shiprocket_order_payload(order: Order) -> dict:
+def build_shiprocket_order_payload(order: OrderSnapshot) -> dict:
     """
-    Build the Shiprocket order payload from an Order model.
+    Build the Shiprocket order payload from an order snapshot.
     """
     # Build order items for Shiprocket
     order_items = []
@@ -101,103 +105,133 @@ def build_shiprocket_order_payload(order: Order) -> dict:
     return payload
 
 
+def submit_shiprocket_order(order: OrderSnapshot) -> dict:
+    """
+    Create the Shiprocket order (and try to assign a courier). Returns the
+    order columns to store; the caller writes and commits them.
+    """
+    import asyncio
+
+    order_id = order.id
+    fields = {}
+
+    # Build the Shiprocket payload
+    payload = build_shiprocket_order_payload(order)
+
+    # Create Shiprocket service and authenticate
+    shiprocket = ShiprocketService(
+        email=settings.SHIPROCKET_EMAIL,
+        password=settings.SHIPROCKET_PASSWORD
+    )
+
+    # Run async operations
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        # Authenticate
+        loop.run_until_complete(shiprocket.authenticate())
+
+        # Create order in Shiprocket
+        response = loop.run_until_complete(shiprocket.create_order(payload))
+
+        logger.info(f"[Shiprocket] Order {order_id} creation response: {response}")
+
+        # Extract Shiprocket order details
+        shiprocket_order_id = response.get("order_id")
+        shipment_id = response.get("shipment_id")
+
+        if shiprocket_order_id:
+            fields["shiprocket_order_id"] = str(shiprocket_order_id)
+
+        if shipment_id:
+            fields["shiprocket_shipment_id"] = str(shipment_id)
+
+            # Optionally auto-assign courier (AWB)
+            try:
+                awb_response = loop.run_until_complete(
+                    shiprocket.assign_courier(int(shipment_id))
+                )
+                logger.info(f"[Shiprocket] AWB assignment response for order {order_id}: {awb_response}")
+
+                # Extract AWB and courier info
+                awb_data = awb_response.get("response", {}).get("data", {})
+                if awb_data:
+                    fields["awb_code"] = awb_data.get("awb_code")
+                    fields["courier_name"] = awb_data.get("courier_name")
+
+            except Exception as awb_error:
+                # AWB assignment can fail if no courier available
+                # This is not critical - can be done manually later
+                logger.warning(f"[Shiprocket] AWB assignment failed for order {order_id}: {awb_error}")
+
+    finally:
+        loop.close()
+
+    return fields
+
+
+def ship_order(db: Session, order: OrderSnapshot) -> bool:
+    """
+    Send a loaded order to Shiprocket unless it already has a Shiprocket
+    order or is not serviceable. The order row stays locked through the
+    API calls so concurrent workers cannot both create it. Returns True if
+    an order was created.
+    """
+    # Lock the order for update and re-read the guard columns
+    locked = db.execute(
+        select(Order.shiprocket_order_id, Order.serviceable)
+        .where(Order.id == order.id)
+        .with_for_update()
+    ).one()
+
+    # Idempotency check - skip if already created
+    if locked.shiprocket_order_id:
+        logger.info(f"[Shiprocket] Order {order.id} already has Shiprocket order: {locked.shiprocket_order_id}")
+        db.commit()
+        return False
+
+    # Check serviceability flag
+    if not locked.serviceable:
+        logger.warning(f"[Shiprocket] Order {order.id} marked as not serviceable, skipping")
+        db.commit()
+        return False
+
+    fields = submit_shiprocket_order(order)
+    if fields:
+        db.execute(update(Order).where(Order.id == order.id).values(**fields))
+    db.commit()
+    return True
+
+
 @dramatiq.actor(queue_name="shiprocket", max_retries=5, min_backoff=30000, max_backoff=300000)
 def create_shiprocket_order(order_id: int):
     """
-    Dramatiq worker to create an order in Shiprocket.
-    
+    Dramatiq worker to create an order in Shiprocket. The fulfillment
+    pipeline hands the stage off here when it fails, so retries get this
+    queue's slower backoff without re-running the other stages.
+
     Features:
     - Idempotency: Skips if shiprocket_order_id already exists
     - Automatic retries with exponential backoff
     - Proper error logging for monitoring
     """
-    import asyncio
-    
     db = get_db_session()
-    
+
     try:
-        # Lock the order for update
-        order = (
-            db.query(Order)
-            .filter(Order.id == order_id)
-            .with_for_update()
-            .first()
-        )
-        
+        order = load_order_aggregate(db, order_id)
+
         if not order:
             logger.warning(f"[Shiprocket] Order {order_id} not found")
             return
-        
-        # Idempotency check - skip if already created
-        if order.shiprocket_order_id:
-            logger.info(f"[Shiprocket] Order {order_id} already has Shiprocket order: {order.shiprocket_order_id}")
-            return
-        
-        # Check serviceability flag
-        if not order.serviceable:
-            logger.warning(f"[Shiprocket] Order {order_id} marked as not serviceable, skipping")
-            return
-        
-        # Build the Shiprocket payload
-        payload = build_shiprocket_order_payload(order)
-        
-        # Create Shiprocket service and authenticate
-        shiprocket = ShiprocketService(
-            email=settings.SHIPROCKET_EMAIL,
-            password=settings.SHIPROCKET_PASSWORD
-        )
-        
-        # Run async operations
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            # Authenticate
-            loop.run_until_complete(shiprocket.authenticate())
-            
-            # Create order in Shiprocket
-            response = loop.run_until_complete(shiprocket.create_order(payload))
-            
-            logger.info(f"[Shiprocket] Order {order_id} creation response: {response}")
-            
-            # Extract Shiprocket order details
-            shiprocket_order_id = response.get("order_id")
-            shipment_id = response.get("shipment_id")
-            
-            if shiprocket_order_id:
-                order.shiprocket_order_id = str(shiprocket_order_id)
-                
-            if shipment_id:
-                order.shiprocket_shipment_id = str(shipment_id)
-                
-                # Optionally auto-assign courier (AWB)
-                try:
-                    awb_response = loop.run_until_complete(
-                        shiprocket.assign_courier(int(shipment_id))
-                    )
-                    logger.info(f"[Shiprocket] AWB assignment response for order {order_id}: {awb_response}")
-                    
-                    # Extract AWB and courier info
-                    awb_data = awb_response.get("response", {}).get("data", {})
-                    if awb_data:
-                        order.awb_code = awb_data.get("awb_code")
-                        order.courier_name = awb_data.get("courier_name")
-                        
-                except Exception as awb_error:
-                    # AWB assignment can fail if no courier available
-                    # This is not critical - can be done manually later
-                    logger.warning(f"[Shiprocket] AWB assignment failed for order {order_id}: {awb_error}")
-            
-            db.commit()
+
+        if ship_order(db, order):
             logger.info(f"[Shiprocket] Successfully created Shiprocket order for order {order_id}")
-            
-        finally:
-            loop.close()
-            
+
     except Exception as e:
         db.rollback()
         logger.exception(f"[Shiprocket] Failed to create Shiprocket order for order {order_id}: {e}")
         raise  # Allow Dramatiq to retry
-        
+
     finally:
         db.close()
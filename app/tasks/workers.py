@@ -1,5 +1,13 @@
+import os
+
+# Must run before anything imports core.config, so workers get their own pool profile
+os.environ.setdefault("DB_POOL_PROFILE", "worker")
+
 import core.dramatiq
 
+import tasks.fulfillment
 import tasks.process_order
 import tasks.notify_admin
 import tasks.shiprocket_order
+import tasks.product_views
+import tasks.pending_orders
@@ -0,0 +1,42 @@
+from utils.cache import VersionedLocalCache
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+def test_value_is_kept_while_the_version_does_not_move(clock, redis):
+    cache, load = VersionedLocalCache("test:version", ttl_seconds=10), Loader()
+
+    assert cache.get(load) == 1
+    clock.now += 60
+    assert cache.get(load) == 1
+
+    redis.incr("test:version")
+    clock.now += 10
+    assert cache.get(load) == 2
+
+
+def test_max_age_reloads_even_if_the_version_does_not_move(clock, redis):
+    cache, load = VersionedLocalCache("test:version", ttl_seconds=10, max_age_seconds=30), Loader()
+
+    assert cache.get(load) == 1
+    clock.now += 25
+    assert cache.get(load) == 1
+    clock.now += 5
+    assert cache.get(load) == 2
+    assert load.calls == 2
+
+
+def test_invalidate_reloads_locally_at_once(clock, redis):
+    cache, load = VersionedLocalCache("test:version", ttl_seconds=10, max_age_seconds=30), Loader()
+
+    cache.get(load)
+    cache.invalidate()
+    assert cache.get(load) == 2
+    assert redis.get("test:version") == "1"
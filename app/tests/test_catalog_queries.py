@@ -0,0 +1,77 @@
+"""Catalog reads must cost a fixed number of statements, however big the catalog."""
+import pytest
+
+from benchmarks.seed import Seeder, reset
+from services.product_service import (
+    get_product_by_id,
+    get_products_by_category,
+    get_products_paginated,
+    get_top_products_by_category,
+)
+from utils import pricing
+
+
+pytestmark = pytest.mark.anyio
+
+
+def seed_catalog(db, categories: int, products_per_category: int = 6) -> None:
+    reset(db)
+    seeder = Seeder(
+        db,
+        dict(categories=categories, subcategories=2, products=categories * products_per_category,
+             users=0, orders=0, coupons=0),
+        seed=7,
+        batch_size=1_000,
+    )
+    seeder.catalog()
+    seeder.finish()
+
+
+async def test_top_viewed_query_count_does_not_grow_with_categories(db, async_session, queries):
+    counts = []
+    for categories in (2, 10):
+        # Release the read locks held by the previous iteration before TRUNCATE
+        await async_session.rollback()
+        seed_catalog(db, categories)
+        async_session.expunge_all()
+        with queries:
+            result = await get_top_products_by_category(async_session, limit_per_category=4)
+        assert len(result) == categories
+        counts.append(queries.count)
+
+    assert counts == [1, 1]
+
+
+async def test_listing_query_count_does_not_grow_with_products(db, async_session, queries):
+    counts = []
+    for per_category in (2, 30):
+        await async_session.rollback()
+        seed_catalog(db, 1, per_category)
+        async_session.expunge_all()
+        with queries:
+            page = await get_products_paginated(async_session, limit=50, category_id=1)
+            products = await get_products_by_category(async_session, 1)
+        assert len(page["data"]) == len(products) > 0
+        counts.append(queries.count)
+
+    assert counts[0] == counts[1]
+
+
+async def test_detail_query_count_does_not_grow_with_dimensions(db, async_session, queries):
+    seed_catalog(db, 1, 40)
+    rows = (await get_products_paginated(async_session, limit=40, is_active=True))["data"]
+    fewest = min(rows, key=lambda row: len(row["dimensions"]))
+    most = max(rows, key=lambda row: len(row["dimensions"]))
+    assert len(fewest["dimensions"]) < len(most["dimensions"])
+
+    counts = []
+    for product_id in (fewest["id"], most["id"]):
+        # Count the multiplier load too, not just a warm cache
+        pricing._multiplier_cache.clear_local()
+        async_session.expunge_all()
+        with queries:
+            product = await get_product_by_id(async_session, product_id)
+        assert product["dimension_pricing"]
+        counts.append(queries.count)
+
+    assert counts[0] == counts[1]
@@ -0,0 +1,134 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from benchmarks.seed import Seeder
+from core.config import settings
+from models.coupon import Coupon, CouponRuleType
+from models.order import Order
+from schemas.payment import OrderStatus
+from services.coupon_service import (
+    CouponService,
+    coupon_code_filter,
+    get_coupon_terms,
+    invalidate_coupon_rules,
+)
+
+
+@pytest.fixture
+def user_id(db):
+    seeder = Seeder(db, dict(users=1), seed=5, batch_size=100)
+    seeder.users()
+    db.commit()
+    return seeder.user_ids[0]
+
+
+@pytest.fixture(autouse=True)
+def empty_coupon_caches(redis):
+    invalidate_coupon_rules()
+    yield
+    invalidate_coupon_rules()
+
+
+def add_coupon(db, code: str, **values) -> Coupon:
+    coupon = Coupon(code=code, rule_type=CouponRuleType.PERCENT_CART, percent_off=10, **values)
+    db.add(coupon)
+    db.commit()
+    return coupon
+
+
+def add_order(db, user_id: str) -> int:
+    order = Order(
+        user_id=user_id,
+        idempotency_key=f"coupon-test-{db.query(Order).count()}",
+        delivery_name="Test User",
+        delivery_phone_number="9000000001",
+        delivery_address_line="1 Test Street",
+        delivery_city="Mumbai",
+        delivery_state="MH",
+        delivery_zip_code="400001",
+        amount=499.0,
+        order_status=OrderStatus.CREATED,
+    )
+    db.add(order)
+    db.flush()
+    return order.id
+
+
+def set_coupon(db, code: str, **values) -> None:
+    """Edit a coupon directly in the database, as admins do (no invalidation)."""
+    db.execute(update(Coupon).where(Coupon.code == code).values(**values))
+    db.commit()
+
+
+def test_record_usage_uses_the_current_per_user_cap(db, user_id):
+    add_coupon(db, "ONCE", max_uses_per_user=1)
+    terms = get_coupon_terms(db, "ONCE")
+
+    set_coupon(db, "ONCE", max_uses_per_user=2)
+    for _ in range(2):
+        CouponService.record_usage(db, terms, user_id, add_order(db, user_id))
+        db.commit()
+
+    set_coupon(db, "ONCE", max_uses_per_user=3)
+    terms = get_coupon_terms(db, "ONCE")
+    set_coupon(db, "ONCE", max_uses_per_user=2)
+    with pytest.raises(HTTPException) as exc_info:
+        CouponService.record_usage(db, terms, user_id, add_order(db, user_id))
+    assert "maximum number of times" in exc_info.value.detail
+
+
+def test_record_usage_rejects_a_zero_per_user_cap(db, user_id):
+    terms = get_coupon_terms(db, add_coupon(db, "NEVER").code)
+    set_coupon(db, "NEVER", max_uses_per_user=0)
+
+    with pytest.raises(HTTPException):
+        CouponService.record_usage(db, terms, user_id, add_order(db, user_id))
+
+
+def test_coupon_edited_in_the_database_is_picked_up_after_the_ttl(db, user_id, clock):
+    add_coupon(db, "EDITED")
+    assert CouponService.fetch_and_validate(db, "EDITED", user_id).percent_off == 10
+
+    set_coupon(db, "EDITED", percent_off=25)
+    clock.now += settings.COUPON_RULE_CACHE_TTL
+    assert CouponService.fetch_and_validate(db, "EDITED", user_id).percent_off == 25
+
+    set_coupon(db, "EDITED", is_active=False)
+    clock.now += settings.COUPON_RULE_CACHE_TTL
+    with pytest.raises(HTTPException):
+        CouponService.fetch_and_validate(db, "EDITED", user_id)
+
+
+def test_eligible_terms_are_compiled_from_the_loaded_rows(db, user_id):
+    add_coupon(db, "BEST")
+    assert get_coupon_terms(db, "BEST").percent_off == 10
+
+    set_coupon(db, "BEST", percent_off=30)
+    [terms] = CouponService.eligible_terms(db, user_id)
+    assert terms.percent_off == 30
+    assert terms.rule.percent_off == 30
+
+
+def test_coupon_inserted_in_the_database_becomes_valid_within_the_ttl(db, user_id, clock):
+    add_coupon(db, "KNOWN")
+    CouponService.fetch_and_validate(db, "KNOWN", user_id)
+
+    add_coupon(db, "NEW")
+    rejected = coupon_code_filter.stats()["rejected"]
+    with pytest.raises(HTTPException):
+        CouponService.fetch_and_validate(db, "NEW", user_id)
+    assert coupon_code_filter.stats()["rejected"] == rejected + 1
+
+    clock.now += settings.COUPON_RULE_CACHE_TTL
+    assert CouponService.fetch_and_validate(db, "NEW", user_id).code == "NEW"
+
+
+def test_reactivated_coupon_becomes_valid_within_the_ttl(db, user_id, clock):
+    add_coupon(db, "PAUSED", is_active=False)
+    with pytest.raises(HTTPException):
+        CouponService.fetch_and_validate(db, "PAUSED", user_id)
+
+    set_coupon(db, "PAUSED", is_active=True)
+    clock.now += settings.COUPON_RULE_CACHE_TTL
+    assert CouponService.fetch_and_validate(db, "PAUSED", user_id).is_active
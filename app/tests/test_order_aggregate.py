@@ -0,0 +1,78 @@
+"""load_order_aggregate fetches the whole order graph in a fixed number of statements."""
+import pytest
+
+from benchmarks.seed import Seeder
+from models.order import Order, OrderItem, Payment
+from schemas.payment import OrderStatus, PaymentStatus
+from services import email_service
+from services.order_aggregate import load_order_aggregate
+from tasks.shiprocket_order import build_shiprocket_order_payload
+from utils.invoice import build_invoice_pdf
+
+
+@pytest.fixture
+def seeder(db):
+    seeder = Seeder(
+        db,
+        dict(categories=2, subcategories=2, products=20, users=1, orders=0, coupons=0),
+        seed=11,
+        batch_size=1_000,
+    )
+    seeder.catalog()
+    seeder.users()
+    db.commit()
+    return seeder
+
+
+def create_order(db, seeder, item_count: int) -> int:
+    order = Order(
+        user_id=seeder.user_ids[0],
+        idempotency_key=f"test-{item_count}",
+        delivery_name="Test User",
+        delivery_phone_number="9000000001",
+        delivery_address_line="1 Test Street",
+        delivery_city="Mumbai",
+        delivery_state="MH",
+        delivery_zip_code="400001",
+        quantity=item_count,
+        items_subtotal=499.0 * item_count,
+        amount=499.0 * item_count,
+        order_status=OrderStatus.CONFIRMED,
+        invoice_number=f"INV-TEST-{item_count}",
+    )
+    order.items = [
+        OrderItem(product_id=product_id, quantity=1, price=499.0, dimension=dimensions[0])
+        for product_id, _, _, dimensions in seeder.products[:item_count]
+    ]
+    order.payment = Payment(payment_method="COD", amount=order.amount, status=PaymentStatus.SUCCESS)
+    db.add(order)
+    db.commit()
+    return order.id
+
+
+def test_load_order_aggregate_query_count_does_not_grow_with_items(db, seeder, queries):
+    counts = []
+    for item_count in (1, 8):
+        order_id = create_order(db, seeder, item_count)
+        db.expunge_all()
+        with queries:
+            order = load_order_aggregate(db, order_id)
+        assert len(order.items) == item_count
+        assert all(item.product.title for item in order.items)
+        counts.append(queries.count)
+
+    assert counts == [2, 2]
+
+
+def test_builders_read_only_the_snapshot(db, seeder, queries, monkeypatch):
+    monkeypatch.setattr(email_service, "send_email", lambda *args, **kwargs: None)
+    order = load_order_aggregate(db, create_order(db, seeder, 3))
+    db.close()
+
+    with queries:
+        assert build_invoice_pdf(order)
+        assert len(build_shiprocket_order_payload(order)["order_items"]) == 3
+        email_service.send_admin_order_notification("admin@test.invalid", "order@test.invalid", order)
+        email_service.send_order_confirmation_email(order.user.email, "noreply@test.invalid", order=order)
+
+    assert queries.count == 0
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+
+import dramatiq
+import pytest
+from dramatiq.brokers.redis import RedisBroker
+from sqlalchemy import select, update
+
+import tasks.fulfillment  # noqa: F401  registers fulfill_order on the stub broker
+from models.outbox import OutboxMessage
+from services.outbox_service import add_outbox_message, relay_outbox_batch
+
+
+MAX_ATTEMPTS = 3
+
+
+def relay(db, broker):
+    return relay_outbox_batch(db, broker, batch_size=10, max_attempts=MAX_ATTEMPTS, base_delay=5, max_delay=60)
+
+
+@pytest.fixture
+def broker():
+    broker = dramatiq.get_broker()
+    broker.flush_all()
+    return broker
+
+
+@pytest.fixture
+def message(db):
+    add_outbox_message(db, "fulfill_order", 42)
+    db.commit()
+    return db.execute(select(OutboxMessage)).scalar_one()
+
+
+def broker_down(*args, **kwargs):
+    raise ConnectionError("broker unreachable")
+
+
+def test_sent_messages_are_deleted(db, broker, message):
+    assert relay(db, broker) == 1
+    assert broker.queues["order_fulfillment"].qsize() == 1
+    assert db.execute(select(OutboxMessage)).first() is None
+
+
+def test_failed_send_counts_an_attempt_and_backs_off(db, broker, message, monkeypatch):
+    monkeypatch.setattr(broker, "enqueue", broker_down)
+    with pytest.raises(ConnectionError):
+        relay(db, broker)
+
+    db.expire_all()
+    assert message.attempts == 1
+    assert "broker unreachable" in message.last_error
+    assert message.available_at > datetime.now(timezone.utc) + timedelta(seconds=3)
+
+    # Not due yet, even with the broker back
+    monkeypatch.undo()
+    assert relay(db, broker) == 0
+
+
+def test_message_is_parked_after_max_attempts(db, broker, message, monkeypatch):
+    monkeypatch.setattr(broker, "enqueue", broker_down)
+    for _ in range(MAX_ATTEMPTS):
+        db.execute(update(OutboxMessage).values(available_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+        db.commit()
+        with pytest.raises(ConnectionError):
+            relay(db, broker)
+
+    monkeypatch.undo()
+    db.execute(update(OutboxMessage).values(available_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+    db.commit()
+
+    assert relay(db, broker) == 0
+    db.expire_all()
+    assert message.attempts == MAX_ATTEMPTS
+    assert message.parked
+    assert broker.queues["order_fulfillment"].qsize() == 0
+
+
+@pytest.fixture
+def redis_broker(monkeypatch):
+    """A RedisBroker (never connected) that records what it dispatches."""
+    broker = RedisBroker(host="localhost")
+    dramatiq.actor(lambda order_id: None, actor_name="fulfill_order", queue_name="order_fulfillment", broker=broker)
+    broker.dispatched = []
+
+    def do_enqueue(queue_name, message_id, payload):
+        if len(broker.dispatched) == broker.fail_at:
+            raise ConnectionError("broker unreachable")
+        broker.dispatched.append(queue_name)
+
+    broker.fail_at = None
+    monkeypatch.setattr(broker, "do_enqueue", do_enqueue)
+    return broker
+
+
+def test_redis_broker_gets_each_message_through_enqueue(db, redis_broker):
+    add_outbox_message(db, "fulfill_order", 1)
+    add_outbox_message(db, "fulfill_order", 2, delay_ms=1000)
+    db.commit()
+
+    assert relay(db, redis_broker) == 2
+    assert redis_broker.dispatched == ["order_fulfillment", "order_fulfillment.DQ"]
+    assert db.execute(select(OutboxMessage)).first() is None
+
+
+def test_rows_sent_before_a_failure_are_not_sent_again(db, redis_broker):
+    for order_id in (1, 2, 3):
+        add_outbox_message(db, "fulfill_order", order_id)
+    db.commit()
+
+    redis_broker.fail_at = 1
+    with pytest.raises(ConnectionError):
+        relay(db, redis_broker)
+
+    left = db.execute(select(OutboxMessage).order_by(OutboxMessage.id)).scalars().all()
+    assert [row.args for row in left] == [[2], [3]]
+    assert [row.attempts for row in left] == [1, 1]
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from services.order_search_service import OrderFilters, search_orders
+from services.product_service import get_products_paginated
+from utils.pagination import decode_cursor, encode_cursor
+from utils.users import get_user_orders
+
+
+CREATED_AT = datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("newest", CREATED_AT, 42)
+    assert decode_cursor(cursor, 3, (str, datetime, int)) == ["newest", CREATED_AT, 42]
+
+
+@pytest.mark.parametrize("cursor, size, types", [
+    ("not-a-cursor", 2, None),
+    (encode_cursor(1, 2, 3), 2, None),
+    (encode_cursor({"dt": "yesterday"}, 1), 2, None),
+    (encode_cursor({"dt": "yesterday"}), 1, None),
+    (encode_cursor(199.0, 42), 2, (datetime, int)),
+    (encode_cursor(CREATED_AT, True), 2, (datetime, int)),
+])
+def test_invalid_cursor_is_a_400(cursor, size, types):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, size, types)
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("cursor, sort_by", [
+    (encode_cursor("price_asc", 199.0, 42), "newest"),
+    (encode_cursor("newest", CREATED_AT, 42), "price_desc"),
+    (encode_cursor("price_asc", CREATED_AT, 42), "price_asc"),
+])
+async def test_product_cursor_from_another_sort_is_rejected(cursor, sort_by):
+    # Rejected before any statement is built, so no session is needed
+    with pytest.raises(HTTPException) as exc_info:
+        await get_products_paginated(None, cursor=cursor, sort_by=sort_by)
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", [
+    encode_cursor(199.0, 42),
+    encode_cursor("newest", 42),
+])
+def test_order_history_cursor_must_be_a_timestamp_and_id(cursor):
+    # An unbound session: the cursor is checked before anything is executed
+    with pytest.raises(HTTPException) as exc_info:
+        get_user_orders(Session(), "user-1", cursor=cursor)
+    assert exc_info.value.status_code == 400
+
+
+def test_admin_order_search_cursor_must_be_a_timestamp_and_id():
+    with pytest.raises(HTTPException) as exc_info:
+        search_orders(None, OrderFilters(), cursor=encode_cursor("newest", 42))
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,51 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils.pricing import (
+    build_dimension_pricing,
+    build_dimension_pricing_batch,
+    round_price_to_9,
+    round_prices_to_9,
+)
+
+
+MULTIPLIERS = {"A5": 0.8, "A4": 1.0, "A3": 1.35, "A2": 1.8, "Poster": 2.2}
+
+
+@pytest.mark.parametrize("value", [
+    # .5 boundaries round half to even in both
+    0.5, 1.5, 2.5, 9.5, 10.5, 14.5, 15.5, 18.5, 19.5, 1234.5,
+    # already ending in 9, or rounding onto it
+    9.0, 19.0, 1239.0, 8.6, 9.4, 1238.5, 1239.5,
+    # ending in 0
+    10.0, 100.0, 0.0,
+    538.65, 1438.2, 399 * 1.35, 799 * 2.2,
+])
+def test_vectorized_rounding_matches_round_price_to_9(value):
+    assert round_prices_to_9(np.array([value])).tolist() == [round_price_to_9(value)]
+
+
+def test_vectorized_rounding_matches_on_random_prices():
+    rng = random.Random(10)
+    values = [rng.uniform(0, 10_000) for _ in range(5_000)]
+    values += [rng.randrange(0, 20_000) / 2 for _ in range(5_000)]
+
+    assert round_prices_to_9(np.array(values)).tolist() == [round_price_to_9(v) for v in values]
+
+
+def test_batch_matches_per_product_pricing():
+    rng = random.Random(11)
+    dimensions = list(MULTIPLIERS) + ["Custom"]     # no multiplier: 1.0
+    products = []
+    for _ in range(500):
+        price = float(rng.randrange(199, 4999, 10))
+        discounted = round(price * rng.uniform(0.6, 0.95), 2) if rng.random() < 0.7 else None
+        products.append((rng.sample(dimensions, rng.randint(1, len(dimensions))), price, discounted))
+    products.append(([], 499.0, None))
+
+    assert build_dimension_pricing_batch(products, MULTIPLIERS) == [
+        build_dimension_pricing(dims, price, discounted, MULTIPLIERS)
+        for dims, price, discounted in products
+    ]
@@ -0,0 +1,145 @@
+"""
+Checkout pricing from snapshots; no database needed.
+
+Expected values were worked out with the pre-engine code path
+(_validate_and_price_items and CouponService.compute_discount) on the same carts.
+"""
+import pytest
+from fastapi import HTTPException
+
+from models.coupon import Coupon, CouponRuleType
+from services.delivery_charge_service import DeliveryChargePolicy
+from services.pricing_engine import (
+    CouponTerms,
+    PricingSnapshot,
+    ProductPrice,
+    compute_discount,
+    evaluate_coupons,
+    price_checkout,
+    price_lines,
+)
+
+
+POSTER = ProductPrice(id=1, price=499.0, discounted_price=399.0, dimensions=("A4", "A3"))
+PRINT = ProductPrice(id=2, price=799.0, discounted_price=None, dimensions=("A4", "A3", "A2"))
+MULTIPLIERS = {"A4": 1.0, "A3": 1.35, "A2": 1.8}
+POLICY = DeliveryChargePolicy(base_charge=79.0, free_delivery_threshold=999.0)
+
+
+def snapshot(coupon=None) -> PricingSnapshot:
+    return PricingSnapshot.build([POSTER, PRINT], MULTIPLIERS, POLICY, coupon)
+
+
+def percent(code: str, percent_off: float) -> CouponTerms:
+    return CouponTerms.from_model(Coupon(
+        code=code, rule_type=CouponRuleType.PERCENT_CART, percent_off=percent_off, is_active=True,
+    ))
+
+
+def buy_2_get_1(code: str, eligible_dimensions=None) -> CouponTerms:
+    return CouponTerms.from_model(Coupon(
+        code=code,
+        rule_type=CouponRuleType.BUY_N_GET_M_SAME_DIMENSION,
+        required_qty=3,
+        free_qty=1,
+        eligible_dimensions=eligible_dimensions,
+        is_active=True,
+    ))
+
+
+def cart(*lines):
+    return [{"product_id": pid, "dimension": dim, "qty": qty} for pid, dim, qty in lines]
+
+
+def test_lines_are_priced_per_dimension_and_rounded_to_9():
+    lines, subtotal, quantity = price_lines(snapshot(), cart((1, "A3", 2), (2, "A4", 1), (2, "A2", 1)))
+
+    # 399 * 1.35 = 538.65 -> 539 (discounted price wins); 799 * 1.8 = 1438.2 -> 1439
+    assert [line.price for line in lines] == [539.0, 799.0, 1439.0]
+    assert subtotal == 539 * 2 + 799 + 1439
+    assert quantity == 4
+
+
+@pytest.mark.parametrize("items, detail", [
+    (cart((3, "A4", 1)), "Invalid product: 3"),
+    (cart((1, "A4", 0)), "Quantity must be >= 1"),
+    (cart((1, "A2", 1)), "Invalid dimension 'A2' for product 1"),
+])
+def test_invalid_lines_are_a_400(items, detail):
+    with pytest.raises(HTTPException) as exc_info:
+        price_lines(snapshot(), items)
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == detail
+
+
+def test_no_coupon():
+    result = price_checkout(snapshot(), cart((1, "A3", 2), (2, "A4", 1)))
+
+    assert result.items_subtotal == 1877.0
+    assert result.coupon_discount_amount == 0.0
+    assert result.breakdown() == {"items_subtotal": 1877.0, "delivery_charge": 0.0, "amount": 1877.0}
+
+
+def test_percent_coupon():
+    result = price_checkout(snapshot(percent("TEN", 10)), cart((1, "A3", 2), (2, "A4", 1)))
+
+    assert result.coupon_discount_amount == 187.7
+    assert result.matched_dimension is None
+    assert result.breakdown() == {"items_subtotal": 1689.3, "delivery_charge": 0.0, "amount": 1689.3}
+
+
+def test_delivery_is_charged_when_the_coupon_takes_the_subtotal_below_the_threshold():
+    items = cart((1, "A4", 1), (2, "A4", 1))
+    assert price_checkout(snapshot(), items).delivery_charge == 0.0
+
+    result = price_checkout(snapshot(percent("TWENTY", 20)), items)
+    assert result.coupon_discount_amount == 239.6
+    assert result.breakdown() == {"items_subtotal": 958.4, "delivery_charge": 79.0, "amount": 1037.4}
+
+
+def test_buy_n_get_m_same_dimension_frees_the_cheapest_unit():
+    result = price_checkout(snapshot(buy_2_get_1("B2G1")), cart((1, "A3", 2), (2, "A3", 1)))
+
+    assert result.items_subtotal == 2157.0
+    assert result.coupon_discount_amount == 539.0
+    assert result.matched_dimension == "A3"
+    assert result.amount == 1618.0
+
+
+@pytest.mark.parametrize("coupon, items, detail", [
+    (buy_2_get_1("B2G1A4", ["A4"]), cart((1, "A3", 2), (2, "A3", 1)),
+     "Coupon is only applicable to A4 dimension(s)"),
+    (buy_2_get_1("B2G1"), cart((1, "A3", 2), (2, "A4", 1)),
+     "Coupon requires all cart items to have the same dimension"),
+    # The cart falls short of the coupon's threshold (coupons have no minimum subtotal)
+    (buy_2_get_1("B2G1"), cart((1, "A3", 1), (2, "A3", 1)),
+     "Coupon requires exactly 3 unit(s) in cart, got 2"),
+])
+def test_cart_that_does_not_qualify_is_a_400(coupon, items, detail):
+    with pytest.raises(HTTPException) as exc_info:
+        price_checkout(snapshot(coupon), items)
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == detail
+
+
+def test_compute_discount_takes_a_coupon_row_or_compiled_terms():
+    coupon = Coupon(code="TEN", rule_type=CouponRuleType.PERCENT_CART, percent_off=10)
+    priced = [{"price": 539.0, "quantity": 2, "dimension": "A3"}, {"price": 799.0, "quantity": 1, "dimension": "A4"}]
+
+    expected = {"discount_amount": 187.7, "matched_dimension": None}
+    assert compute_discount(coupon, priced) == expected
+    assert compute_discount(CouponTerms.from_model(coupon), priced) == expected
+
+
+def test_evaluate_coupons_ranks_applicable_coupons_and_lists_the_rest():
+    coupons = [percent("TEN", 10), buy_2_get_1("B2G1A4", ["A4"]), buy_2_get_1("B2G1"), percent("TWENTY", 20)]
+    base, evaluations = evaluate_coupons(snapshot(percent("IGNORED", 50)), cart((1, "A3", 2), (2, "A3", 1)), coupons)
+
+    assert base.coupon is None and base.amount == 2157.0
+    assert [(ev.coupon.code, ev.result and ev.result.amount) for ev in evaluations] == [
+        ("B2G1", 1618.0),
+        ("TWENTY", 1725.6),
+        ("TEN", 1941.3),
+        ("B2G1A4", None),
+    ]
+    assert evaluations[-1].reason == "Coupon is only applicable to A4 dimension(s)"
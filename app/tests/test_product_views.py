@@ -0,0 +1,112 @@
+import pytest
+from redis.exceptions import RedisError
+from sqlalchemy import delete, select
+
+from benchmarks.seed import Seeder
+from models.products import ProductAnalytics, ProductCard
+from services import product_view_service
+from services.product_view_service import (
+    FLUSH_LOCK_KEY,
+    FLUSHING_VIEWS_KEY,
+    PENDING_VIEWS_KEY,
+    flush_pending_product_views,
+)
+
+
+@pytest.fixture
+def views_redis(redis, monkeypatch):
+    monkeypatch.setattr(product_view_service, "redis_client", redis)
+    redis.scheduled = 0
+
+    def schedule_flush():
+        redis.scheduled += 1
+
+    monkeypatch.setattr(product_view_service, "_schedule_flush", schedule_flush)
+    monkeypatch.setattr(
+        product_view_service,
+        "_RELEASE_LOCK_SCRIPT",
+        lambda keys, args: redis.get(keys[0]) == args[0] and redis.delete(keys[0]),
+    )
+    return redis
+
+
+@pytest.fixture
+def products(db, views_redis):
+    seeder = Seeder(
+        db,
+        dict(categories=1, subcategories=1, products=3, users=0, orders=0, coupons=0),
+        seed=3,
+        batch_size=100,
+    )
+    seeder.catalog()
+    seeder.finish()
+    return [product_id for product_id, *_ in seeder.products]
+
+
+def view_counts(db):
+    db.expire_all()
+    analytics = db.execute(
+        select(ProductAnalytics.product_id, ProductAnalytics.view_count).order_by(ProductAnalytics.id)
+    ).all()
+    cards = dict(db.execute(select(ProductCard.product_id, ProductCard.view_count)).all())
+    return analytics, cards
+
+
+def test_flush_adds_views_once_per_product(db, products, views_redis):
+    first, second, third = products
+    # Views for a product with no analytics row yet, and for a deleted product
+    db.execute(delete(ProductAnalytics).where(ProductAnalytics.product_id == second))
+    db.commit()
+    (before, cards_before) = view_counts(db)
+    before = dict(before)
+
+    views_redis.hset(PENDING_VIEWS_KEY, {first: 3, second: 2, 999: 5})
+    assert flush_pending_product_views(db) == 3
+
+    analytics, cards = view_counts(db)
+    assert sorted(analytics) == sorted([(first, before[first] + 3), (second, 2), (third, before[third])])
+    assert cards[first] == cards_before[first] + 3
+    assert cards[third] == cards_before[third]
+    assert not views_redis.exists(PENDING_VIEWS_KEY)
+
+
+def test_snapshot_is_added_once_when_its_delete_is_lost(db, products, views_redis, monkeypatch):
+    product_id = products[0]
+    before = dict(view_counts(db)[0])[product_id]
+    views_redis.hset(PENDING_VIEWS_KEY, {product_id: 4})
+
+    redis_delete = views_redis.delete
+
+    def lose_snapshot_delete(*keys):
+        if FLUSHING_VIEWS_KEY in keys:
+            raise RedisError("connection lost")
+        return redis_delete(*keys)
+
+    # The first flush commits, then dies before dropping the snapshot
+    with monkeypatch.context() as patch:
+        patch.setattr(views_redis, "delete", lose_snapshot_delete)
+        with pytest.raises(RedisError):
+            flush_pending_product_views(db)
+    assert views_redis.exists(FLUSHING_VIEWS_KEY)
+
+    # Its retry finds the same snapshot already applied
+    assert flush_pending_product_views(db) == 0
+    assert dict(view_counts(db)[0])[product_id] == before + 4
+    assert not views_redis.exists(FLUSHING_VIEWS_KEY)
+
+
+def test_flush_leaves_views_to_the_running_flush(db, products, views_redis):
+    product_id = products[0]
+    before = dict(view_counts(db)[0])[product_id]
+    views_redis.hset(PENDING_VIEWS_KEY, {product_id: 2})
+
+    views_redis.set(FLUSH_LOCK_KEY, "other-flush")
+    assert flush_pending_product_views(db) == 0
+    assert views_redis.get(FLUSH_LOCK_KEY) == "other-flush"
+    assert views_redis.scheduled == 1
+    assert dict(view_counts(db)[0])[product_id] == before
+
+    views_redis.delete(FLUSH_LOCK_KEY)
+    assert flush_pending_product_views(db) == 1
+    assert dict(view_counts(db)[0])[product_id] == before + 2
+    assert not views_redis.exists(FLUSH_LOCK_KEY)
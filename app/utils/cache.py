@@ -0,0 +1,202 @@
+import json
+import logging
+import time
+from collections import defaultdict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, TypeVar
+from urllib.parse import urlencode
+
+from fastapi.encoders import jsonable_encoder
+from redis.exceptions import RedisError
+
+from core.redis import redis_client, async_redis_client
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class VersionedLocalCache(Generic[T]):
+    """
+    Process-local value tied to a shared version counter in Redis.
+
+    Readers re-check the version at most once per ttl_seconds and reload
+    only when it moved; writers call invalidate() so every gunicorn and
+    dramatiq process picks up the change on its next check. If Redis is
+    unreachable the cache degrades to a plain TTL cache.
+
+    Data that can change without an invalidate() call (rows edited directly
+    in the database) should set max_age_seconds: a value that old is
+    reloaded even if the version never moved.
+    """
+
+    def __init__(self, version_key: str, ttl_seconds: float, max_age_seconds: Optional[float] = None):
+        self.version_key = version_key
+        self.ttl_seconds = ttl_seconds
+        self.max_age_seconds = max_age_seconds
+        self._value: Optional[T] = None
+        self._version: Optional[str] = None
+        self._checked_at = 0.0
+        self._loaded_at = 0.0
+        self._lock = Lock()
+
+    def _is_expired(self) -> bool:
+        return (
+            self.max_age_seconds is not None
+            and time.monotonic() - self._loaded_at >= self.max_age_seconds
+        )
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._value is not None
+            and time.monotonic() - self._checked_at < self.ttl_seconds
+            and not self._is_expired()
+        )
+
+    def _accept(self, version: Optional[str]) -> bool:
+        """Keep the current value if the shared version has not moved."""
+        if (
+            self._value is not None
+            and version is not None
+            and version == self._version
+            and not self._is_expired()
+        ):
+            self._checked_at = time.monotonic()
+            return True
+        return False
+
+    def _store(self, value: T, version: Optional[str]) -> T:
+        with self._lock:
+            self._value = value
+            self._version = version
+            self._checked_at = self._loaded_at = time.monotonic()
+        return value
+
+    def _read_version(self) -> Optional[str]:
+        try:
+            return redis_client.get(self.version_key) or "0"
+        except RedisError:
+            logger.warning(f"Redis unavailable reading {self.version_key}; falling back to TTL")
+            return None
+
+    async def _aread_version(self) -> Optional[str]:
+        try:
+            return await async_redis_client.get(self.version_key) or "0"
+        except RedisError:
+            logger.warning(f"Redis unavailable reading {self.version_key}; falling back to TTL")
+            return None
+
+    def get(self, loader: Callable[[], T]) -> T:
+        if self._is_fresh():
+            return self._value
+
+        version = self._read_version()
+        if self._accept(version):
+            return self._value
+
+        return self._store(loader(), version)
+
+    async def aget(self, loader: Callable[[], Awaitable[T]]) -> T:
+        if self._is_fresh():
+            return self._value
+
+        version = await self._aread_version()
+        if self._accept(version):
+            return self._value
+
+        return self._store(await loader(), version)
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._value = None
+            self._version = None
+            self._checked_at = self._loaded_at = 0.0
+
+    def invalidate(self) -> None:
+        """Drop the local copy and bump the shared version for other processes."""
+        self.clear_local()
+        try:
+            redis_client.incr(self.version_key)
+        except RedisError:
+            logger.warning(f"Redis unavailable bumping {self.version_key}; other workers refresh on TTL")
+
+
+class ResponseCache:
+    """
+    Redis cache for JSON responses, keyed on route + parameters.
+
+    Keys embed a namespace version (`{namespace}:v{n}:...`); invalidate()
+    bumps it, which orphans every entry at once (they age out via TTL).
+    Hit/miss counters are kept per process, like the DB pool stats.
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self.version_key = f"{namespace}:version"
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "errors": 0}
+        )
+        self._lock = Lock()
+
+    def _count(self, route: str, outcome: str) -> None:
+        with self._lock:
+            self._counters[route][outcome] += 1
+
+    def _key(self, version: str, route: str, params: Optional[dict]) -> str:
+        query = urlencode(sorted((params or {}).items()))
+        return f"{self.namespace}:v{version}:{route}:{query}"
+
+    async def get_or_set(
+        self,
+        route: str,
+        params: Optional[dict],
+        ttl_seconds: int,
+        producer: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        try:
+            version = await async_redis_client.get(self.version_key) or "0"
+            key = self._key(version, route, params)
+            cached = await async_redis_client.get(key)
+        except RedisError:
+            self._count(route, "errors")
+            return await producer()
+
+        if cached is not None:
+            self._count(route, "hits")
+            return json.loads(cached)
+
+        self._count(route, "misses")
+        value = jsonable_encoder(await producer())
+
+        try:
+            await async_redis_client.set(key, json.dumps(value), ex=ttl_seconds)
+        except RedisError:
+            self._count(route, "errors")
+
+        return value
+
+    def invalidate(self) -> None:
+        try:
+            redis_client.incr(self.version_key)
+        except RedisError:
+            logger.warning(f"Redis unavailable bumping {self.version_key}; entries expire on TTL")
+
+    def stats(self) -> dict:
+        with self._lock:
+            routes = {route: dict(counts) for route, counts in self._counters.items()}
+
+        hits = sum(c["hits"] for c in routes.values())
+        misses = sum(c["misses"] for c in routes.values())
+        return {
+            "namespace": self.namespace,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "routes": routes,
+        }
+
+
+# Catalog reads (categories, subcategories, product lists/detail).
+# Invalidated by every product, category, subcategory and pricing write.
+catalog_cache = ResponseCache("catalog")
@@ -0,0 +1,89 @@
+import json
+import logging
+import uuid
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from redis.exceptions import RedisError
+
+from core.redis import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+_PENDING_PREFIX = "pending:"
+
+# Delete the claim only if it is still ours (not a stored response or a newer claim)
+_RELEASE_SCRIPT = redis_client.register_script(
+    "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0"
+)
+
+
+class IdempotencyStore:
+    """
+    Redis front for idempotent POSTs. One key per (scope, idempotency key)
+    holds either an in-flight claim (`pending:<token>`, SET NX with a short
+    TTL) or the finished JSON response (long TTL).
+
+    If Redis is unreachable every call degrades to a no-op and the caller's
+    database-level idempotency still applies.
+    """
+
+    def __init__(self, namespace: str, claim_ttl_seconds: int, response_ttl_seconds: int):
+        self.namespace = namespace
+        self.claim_ttl_seconds = claim_ttl_seconds
+        self.response_ttl_seconds = response_ttl_seconds
+
+    def _key(self, scope: str, idempotency_key: str) -> str:
+        return f"{self.namespace}:{scope}:{idempotency_key}"
+
+    def claim(self, scope: str, idempotency_key: str) -> Tuple[Optional[str], Optional[Any]]:
+        """
+        Returns (token, None) when the caller now owns the key, (None, response)
+        for a completed request, and (None, None) when Redis is unavailable.
+        Raises 409 while another request holds the claim.
+        """
+        key = self._key(scope, idempotency_key)
+        token = _PENDING_PREFIX + uuid.uuid4().hex
+
+        try:
+            if redis_client.set(key, token, nx=True, ex=self.claim_ttl_seconds):
+                return token, None
+            current = redis_client.get(key)
+        except RedisError:
+            logger.warning(f"Redis unavailable for idempotency key {key}")
+            return None, None
+
+        if current is None:
+            # Claim expired between SET and GET; let the database path decide
+            return None, None
+        if current.startswith(_PENDING_PREFIX):
+            raise HTTPException(409, "A request with this idempotency key is already in progress")
+        return None, json.loads(current)
+
+    def complete(self, scope: str, idempotency_key: str, token: Optional[str], response: Any) -> Any:
+        """Store the finished response for replay and return it JSON-encoded."""
+        value = jsonable_encoder(response)
+        if token is None:
+            return value
+
+        try:
+            redis_client.set(
+                self._key(scope, idempotency_key),
+                json.dumps(value),
+                ex=self.response_ttl_seconds,
+            )
+        except RedisError:
+            logger.warning(f"Redis unavailable storing idempotent response for {idempotency_key}")
+        return value
+
+    def release(self, scope: str, idempotency_key: str, token: Optional[str]) -> None:
+        """Drop our claim so the client can retry (failed or non-replayable result)."""
+        if token is None:
+            return
+
+        try:
+            _RELEASE_SCRIPT(keys=[self._key(scope, idempotency_key)], args=[token])
+        except RedisError:
+            logger.warning(f"Redis unavailable releasing idempotency claim for {idempotency_key}")
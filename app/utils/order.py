@@ -1,22 +1,33 @@
+import logging
 from typing import List, Optional
 from fastapi import HTTPException
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from models.order import Order, OrderItem, Payment
 from schemas.payment import OrderStatus, PaymentStatus
 from models.products import Product
 from services.razorpay_service import razorpay_service
-from services.delivery_charge_service import (
-    DeliveryChargePolicy,
-    build_pricing_breakdown,
-)
+from services.delivery_charge_service import DeliveryChargePolicy
 from services.coupon_service import CouponService
-from utils.pricing import calculate_dimension_pricing_db
+from services import pricing_engine
+from services.outbox_service import add_confirmed_order_jobs, add_outbox_message
+from utils.pricing import get_multiplier_map
 from models.users import Address
 from db.session import get_db_session
+from utils.idempotency import IdempotencyStore
 from core.config import settings
 
 
+logger = logging.getLogger(__name__)
+
+order_idempotency = IdempotencyStore(
+    namespace="idempotency:create_order",
+    claim_ttl_seconds=settings.ORDER_IDEMPOTENCY_CLAIM_TTL,
+    response_ttl_seconds=settings.ORDER_IDEMPOTENCY_RESPONSE_TTL,
+)
+
+
 class OrderService:
 
     @staticmethod
@@ -55,6 +66,46 @@ class OrderService:
         if not items:
             raise HTTPException(400, "Cart cannot be empty")
 
+        # Claim the key in Redis before any pricing, coupon or gateway work;
+        # completed responses are replayed without touching Postgres
+        token, cached = order_idempotency.claim(user_id, idempotency_key)
+        if cached is not None:
+            return cached
+
+        try:
+            response = OrderService._create_order(
+                db,
+                user_id,
+                items,
+                address_id,
+                payment_method,
+                idempotency_key,
+                coupon_code=coupon_code,
+                customer_email=customer_email,
+            )
+        except Exception:
+            order_idempotency.release(user_id, idempotency_key, token)
+            raise
+
+        # Only replay responses the client can act on
+        if response.get("payment_method") == "COD" or response.get("payment_gateway_order_id"):
+            return order_idempotency.complete(user_id, idempotency_key, token, response)
+
+        order_idempotency.release(user_id, idempotency_key, token)
+        return response
+
+    @staticmethod
+    def _create_order(
+        db: Session,
+        user_id: str,
+        items: List[dict],
+        address_id: int,
+        payment_method: str,
+        idempotency_key: str,
+        coupon_code: Optional[str] = None,
+        customer_email: str = None,
+    ):
+
         # ⭐ STEP 1: EARLY idempotency check
         existing_order = (
             db.query(Order)
@@ -70,6 +121,26 @@ class OrderService:
             pricing_summary = OrderService._build_existing_order_pricing_summary(
                 existing_order
             )
+            gateway_order_id = payment.gateway_order_id
+            items_snapshot = [
+                {
+                    "product_id": oi.product_id,
+                    "quantity": oi.quantity,
+                    "price": oi.price,
+                    "dimension": oi.dimension
+                }
+                for oi in existing_order.items
+            ]
+
+            # Recovery: an earlier attempt committed the order but never got a
+            # Razorpay order attached (gateway error or crash), so retry phase 2
+            if OrderService._awaiting_gateway_order(payment):
+                order_id, amount = existing_order.id, float(payment.amount)
+                db.commit()  # end the read transaction before calling Razorpay
+                gateway_order_id = OrderService._attach_gateway_order(
+                    db, order_id, amount, customer_email
+                )
+                db.refresh(payment)
 
             return {
                 "order_id": existing_order.id,
@@ -77,16 +148,8 @@ class OrderService:
                 "currency": "INR",
                 "payment_method": payment.payment_method,
                 "payment_status": payment.status,
-                "payment_gateway_order_id": payment.gateway_order_id,
-                "items": [
-                    {
-                        "product_id": oi.product_id,
-                        "quantity": oi.quantity,
-                        "price": oi.price,
-                        "dimension": oi.dimension
-                    }
-                    for oi in existing_order.items
-                ]
+                "payment_gateway_order_id": gateway_order_id,
+                "items": items_snapshot
             }
 
         # 1️⃣ Fetch & validate address
@@ -98,31 +161,24 @@ class OrderService:
         if not address:
             raise HTTPException(404, "Address not found")
 
-        # 2️⃣ Validate items & pricing
-        priced_items, items_subtotal, total_quantity = (
-            OrderService._validate_and_price_items(db, items)
+        # 2️⃣ Load pricing inputs (products, multipliers, coupon eligibility)
+        coupon = (
+            CouponService.fetch_and_validate(db, coupon_code, user_id)
+            if coupon_code else None
         )
+        snapshot = OrderService.load_pricing_snapshot(db, items, coupon)
 
-        # 3️⃣ Apply coupon if provided
-        coupon = None
-        coupon_discount_amount = 0.0
-        subtotal_before_coupon = None
-        subtotal_after_coupon = None
-        matched_dimension = None
-
-        if coupon_code:
-            coupon = CouponService.fetch_and_validate(db, coupon_code, user_id)
-            discount_result = CouponService.compute_discount(coupon, priced_items)
-            coupon_discount_amount = discount_result["discount_amount"]
-            matched_dimension = discount_result["matched_dimension"]
-            subtotal_before_coupon = items_subtotal
-            items_subtotal = round(max(items_subtotal - coupon_discount_amount, 0.0), 2)
-            subtotal_after_coupon = items_subtotal
-
-        pricing_summary = build_pricing_breakdown(
-            subtotal=items_subtotal,
-            policy=OrderService._get_delivery_policy(),
-        )
+        # 3️⃣ Price lines, coupon and delivery with no I/O
+        pricing = pricing_engine.price_checkout(snapshot, items)
+        priced_items = pricing.items
+        total_quantity = pricing.total_quantity
+        coupon_discount_amount = pricing.coupon_discount_amount
+        matched_dimension = pricing.matched_dimension
+        subtotal_before_coupon = pricing.items_subtotal if coupon else None
+        subtotal_after_coupon = pricing.subtotal_after_coupon if coupon else None
+        items_subtotal = pricing.subtotal_after_coupon
+
+        pricing_summary = pricing.breakdown()
 
         order_total = pricing_summary["amount"]
 
@@ -162,9 +218,9 @@ class OrderService:
 
         # 6️⃣ Record coupon usage (committed atomically with the order)
         if coupon:
-            CouponService.record_usage(db, coupon.id, user_id, order.id)
+            CouponService.record_usage(db, coupon, user_id, order.id)
 
-        # 7️⃣ Create payment
+        # 7️⃣ Create payment (Razorpay: pending, gateway order attached in phase 2)
         payment_response = OrderService._create_payment(
             db=db,
             order=order,
@@ -172,6 +228,19 @@ class OrderService:
             amount=order_total,
             customer_email=customer_email
         )
+        order_id = order.id
+
+        # 8️⃣ Background jobs commit with the order; the outbox relay enqueues them
+        if payment_method == "COD":
+            add_confirmed_order_jobs(db, order_id)
+        if payment_method == "RAZORPAY":
+            # Safety net in case phase 2 never finishes
+            add_outbox_message(
+                db,
+                "expire_unattached_order",
+                order_id,
+                delay_ms=settings.RAZORPAY_ATTACH_TIMEOUT * 1000,
+            )
 
         # ⭐ STEP 6: COMMIT WITH RACE CONDITION PROTECTION
         try:
@@ -200,16 +269,14 @@ class OrderService:
                 "payment_gateway_order_id": payment.gateway_order_id,
             }
 
-        db.refresh(order)
-
-        if payment_method == "COD":
-            from tasks.process_order import process_confirmed_order
-            from tasks.notify_admin import notify_admin
-            from tasks.shiprocket_order import create_shiprocket_order
+        if payment_method == "RAZORPAY":
+            # ⭐ Phase 2: no transaction is open here, so the pooled
+            # connection is free for the whole gateway round trip
+            payment_response["payment_gateway_order_id"] = OrderService._attach_gateway_order(
+                db, order_id, order_total, customer_email
+            )
 
-            process_confirmed_order.send(order.id)
-            notify_admin.send(order.id)
-            create_shiprocket_order.send(order.id)
+        db.refresh(order)
 
         applied_coupon = None
         if coupon:
@@ -237,55 +304,27 @@ class OrderService:
         }
 
     # --------------------------------------------------
-    # Validate items + calculate price
+    # Load everything checkout pricing depends on
     # --------------------------------------------------
     @staticmethod
-    def _validate_and_price_items(db: Session, items: List[dict]):
-        product_ids = [i["product_id"] for i in items]
-        products = db.query(Product).filter(Product.id.in_(product_ids)).all()
-        product_map = {p.id: p for p in products}
-
-        priced_items = []
-        order_total = 0.0
-        total_quantity = 0
-
-        for item in items:
-            pid = item["product_id"]
-            qty = item["qty"]
-            dim = item["dimension"]
-
-            if pid not in product_map:
-                raise HTTPException(400, f"Invalid product: {pid}")
-
-            if qty <= 0:
-                raise HTTPException(400, "Quantity must be >= 1")
-
-            product = product_map[pid]
-
-            if not product.dimensions or dim not in product.dimensions:
-                raise HTTPException(400, f"Invalid dimension '{dim}' for product {pid}")
-
-            pricing = calculate_dimension_pricing_db(
-                db=db,
-                dimensions=[dim],
-                base_price=product.price,
-                discounted_price=product.discounted_price
-            )[dim]
-
-            unit_price = float(pricing["discounted_price"] or pricing["price"])
-            line_total = unit_price * qty
-            order_total += line_total
-            total_quantity += qty
-
-
-            priced_items.append({
-                "product_id": pid,
-                "quantity": qty,
-                "price": unit_price,
-                "dimension": dim
-            })
+    def load_pricing_snapshot(
+        db: Session,
+        items: List[dict],
+        coupon: Optional[pricing_engine.CouponTerms] = None,
+    ) -> pricing_engine.PricingSnapshot:
+        product_ids = {i["product_id"] for i in items}
+        products = (
+            db.query(Product.id, Product.price, Product.discounted_price, Product.dimensions)
+            .filter(Product.id.in_(product_ids))
+            .all()
+        )
 
-        return priced_items, round(order_total, 2), total_quantity
+        return pricing_engine.PricingSnapshot.build(
+            products=[pricing_engine.ProductPrice.from_model(p) for p in products],
+            multipliers=get_multiplier_map(db),
+            delivery_policy=OrderService._get_delivery_policy(),
+            coupon=coupon,
+        )
 
     # --------------------------------------------------
     # Create payment record (COD / Razorpay)
@@ -315,13 +354,9 @@ class OrderService:
             }
 
         if payment_method == "RAZORPAY":
-            # Use the customer_email argument directly
-            razorpay_order = razorpay_service.create_order(amount, receipt=str(order.id), customer_email=customer_email)
-
             payment = Payment(
                 order_id=order.id,
                 payment_method="RAZORPAY",
-                gateway_order_id=razorpay_order["id"],
                 amount=amount,
                 status=PaymentStatus.CREATED
             )
@@ -330,10 +365,102 @@ class OrderService:
 
             return {
                 "payment_status": "CREATED",
-                "payment_gateway_order_id": razorpay_order["id"]
+                "payment_gateway_order_id": None
             }
         raise HTTPException(400, f"Unsupported payment method: {payment_method}")
 
+    # --------------------------------------------------
+    # Razorpay phase 2: gateway order outside any transaction
+    # --------------------------------------------------
+    @staticmethod
+    def _awaiting_gateway_order(payment: Optional[Payment]) -> bool:
+        return (
+            payment is not None
+            and payment.payment_method == "RAZORPAY"
+            and payment.status == PaymentStatus.CREATED
+            and payment.gateway_order_id is None
+        )
+
+    @staticmethod
+    def _attach_gateway_order(
+        db: Session,
+        order_id: int,
+        amount: float,
+        customer_email: str = None,
+    ) -> str:
+        """
+        Create the Razorpay order and attach its id to the pending payment.
+        Must be called with no open transaction. Safe to repeat: the
+        conditional UPDATE only fills an empty gateway_order_id, and a loser
+        of a concurrent retry returns the id that won.
+        """
+        try:
+            razorpay_order = razorpay_service.create_order(
+                amount, receipt=str(order_id), customer_email=customer_email
+            )
+        except Exception:
+            logger.exception(f"Razorpay order creation failed for order {order_id}")
+            raise HTTPException(
+                502,
+                "Payment gateway unavailable. Retry with the same idempotency key."
+            )
+
+        attached = db.execute(
+            update(Payment)
+            .where(
+                Payment.order_id == order_id,
+                Payment.status == PaymentStatus.CREATED,
+                Payment.gateway_order_id.is_(None),
+            )
+            .values(gateway_order_id=razorpay_order["id"])
+            .returning(Payment.gateway_order_id)
+        ).scalar_one_or_none()
+
+        if attached is None:
+            attached = (
+                db.query(Payment.gateway_order_id)
+                .filter(Payment.order_id == order_id)
+                .scalar()
+            )
+        db.commit()
+
+        if attached is None:
+            # Expired by expire_unattached_order while the gateway call was in flight
+            raise HTTPException(409, "Order is no longer awaiting payment. Please place a new order.")
+
+        return attached
+
+    @staticmethod
+    def expire_unattached_order(db: Session, order_id: int) -> bool:
+        """
+        Cancel a Razorpay order whose gateway order was never attached and
+        release its coupon usage. No-op (returns False) once attached.
+        """
+        expired = db.execute(
+            update(Payment)
+            .where(
+                Payment.order_id == order_id,
+                Payment.payment_method == "RAZORPAY",
+                Payment.status == PaymentStatus.CREATED,
+                Payment.gateway_order_id.is_(None),
+            )
+            .values(status=PaymentStatus.FAILED)
+            .returning(Payment.id)
+        ).scalar_one_or_none()
+
+        if expired is None:
+            db.rollback()
+            return False
+
+        db.execute(
+            update(Order)
+            .where(Order.id == order_id, Order.order_status == OrderStatus.CREATED)
+            .values(order_status=OrderStatus.CANCELLED)
+        )
+        CouponService.release_usage(db, order_id)
+        db.commit()
+        return True
+
 
 
 
@@ -1,6 +1,9 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from models.order import Payment
+from services.outbox_service import add_confirmed_order_jobs
 from schemas.payment import PaymentStatus, OrderStatus
 
 
@@ -23,6 +26,35 @@ def compute_expected_order_total(order) -> float:
     return round(payable_items_subtotal + delivery_charge, 2)
 
 
+def _apply_razorpay_capture(
+    payment: Payment,
+    razorpay_payment_id: str | None,
+    raw_response: dict | None,
+) -> bool:
+    """
+    Validate amounts and mark the payment captured in-memory.
+    Returns False when the payment was already finalized (idempotent no-op).
+    """
+    expected_total = compute_expected_order_total(payment.order)
+
+    if round(float(payment.order.amount), 2) != expected_total:
+        raise HTTPException(status_code=409, detail="Order amount breakdown mismatch")
+
+    if round(float(payment.amount), 2) != expected_total:
+        raise HTTPException(status_code=409, detail="Payment amount mismatch")
+
+    # 🔒 Idempotency guard
+    if payment.status == PaymentStatus.SUCCESS:
+        return False
+
+    payment.status = PaymentStatus.SUCCESS
+    payment.transaction_id = razorpay_payment_id
+    payment.raw_response = raw_response
+
+    payment.order.order_status = OrderStatus.CONFIRMED
+    return True
+
+
 def finalize_razorpay_payment(
     *,
     db: Session,
@@ -43,29 +75,41 @@ def finalize_razorpay_payment(
     if not payment:
         return None
 
-    expected_total = compute_expected_order_total(payment.order)
+    if not _apply_razorpay_capture(payment, razorpay_payment_id, raw_response):
+        return payment
 
-    if round(float(payment.order.amount), 2) != expected_total:
-        raise HTTPException(status_code=409, detail="Order amount breakdown mismatch")
+    # Jobs commit with the capture; the outbox relay enqueues them
+    add_confirmed_order_jobs(db, payment.order_id)
+    db.commit()
+    return payment
 
-    if round(float(payment.amount), 2) != expected_total:
-        raise HTTPException(status_code=409, detail="Payment amount mismatch")
 
-    # 🔒 Idempotency guard
-    if payment.status == PaymentStatus.SUCCESS:
-        return payment
+async def finalize_razorpay_payment_async(
+    *,
+    db: AsyncSession,
+    razorpay_order_id: str,
+    razorpay_payment_id: str | None = None,
+    raw_response: dict | None = None,
+):
+    """Same contract as finalize_razorpay_payment, for the async webhook path."""
+    payment = (
+        await db.execute(
+            select(Payment)
+            .options(selectinload(Payment.order))
+            .where(
+                Payment.gateway_order_id == razorpay_order_id,
+                Payment.payment_method == "RAZORPAY"
+            )
+            .with_for_update()
+        )
+    ).scalars().first()
 
-    payment.status = PaymentStatus.SUCCESS
-    payment.transaction_id = razorpay_payment_id
-    payment.raw_response = raw_response
+    if not payment:
+        return None
 
-    payment.order.order_status = OrderStatus.CONFIRMED
+    if not _apply_razorpay_capture(payment, razorpay_payment_id, raw_response):
+        return payment
 
-    db.commit()
-    from tasks.process_order import process_confirmed_order
-    from tasks.notify_admin import notify_admin
-    from tasks.shiprocket_order import create_shiprocket_order
-    process_confirmed_order.send(payment.order_id)
-    notify_admin.send(payment.order_id)
-    create_shiprocket_order.send(payment.order_id)
+    add_confirmed_order_jobs(db, payment.order_id)
+    await db.commit()
     return payment
@@ -1,6 +1,11 @@
+import numpy as np
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Sequence, Tuple
 from models.products import DimensionPricing
+from core.config import settings
+from utils.cache import VersionedLocalCache
 
 
 def round_price_to_9(value: float) -> int:
@@ -8,34 +13,17 @@ def round_price_to_9(value: float) -> int:
     remainder = value % 10
     return value if remainder == 9 else value + (9 - remainder)
 
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict
-from models.products import DimensionPricing
-
 
-def round_price_to_9(value: float) -> int:
-    value = int(round(value))
-    remainder = value % 10
-    return value if remainder == 9 else value + (9 - remainder)
-
-
-def calculate_dimension_pricing_db(
-    db: Session,
+def build_dimension_pricing(
     dimensions: List[str],
     base_price: float,
-    discounted_price: Optional[float] = None
+    discounted_price: Optional[float],
+    multiplier_map: Dict[str, float]
 ) -> Dict[str, dict]:
     """
-    Dynamically calculate dimension prices using multipliers from the database.
+    Pure pricing step: apply already-loaded multipliers to a product.
     Prices are rounded to end with 9 and have no decimals.
     """
-
-    db_dimensions = db.query(DimensionPricing).filter(
-        DimensionPricing.name.in_(dimensions)
-    ).all()
-
-    multiplier_map = {d.name: d.multiplier for d in db_dimensions}
-
     result = {}
     for dim in dimensions:
         multiplier = multiplier_map.get(dim, 1.0)
@@ -55,3 +43,145 @@ def calculate_dimension_pricing_db(
         }
 
     return result
+
+
+def round_prices_to_9(values: np.ndarray) -> np.ndarray:
+    """Vectorized round_price_to_9 (np.rint rounds half-to-even like round())."""
+    rounded = np.rint(values).astype(np.int64)
+    return rounded + 9 - rounded % 10
+
+
+def price_matrix(
+    base_prices: Sequence[float],
+    discounted_prices: Sequence[Optional[float]],
+    multipliers: Sequence[float],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Price N products x M multipliers in one pass.
+    Returns (prices, discounted_prices, has_discount): two (N, M) int arrays and
+    an (N,) bool mask; discounted values are meaningless where the mask is False.
+    """
+    base = np.asarray(base_prices, dtype=np.float64)
+    discounted = np.array(
+        [np.nan if d is None else d for d in discounted_prices], dtype=np.float64
+    )
+    has_discount = ~np.isnan(discounted)
+    mult = np.asarray(multipliers, dtype=np.float64)
+
+    prices = round_prices_to_9(base[:, None] * mult[None, :])
+    discounted_matrix = round_prices_to_9(
+        np.where(has_discount, discounted, 0.0)[:, None] * mult[None, :]
+    )
+    return prices, discounted_matrix, has_discount
+
+
+def build_dimension_pricing_batch(
+    products: Sequence[Tuple[Optional[List[str]], float, Optional[float]]],
+    multiplier_map: Dict[str, float],
+) -> List[Dict[str, dict]]:
+    """
+    build_dimension_pricing for many products at once.
+    products is a sequence of (dimensions, base_price, discounted_price); the
+    matrix columns are the distinct dimensions across all of them.
+    """
+    if not products:
+        return []
+
+    columns: Dict[str, int] = {}
+    for dimensions, _, _ in products:
+        for dim in dimensions or []:
+            columns.setdefault(dim, len(columns))
+
+    multipliers = [multiplier_map.get(dim, 1.0) for dim in columns]
+    prices, discounted, has_discount = price_matrix(
+        [base for _, base, _ in products],
+        [disc for _, _, disc in products],
+        multipliers,
+    )
+    prices = prices.tolist()
+    discounted = discounted.tolist()
+    has_discount = has_discount.tolist()
+
+    result = []
+    for i, (dimensions, _, _) in enumerate(products):
+        row_prices = prices[i]
+        row_discounted = discounted[i] if has_discount[i] else None
+        pricing = {}
+        for dim in dimensions or []:
+            j = columns[dim]
+            pricing[dim] = {
+                "price": row_prices[j],
+                "discounted_price": row_discounted[j] if row_discounted is not None else None,
+                "multiplier": multipliers[j]
+            }
+        result.append(pricing)
+
+    return result
+
+
+# The dimension_pricing table is a handful of rows that rarely change, so the
+# whole name -> multiplier map is cached per process and versioned in Redis.
+_multiplier_cache: VersionedLocalCache[Dict[str, float]] = VersionedLocalCache(
+    version_key="dimension_pricing:version",
+    ttl_seconds=settings.DIMENSION_PRICING_CACHE_TTL,
+)
+
+
+def load_multiplier_map(db: Session) -> Dict[str, float]:
+    rows = db.query(DimensionPricing.name, DimensionPricing.multiplier).all()
+    return {name: multiplier for name, multiplier in rows}
+
+
+async def _load_multiplier_map_async(db: AsyncSession) -> Dict[str, float]:
+    rows = await db.execute(select(DimensionPricing.name, DimensionPricing.multiplier))
+    return {name: multiplier for name, multiplier in rows.all()}
+
+
+def get_multiplier_map(db: Session) -> Dict[str, float]:
+    return _multiplier_cache.get(lambda: load_multiplier_map(db))
+
+
+async def get_multiplier_map_async(db: AsyncSession) -> Dict[str, float]:
+    return await _multiplier_cache.aget(lambda: _load_multiplier_map_async(db))
+
+
+def invalidate_dimension_multipliers() -> None:
+    """Call after any DimensionPricing write."""
+    _multiplier_cache.invalidate()
+
+
+def fetch_dimension_multipliers(db: Session, dimensions: List[str]) -> Dict[str, float]:
+    multiplier_map = get_multiplier_map(db)
+    return {dim: multiplier_map[dim] for dim in dimensions if dim in multiplier_map}
+
+
+async def fetch_dimension_multipliers_async(db: AsyncSession, dimensions: List[str]) -> Dict[str, float]:
+    multiplier_map = await get_multiplier_map_async(db)
+    return {dim: multiplier_map[dim] for dim in dimensions if dim in multiplier_map}
+
+
+def calculate_dimension_pricing_db(
+    db: Session,
+    dimensions: List[str],
+    base_price: float,
+    discounted_price: Optional[float] = None
+) -> Dict[str, dict]:
+    """
+    Dynamically calculate dimension prices using the cached DimensionPricing multipliers.
+    Prices are rounded to end with 9 and have no decimals.
+    """
+    multiplier_map = fetch_dimension_multipliers(db, dimensions)
+
+    return build_dimension_pricing(dimensions, base_price, discounted_price, multiplier_map)
+
+
+async def calculate_dimension_pricing_async(
+    db: AsyncSession,
+    dimensions: List[str],
+    base_price: float,
+    discounted_price: Optional[float] = None
+) -> Dict[str, dict]:
+    """Async twin of calculate_dimension_pricing_db for AsyncSession routes."""
+    multiplier_map = await fetch_dimension_multipliers_async(db, dimensions)
+
+    return build_dimension_pricing(dimensions, base_price, discounted_price, multiplier_map)
@@ -1,8 +1,8 @@
-from sqlalchemy.orm import Session
-from utils.payment_finalizer import finalize_razorpay_payment
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.payment_finalizer import finalize_razorpay_payment_async
 
 
-def handle_razorpay_event(event: dict, db: Session):
+async def handle_razorpay_event(event: dict, db: AsyncSession):
     event_type = event.get("event")
 
     # We only care about final payment events
@@ -23,7 +23,7 @@ def handle_razorpay_event(event: dict, db: Session):
         return
 
     # ✅ SINGLE SOURCE OF TRUTH
-    finalize_razorpay_payment(
+    await finalize_razorpay_payment_async(
         db=db,
         razorpay_order_id=razorpay_order_id,
         razorpay_payment_id=razorpay_payment_id,
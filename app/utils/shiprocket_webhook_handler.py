@@ -1,7 +1,8 @@
 import logging
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.order import Order
 from schemas.payment import OrderStatus
@@ -61,22 +62,26 @@ def _derive_order_status(event: dict) -> Optional[OrderStatus]:
     return None
 
 
-def _find_order_for_event(event: dict, db: Session) -> Optional[Order]:
+async def _find_order_for_event(event: dict, db: AsyncSession) -> Optional[Order]:
     channel_order_id = str(event.get("channel_order_id") or "").strip()
     if channel_order_id.isdigit():
-        order = db.query(Order).filter(Order.id == int(channel_order_id)).first()
+        order = await db.get(Order, int(channel_order_id))
         if order:
             return order
 
     shiprocket_order_id = str(event.get("order_id") or "").strip()
     if shiprocket_order_id:
-        return db.query(Order).filter(Order.shiprocket_order_id == shiprocket_order_id).first()
+        return (
+            await db.execute(
+                select(Order).where(Order.shiprocket_order_id == shiprocket_order_id)
+            )
+        ).scalars().first()
 
     return None
 
 
-def handle_shiprocket_event(event: dict, db: Session):
-    order = _find_order_for_event(event, db)
+async def handle_shiprocket_event(event: dict, db: AsyncSession):
+    order = await _find_order_for_event(event, db)
     if not order:
         logger.warning("Shiprocket webhook: no matching order found", extra={"event": event})
         return
@@ -100,4 +105,4 @@ def handle_shiprocket_event(event: dict, db: Session):
     if next_status in (OrderStatus.SHIPPED, OrderStatus.FULFILLED):
         order.pickup_scheduled = True
 
-    db.commit()
+    await db.commit()
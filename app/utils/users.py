@@ -1,8 +1,16 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session, joinedload, selectinload
 from models.users import User, Address
-from models.order import Order
+from models.order import Order, OrderItem
+from models.products import Product
 from schemas.payment import OrderStatus
 from schemas.order import OrderSchema, OrderItemSchema
+from utils.pagination import encode_cursor, decode_cursor
+
+
 def get_user_default_address(db: Session, user_id: str):
     """
     Returns the user's default address, or None if not set.
@@ -13,115 +21,158 @@ def get_user_default_address(db: Session, user_id: str):
         .filter(Address.user_id == user_id, Address.is_default == True)
         .first()
     )
-def get_user_orders(db: Session, user_id: str):
+
+
+def _order_item_dict(item) -> dict:
+    product = item.product
+    return {
+        "product_id": product.id,
+        "title": product.title,
+        "image": product.image_links[0] if product.image_links else None,
+        "ordered_dimension": item.dimension,
+        "ordered_price": item.price,
+        "category": product.category_rel.name if product.category_rel else None,
+        "subcategory": product.subcategory_rel.name if product.subcategory_rel else None,
+        "quantity": item.quantity
+    }
+
+
+def _order_items_options():
+    """Batch-load items with their products, categories and subcategories."""
+    return (
+        selectinload(Order.items)
+        .joinedload(OrderItem.product)
+        .options(
+            joinedload(Product.category_rel),
+            joinedload(Product.subcategory_rel),
+        )
+    )
+
+
+def get_user_orders(
+    db: Session,
+    user_id: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    summary: bool = False,
+):
     """
-    Returns all orders belonging to the user with full product details.
+    One page of the user's orders, newest first, keyset-paginated on
+    (created_at, id) over ix_orders_user_created. Payment, items, products
+    and their categories are batch-loaded, so a page costs the same fixed
+    number of queries however many orders the user has. summary=True
+    leaves out the item list.
     """
-
-    orders = (
-    db.query(Order)
-    .filter(
-        Order.user_id == user_id,
-        Order.order_status != OrderStatus.CREATED
+    query = (
+        db.query(Order)
+        .filter(
+            Order.user_id == user_id,
+            Order.order_status != OrderStatus.CREATED
+        )
+        .options(joinedload(Order.payment))
     )
-    .order_by(Order.created_at.desc())
-    .all()
-)
 
-    order_list = []
+    if not summary:
+        query = query.options(_order_items_options())
 
-    for order in orders:
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor, 2, (datetime, int))
+        query = query.filter(tuple_(Order.created_at, Order.id) < (last_created_at, last_id))
 
-        items_data = []
+    orders = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1).all()
+    has_more = len(orders) > limit
+    orders = orders[:limit]
 
-        for item in order.items:
-            product = item.product
+    if summary:
+        # Totals for the page in one grouped query instead of loading items
+        totals = dict(
+            db.query(OrderItem.order_id, func.sum(OrderItem.price * OrderItem.quantity))
+            .filter(OrderItem.order_id.in_([order.id for order in orders]))
+            .group_by(OrderItem.order_id)
+            .all()
+        ) if orders else {}
 
-            items_data.append({
-                "product_id": product.id,
-                "title": product.title,
-                "image": product.image_links[0] if product.image_links else None,
-                "ordered_dimension": item.dimension,
-                "ordered_price": item.price,
-                "category": product.category_rel.name if product.category_rel else None,
-                "subcategory": product.subcategory_rel.name if product.subcategory_rel else None,
-                "quantity": item.quantity
-            })
+    order_list = []
 
+    for order in orders:
 
-        order_list.append({
+        data = {
             "id": order.id,
             "amount": order.amount,
             "status": order.order_status,
             "created_at": order.created_at, # totals
             "total_items": order.quantity,
-            "total_cost": sum(i.price * i.quantity for i in order.items),
 
             # payment
             "payment": order.payment.status if order.payment else None,
             "paid_amount": order.payment.amount if order.payment else None,
             "payment_method": "Razorpay" if order.payment else None,
+        }
 
+        if summary:
+            data["total_cost"] = totals.get(order.id, 0)
+        else:
+            data["total_cost"] = sum(i.price * i.quantity for i in order.items)
             # the detailed product list
-            "items": items_data
-        })
+            data["items"] = [_order_item_dict(item) for item in order.items]
 
+        order_list.append(data)
 
-    return order_list
+    next_cursor = None
+    if has_more:
+        last = orders[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
 
+    return {"limit": limit, "next_cursor": next_cursor, "data": order_list}
 
-def get_user_orders_admin(db: Session):
-    """
-    Returns all orders belonging to the user with full product details.
-    """
 
-    orders = (
-    db.query(Order)
-    .filter(
-        Order.order_status != OrderStatus.CREATED
-    )
-    .order_by(Order.created_at.desc())
-    .all()
-)
+def admin_order_dict(order) -> dict:
+    """Admin view of an order; user, payment, items and products must be loaded."""
+    payment = order.payment
+    return {
+        "id": order.id,
+        "email": order.user.email if order.user else None,
+        "amount": order.amount,
+        "status": order.order_status,
+        "created_at": order.created_at, # totals
+        "total_items": order.quantity,
+        "total_cost": sum(i.price * i.quantity for i in order.items),
 
-    order_list = []
-
-    for order in orders:
+        # payment
+        "payment": payment.status if payment else None,
+        "paid_amount": payment.amount if payment else None,
+        "payment_method": (payment.payment_method or "Razorpay") if payment else None,
 
-        items_data = []
+        # the detailed product list
+        "items": [_order_item_dict(item) for item in order.items]
+    }
 
-        for item in order.items:
-            product = item.product
 
-            items_data.append({
-                "product_id": product.id,
-                "title": product.title,
-                "image": product.image_links[0] if product.image_links else None,
-                "ordered_dimension": item.dimension,
-                "ordered_price": item.price,
-                "category": product.category_rel.name if product.category_rel else None,
-                "subcategory": product.subcategory_rel.name if product.subcategory_rel else None,
-                "quantity": item.quantity
-            })
+def admin_order_options():
+    """Loader options for admin_order_dict: user, payment and items."""
+    return (
+        joinedload(Order.user),
+        joinedload(Order.payment),
+        _order_items_options(),
+    )
 
 
-        order_list.append({
-            "id": order.id,
-            "email": order.user.email,
-            "amount": order.amount,
-            "status": order.order_status,
-            "created_at": order.created_at, # totals
-            "total_items": order.quantity,
-            "total_cost": sum(i.price * i.quantity for i in order.items),
+def admin_orders_statement():
+    """Every placed order with its user, payment and items eager-loaded."""
+    return (
+        select(Order)
+        .where(Order.order_status != OrderStatus.CREATED)
+        .options(*admin_order_options())
+    )
 
-            # payment
-            "payment": order.payment.status if order.payment else None,
-            "paid_amount": order.payment.amount if order.payment else None,
-            "payment_method": order.payment.payment_method if order.payment.payment_method else "Razorpay",
 
-            # the detailed product list
-            "items": items_data
-        })
+def get_user_orders_admin(db: Session):
+    """
+    Returns all placed orders with full product details.
+    """
 
+    orders = db.execute(
+        admin_orders_statement().order_by(Order.created_at.desc())
+    ).scalars().all()
 
-    return order_list
+    return [admin_order_dict(order) for order in orders]